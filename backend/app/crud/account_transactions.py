@@ -7,13 +7,19 @@ from datetime import datetime, timedelta
 import uuid
 import logging
 from app.models.chemical_inventory import ChemicalInventory
+from app.crud.unit_of_work import UnitOfWork
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Account Transaction CRUD
-def create_account_transaction(db: Session, transaction: AccountTransactionCreate, user_id: str) -> AccountTransaction:
+def create_account_transaction(
+    db: Session,
+    transaction: AccountTransactionCreate,
+    user_uid: str,
+    user_id: Optional[int] = None
+) -> AccountTransaction:
     logger.info(f"Creating new transaction: {transaction.transaction_type} - {transaction.quantity} {transaction.unit} - ₹{transaction.amount} - Status: {transaction.status}")
     
     db_transaction = AccountTransaction(
@@ -27,10 +33,17 @@ def create_account_transaction(db: Session, transaction: AccountTransactionCreat
         delivery_date=transaction.delivery_date,
         status=transaction.status,
         notes=transaction.notes,
-        created_by=user_id
+        created_by=user_uid
     )
-    db.add(db_transaction)
-    db.commit()
+    with UnitOfWork(db, user_id=user_id, user_uid=user_uid) as uow:
+        uow.add(db_transaction)
+        uow.flush()  # Assigns the id referenced by the audit row
+        uow.log(
+            action="create_transaction",
+            table_modified="account_transactions",
+            description=f"Created {transaction.transaction_type} transaction: {transaction.quantity} {transaction.unit} of chemical ID {transaction.chemical_id} for ₹{transaction.amount} {transaction.currency}",
+            note=f"Transaction ID: {db_transaction.id}, Supplier: {transaction.supplier}, Status: {transaction.status}"
+        )
     db.refresh(db_transaction)
     
     logger.info(f"Transaction created successfully with ID: {db_transaction.id}")
@@ -45,16 +58,37 @@ def get_account_transactions(db: Session, skip: int = 0, limit: int = 100, chemi
 def get_account_transaction(db: Session, transaction_id: int) -> Optional[AccountTransaction]:
     return db.query(AccountTransaction).filter(AccountTransaction.id == transaction_id).first()
 
-def update_account_transaction(db: Session, transaction_id: int, transaction_update: AccountTransactionUpdate) -> Optional[AccountTransaction]:
+def update_account_transaction(
+    db: Session,
+    transaction_id: int,
+    transaction_update: AccountTransactionUpdate,
+    user_id: Optional[int] = None,
+    user_uid: Optional[str] = None,
+    action: str = "update_transaction",
+    description: Optional[str] = None,
+    note: Optional[str] = None
+) -> Optional[AccountTransaction]:
+    """Update a transaction and write its audit row in the same commit.
+
+    Approve/reject reuse this with their own action, description and note.
+    """
     logger.info(f"Updating transaction {transaction_id} with data: {transaction_update.dict(exclude_unset=True)}")
     
     db_transaction = get_account_transaction(db, transaction_id)
     if db_transaction:
         old_status = db_transaction.status
         update_data = transaction_update.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_transaction, field, value)
-        db.commit()
+        with UnitOfWork(db, user_id=user_id, user_uid=user_uid) as uow:
+            for field, value in update_data.items():
+                setattr(db_transaction, field, value)
+            uow.log(
+                action=action,
+                table_modified="account_transactions",
+                description=description or f"Updated transaction {transaction_id}",
+                old_value=f"Status: {old_status}" if 'status' in update_data else None,
+                new_value=f"Status: {db_transaction.status}" if 'status' in update_data else None,
+                note=note or f"Updated fields: {list(update_data.keys())}"
+            )
         db.refresh(db_transaction)
         
         if 'status' in update_data:
@@ -66,11 +100,23 @@ def update_account_transaction(db: Session, transaction_id: int, transaction_upd
     
     return db_transaction
 
-def delete_account_transaction(db: Session, transaction_id: int) -> bool:
+def delete_account_transaction(
+    db: Session,
+    transaction_id: int,
+    user_id: Optional[int] = None,
+    user_uid: Optional[str] = None,
+    note: Optional[str] = None
+) -> bool:
     db_transaction = get_account_transaction(db, transaction_id)
     if db_transaction:
-        db.delete(db_transaction)
-        db.commit()
+        with UnitOfWork(db, user_id=user_id, user_uid=user_uid) as uow:
+            uow.log(
+                action="delete_transaction",
+                table_modified="account_transactions",
+                description=f"Deleted transaction {transaction_id}",
+                note=note
+            )
+            uow.delete(db_transaction)
         return True
     return False
 
@@ -79,7 +125,12 @@ def generate_order_number() -> str:
     """Generate a unique order number"""
     return f"PO-{datetime.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8].upper()}"
 
-def create_purchase_order(db: Session, purchase_order: PurchaseOrderCreate, user_id: str) -> PurchaseOrder:
+def create_purchase_order(
+    db: Session,
+    purchase_order: PurchaseOrderCreate,
+    user_uid: str,
+    user_id: Optional[int] = None
+) -> PurchaseOrder:
     # Generate order number
     order_number = generate_order_number()
     
@@ -92,25 +143,31 @@ def create_purchase_order(db: Session, purchase_order: PurchaseOrderCreate, user
         expected_delivery=purchase_order.expected_delivery,
         status=purchase_order.status,
         notes=purchase_order.notes,
-        created_by=user_id
+        created_by=user_uid
     )
-    db.add(db_purchase_order)
-    db.flush()  # Get the ID without committing
-    
-    # Create purchase order items
-    for item in purchase_order.items:
-        db_item = PurchaseOrderItem(
-            purchase_order_id=db_purchase_order.id,
-            chemical_id=item.chemical_id,
-            quantity=item.quantity,
-            unit=item.unit,
-            unit_price=item.unit_price,
-            total_price=item.total_price,
-            notes=item.notes
+    with UnitOfWork(db, user_id=user_id, user_uid=user_uid) as uow:
+        uow.add(db_purchase_order)
+        uow.flush()  # Get the ID without committing
+        
+        # Create purchase order items
+        for item in purchase_order.items:
+            db_item = PurchaseOrderItem(
+                purchase_order_id=db_purchase_order.id,
+                chemical_id=item.chemical_id,
+                quantity=item.quantity,
+                unit=item.unit,
+                unit_price=item.unit_price,
+                total_price=item.total_price,
+                notes=item.notes
+            )
+            uow.add(db_item)
+        
+        uow.log(
+            action="create_purchase_order",
+            table_modified="purchase_orders",
+            description=f"Created purchase order {order_number} for supplier {purchase_order.supplier}",
+            note=f"Total amount: ₹{purchase_order.total_amount} {purchase_order.currency}, Items: {len(purchase_order.items)}"
         )
-        db.add(db_item)
-    
-    db.commit()
     db.refresh(db_purchase_order)
     return db_purchase_order
 
@@ -123,21 +180,45 @@ def get_purchase_orders(db: Session, skip: int = 0, limit: int = 100, status: Op
 def get_purchase_order(db: Session, order_id: int) -> Optional[PurchaseOrder]:
     return db.query(PurchaseOrder).filter(PurchaseOrder.id == order_id).first()
 
-def update_purchase_order(db: Session, order_id: int, order_update: PurchaseOrderUpdate) -> Optional[PurchaseOrder]:
+def update_purchase_order(
+    db: Session,
+    order_id: int,
+    order_update: PurchaseOrderUpdate,
+    user_id: Optional[int] = None,
+    user_uid: Optional[str] = None
+) -> Optional[PurchaseOrder]:
     db_order = get_purchase_order(db, order_id)
     if db_order:
         update_data = order_update.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_order, field, value)
-        db.commit()
+        with UnitOfWork(db, user_id=user_id, user_uid=user_uid) as uow:
+            for field, value in update_data.items():
+                setattr(db_order, field, value)
+            uow.log(
+                action="update_purchase_order",
+                table_modified="purchase_orders",
+                description=f"Updated purchase order {order_id}",
+                note=f"Updated fields: {list(update_data.keys())}"
+            )
         db.refresh(db_order)
     return db_order
 
-def delete_purchase_order(db: Session, order_id: int) -> bool:
+def delete_purchase_order(
+    db: Session,
+    order_id: int,
+    user_id: Optional[int] = None,
+    user_uid: Optional[str] = None,
+    note: Optional[str] = None
+) -> bool:
     db_order = get_purchase_order(db, order_id)
     if db_order:
-        db.delete(db_order)
-        db.commit()
+        with UnitOfWork(db, user_id=user_id, user_uid=user_uid) as uow:
+            uow.log(
+                action="delete_purchase_order",
+                table_modified="purchase_orders",
+                description=f"Deleted purchase order {order_id}",
+                note=note
+            )
+            uow.delete(db_order)
         return True
     return False
 
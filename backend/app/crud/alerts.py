@@ -1,36 +1,126 @@
+from sqlalchemy import update, exists
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
-from app.models.alerts import Alert, AlertType, AlertSeverity
-from app.schema.alerts import AlertCreate, AlertUpdate, AlertFilter
-from typing import List, Optional
+from app.models.alerts import Alert, AlertType, AlertSeverity, STOCK_ALERT_TYPES
+from app.models.chemical_inventory import ChemicalInventory, StockStatus, stock_status_for, stock_status_expression
+from app.schema.alerts import AlertCreate, AlertUpdate, AlertFilter, BulkAction
+from app.services.notification_hub import notification_hub
+from app.services.unread_counters import unread_counters
+from app.crud.pagination import encode_cursor, decode_cursor, MAX_FEED_PAGE_SIZE
+from app.crud.unit_of_work import after_commit
+from typing import List, Optional, Tuple
+from datetime import datetime
+import pytz
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Dialects whose INSERT supports ON CONFLICT on a partial index; others use _upsert_alerts_row_by_row
+UPSERT_DIALECTS = {"postgresql": postgresql, "sqlite": sqlite}
 
 def create_alert(db: Session, alert: AlertCreate, user_id: Optional[str] = None) -> Alert:
-    db_alert = Alert(
-        type=alert.type,
-        severity=alert.severity,
-        message=alert.message,
-        chemical_id=alert.chemical_id,
-        user_id=user_id
-    )
-    db.add(db_alert)
+    """Raise an alert, or record another occurrence of the open alert with the same
+    type and chemical"""
+    return _upsert_alerts(db, [alert], user_id)[0]
+
+def create_alerts(db: Session, alerts: List[AlertCreate]) -> List[Alert]:
+    """Raise many alerts in one statement and one transaction, coalescing like create_alert"""
+    return _upsert_alerts(db, alerts)
+
+def _upsert_alerts(db: Session, alerts: List[AlertCreate], user_id: Optional[str] = None) -> List[Alert]:
+    """INSERT ... ON CONFLICT on the open (type, chemical_id) index.
+
+    A new problem inserts a row; a repeat of an open one bumps occurrence_count and
+    last_seen_at and refreshes the message instead. Only new rows count as unread and
+    are pushed to stream clients.
+    """
+    # One row per open key, or the statement would update the same row twice
+    rows = {}
+    for index, alert in enumerate(alerts):
+        key = (alert.type, alert.chemical_id) if alert.chemical_id is not None else index
+        rows[key] = alert
+    if not rows:
+        return []
+    
+    now = datetime.now(pytz.UTC)
+    values = [
+        {
+            "type": alert.type,
+            "severity": alert.severity,
+            "message": alert.message,
+            "chemical_id": alert.chemical_id,
+            "user_id": user_id,
+            "is_read": False,
+            "is_dismissed": False,
+            "occurrence_count": 1,
+            "last_seen_at": now
+        }
+        for alert in rows.values()
+    ]
+    dialect = UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if dialect is not None:
+        statement = dialect.insert(Alert).values(values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[Alert.type, Alert.chemical_id],
+            index_where=Alert.resolved_at.is_(None),
+            set_={
+                "occurrence_count": Alert.occurrence_count + 1,
+                "last_seen_at": statement.excluded.last_seen_at,
+                "severity": statement.excluded.severity,
+                "message": statement.excluded.message
+            }
+        )
+        results = db.execute(statement.returning(Alert.id, Alert.occurrence_count)).all()
+    else:
+        results = _upsert_alerts_row_by_row(db, values)
     db.commit()
-    db.refresh(db_alert)
-    return db_alert
+    
+    ids = [alert_id for alert_id, _ in results]
+    new_ids = {alert_id for alert_id, occurrence_count in results if occurrence_count == 1}
+    db_alerts = db.query(Alert).filter(Alert.id.in_(ids)).order_by(Alert.id).all()
+    
+    unread_counters.add_alert(len(new_ids))
+    for db_alert in db_alerts:
+        if db_alert.id in new_ids:
+            # Push to connected /notifications/stream clients
+            notification_hub.publish_alert(db_alert)
+    return db_alerts
+
+def _upsert_alerts_row_by_row(db: Session, values: List[dict]) -> List[Tuple[int, int]]:
+    """Select-then-update fallback for databases without ON CONFLICT ... WHERE support.
+
+    The open alert is locked while it is bumped, but unlike the upsert this is not atomic:
+    two writers racing to raise the same new alert may both insert it. Returns
+    (id, occurrence_count) like the RETURNING clause of the upsert.
+    """
+    results = []
+    for row in values:
+        existing = None
+        if row["chemical_id"] is not None:
+            existing = db.query(Alert).filter(
+                Alert.type == row["type"],
+                Alert.chemical_id == row["chemical_id"],
+                Alert.resolved_at.is_(None)
+            ).with_for_update().first()
+        if existing is None:
+            existing = Alert(**row)
+            db.add(existing)
+        else:
+            existing.occurrence_count += 1
+            existing.last_seen_at = row["last_seen_at"]
+            existing.severity = row["severity"]
+            existing.message = row["message"]
+        db.flush()
+        results.append((existing.id, existing.occurrence_count))
+    return results
 
 def get_alerts(db: Session, skip: int = 0, limit: int = 100, filters: Optional[AlertFilter] = None) -> List[Alert]:
     query = db.query(Alert)
     
     # Apply filters
     if filters:
-        if filters.type:
-            query = query.filter(Alert.type == filters.type)
-        if filters.severity:
-            query = query.filter(Alert.severity == filters.severity)
-        if filters.is_read is not None:
-            query = query.filter(Alert.is_read == filters.is_read)
-        if filters.is_dismissed is not None:
-            query = query.filter(Alert.is_dismissed == filters.is_dismissed)
-        if filters.chemical_id:
-            query = query.filter(Alert.chemical_id == filters.chemical_id)
+        query = query.filter(*_filter_conditions(filters))
     
     return query.order_by(Alert.timestamp.desc()).offset(skip).limit(limit).all()
 
@@ -40,19 +130,26 @@ def get_alert(db: Session, alert_id: int) -> Optional[Alert]:
 def update_alert(db: Session, alert_id: int, alert_update: AlertUpdate) -> Optional[Alert]:
     db_alert = get_alert(db, alert_id)
     if db_alert:
+        was_unread = unread_counters.is_unread(db_alert)
         update_data = alert_update.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_alert, field, value)
         db.commit()
         db.refresh(db_alert)
+        is_unread = unread_counters.is_unread(db_alert)
+        if is_unread != was_unread:
+            unread_counters.add_alert(1 if is_unread else -1)
     return db_alert
 
 def delete_alert(db: Session, alert_id: int) -> bool:
     db_alert = get_alert(db, alert_id)
     if not db_alert:
         return False
+    was_unread = unread_counters.is_unread(db_alert)
     db.delete(db_alert)
     db.commit()
+    if was_unread:
+        unread_counters.add_alert(-1)
     return True
 
 def dismiss_alert(db: Session, alert_id: int) -> Optional[Alert]:
@@ -61,11 +158,78 @@ def dismiss_alert(db: Session, alert_id: int) -> Optional[Alert]:
 def mark_alert_read(db: Session, alert_id: int) -> Optional[Alert]:
     return update_alert(db, alert_id, AlertUpdate(is_read=True))
 
-def get_unread_alerts(db: Session) -> List[Alert]:
-    return db.query(Alert).filter(Alert.is_read == False).order_by(Alert.timestamp.desc()).all()
+def bulk_update_alerts(
+    db: Session,
+    action: BulkAction,
+    ids: Optional[List[int]] = None,
+    filters: Optional[AlertFilter] = None
+) -> List[int]:
+    """Apply a read/unread/dismiss action to many alerts with one UPDATE ... RETURNING.
 
-def get_active_alerts(db: Session) -> List[Alert]:
-    return db.query(Alert).filter(Alert.is_dismissed == False).order_by(Alert.timestamp.desc()).all()
+    Targets the given ids, or every alert matching filters when ids is None. Rows already
+    in the requested state are left alone; returns the ids that actually changed.
+    """
+    if ids is None and filters is None:
+        raise ValueError("Either ids or a filter is required")
+
+    conditions = [Alert.id.in_(ids)] if ids is not None else _filter_conditions(filters)
+    if action == BulkAction.READ:
+        conditions.append(Alert.is_read == False)
+        values, still_counted = {"is_read": True}, Alert.is_dismissed
+    elif action == BulkAction.UNREAD:
+        conditions.append(Alert.is_read == True)
+        values, still_counted = {"is_read": False}, Alert.is_dismissed
+    else:
+        conditions.append(Alert.is_dismissed == False)
+        values, still_counted = {"is_dismissed": True}, Alert.is_read
+
+    rows = db.execute(
+        update(Alert).where(*conditions).values(**values).returning(Alert.id, still_counted),
+        execution_options={"synchronize_session": False}
+    ).all()
+    db.commit()
+
+    # Only rows that were not already dismissed (or read, for dismiss) move the unread count
+    changed = sum(1 for _, other_flag in rows if not other_flag)
+    unread_counters.add_alert(changed if action == BulkAction.UNREAD else -changed)
+    return [alert_id for alert_id, _ in rows]
+
+def _filter_conditions(filters: AlertFilter) -> list:
+    conditions = []
+    if filters.type:
+        conditions.append(Alert.type == filters.type)
+    if filters.severity:
+        conditions.append(Alert.severity == filters.severity)
+    if filters.is_read is not None:
+        conditions.append(Alert.is_read == filters.is_read)
+    if filters.is_dismissed is not None:
+        conditions.append(Alert.is_dismissed == filters.is_dismissed)
+    if filters.chemical_id:
+        conditions.append(Alert.chemical_id == filters.chemical_id)
+    return conditions
+
+def get_unread_alerts_page(db: Session, limit: int = 50, cursor: Optional[str] = None) -> Tuple[List[Alert], Optional[str]]:
+    """One newest-first page of unread alerts and the cursor for the next page"""
+    return _feed_page(db.query(Alert).filter(Alert.is_read == False), limit, cursor)
+
+def get_active_alerts_page(db: Session, limit: int = 50, cursor: Optional[str] = None) -> Tuple[List[Alert], Optional[str]]:
+    """One newest-first page of undismissed alerts and the cursor for the next page"""
+    return _feed_page(db.query(Alert).filter(Alert.is_dismissed == False), limit, cursor)
+
+def _feed_page(query, limit: int, cursor: Optional[str]) -> Tuple[List[Alert], Optional[str]]:
+    """Keyset page on the alert id, capped at MAX_FEED_PAGE_SIZE rows"""
+    limit = min(limit, MAX_FEED_PAGE_SIZE)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, "id")
+        query = query.filter(Alert.id < last_id)
+    
+    # Fetch one extra row to know whether another page exists
+    rows = query.order_by(Alert.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    next_cursor = encode_cursor("id", rows[-1].id) if has_more and rows else None
+    return rows, next_cursor
 
 def get_alerts_by_chemical(db: Session, chemical_id: int) -> List[Alert]:
     return db.query(Alert).filter(Alert.chemical_id == chemical_id).order_by(Alert.timestamp.desc()).all()
@@ -77,19 +241,140 @@ def get_alerts_by_severity(db: Session, severity: AlertSeverity) -> List[Alert]:
     return db.query(Alert).filter(Alert.severity == severity).order_by(Alert.timestamp.desc()).all()
 
 def create_low_stock_alert(db: Session, chemical_id: int, chemical_name: str, quantity: float, unit: str, threshold: float) -> Alert:
-    alert = AlertCreate(
+    return create_alert(db, _low_stock_alert(chemical_id, chemical_name, quantity, unit, threshold))
+
+def create_out_of_stock_alert(db: Session, chemical_id: int, chemical_name: str) -> Alert:
+    return create_alert(db, _out_of_stock_alert(chemical_id, chemical_name))
+
+def _low_stock_alert(chemical_id: int, chemical_name: str, quantity: float, unit: str, threshold: float) -> AlertCreate:
+    return AlertCreate(
         type=AlertType.LOW_STOCK,
         severity=AlertSeverity.WARNING,
         message=f"Low stock alert: {chemical_name} has only {quantity} {unit} remaining (threshold: {threshold} {unit})",
         chemical_id=chemical_id
     )
-    return create_alert(db, alert)
 
-def create_out_of_stock_alert(db: Session, chemical_id: int, chemical_name: str) -> Alert:
-    alert = AlertCreate(
+def _out_of_stock_alert(chemical_id: int, chemical_name: str) -> AlertCreate:
+    return AlertCreate(
         type=AlertType.OUT_OF_STOCK,
         severity=AlertSeverity.CRITICAL,
         message=f"Out of stock: {chemical_name} is completely depleted",
         chemical_id=chemical_id
     )
-    return create_alert(db, alert) 
\ No newline at end of file
+
+def _stock_alert_for(chemical) -> Optional[AlertCreate]:
+    alert_type = stock_alert_type(chemical.quantity, chemical.alert_threshold)
+    if alert_type == AlertType.OUT_OF_STOCK:
+        return _out_of_stock_alert(chemical.id, chemical.name)
+    if alert_type == AlertType.LOW_STOCK:
+        return _low_stock_alert(chemical.id, chemical.name, chemical.quantity, chemical.unit, chemical.alert_threshold)
+    return None
+
+# The stock alert a chemical should have open, per stock status
+STOCK_STATUS_ALERTS = {
+    StockStatus.OUT_OF_STOCK: AlertType.OUT_OF_STOCK,
+    StockStatus.LOW: AlertType.LOW_STOCK,
+    StockStatus.IN_STOCK: None
+}
+
+def stock_alert_type(quantity: float, alert_threshold: Optional[float]) -> Optional[AlertType]:
+    """The stock alert a chemical should have open, if any"""
+    return STOCK_STATUS_ALERTS[stock_status_for(quantity, alert_threshold)]
+
+def resolve_alerts(db: Session, alert_ids: List[int], commit: bool = True) -> int:
+    """Close open alerts whose condition has cleared; they also leave the active feed.
+
+    With commit=False the change joins the caller's transaction, and the unread count
+    is only adjusted once that transaction commits.
+    """
+    if not alert_ids:
+        return 0
+    rows = db.execute(
+        update(Alert).where(Alert.id.in_(alert_ids), Alert.resolved_at.is_(None))
+        .values(resolved_at=datetime.now(pytz.UTC)).returning(Alert.is_read, Alert.is_dismissed),
+        execution_options={"synchronize_session": False}
+    ).all()
+    db.execute(
+        update(Alert).where(Alert.id.in_(alert_ids)).values(is_dismissed=True),
+        execution_options={"synchronize_session": False}
+    )
+    unread = sum(1 for is_read, is_dismissed in rows if not is_read and not is_dismissed)
+    if commit:
+        db.commit()
+        unread_counters.add_alert(-unread)
+    else:
+        after_commit(db, lambda: unread_counters.add_alert(-unread))
+    return len(rows)
+
+def detach_chemical_alerts(db: Session, chemical_id: int):
+    """Unlink a chemical's alerts before the chemical is deleted, resolving its open stock
+    alerts first. Nothing is committed here; call it inside the delete's unit of work so
+    the alerts stay open and linked if the delete rolls back."""
+    resolve_alerts(db, [alert_id for (alert_id,) in db.query(Alert.id).filter(
+        Alert.chemical_id == chemical_id,
+        Alert.type.in_(STOCK_ALERT_TYPES),
+        Alert.resolved_at.is_(None)
+    )], commit=False)
+    db.execute(
+        update(Alert).where(Alert.chemical_id == chemical_id).values(chemical_id=None),
+        execution_options={"synchronize_session": False}
+    )
+
+def evaluate_stock_alerts(db: Session, chemical: ChemicalInventory):
+    """Raise or clear stock alerts for one chemical after its quantity or threshold changed.
+
+    At most one open alert per (type, chemical): a change that stays on the same side of
+    the threshold bumps the open alert's occurrence count, and recovering stock resolves it.
+    """
+    wanted = _stock_alert_for(chemical)
+    open_alerts = db.query(Alert.id, Alert.type).filter(
+        Alert.chemical_id == chemical.id,
+        Alert.type.in_(STOCK_ALERT_TYPES),
+        Alert.resolved_at.is_(None)
+    ).all()
+    
+    resolve_alerts(db, [alert_id for alert_id, alert_type in open_alerts if wanted is None or alert_type != wanted.type])
+    if wanted is not None:
+        create_alert(db, wanted)
+
+def sweep_stock_alerts(db: Session) -> Tuple[int, int]:
+    """Set-based pass over the whole inventory: correct any stale stock_status, raise
+    missing stock alerts and resolve open ones that no longer apply. Returns (raised, resolved)."""
+    # Rows written outside the API may carry a stale status; last_updated is left as is
+    expected_status = stock_status_expression(ChemicalInventory.quantity, ChemicalInventory.alert_threshold)
+    db.execute(
+        update(ChemicalInventory).where(ChemicalInventory.stock_status != expected_status)
+        .values(stock_status=expected_status, last_updated=ChemicalInventory.last_updated),
+        execution_options={"synchronize_session": False}
+    )
+    db.commit()
+    
+    out_of_stock = ChemicalInventory.stock_status == StockStatus.OUT_OF_STOCK.value
+    low_stock = ChemicalInventory.stock_status == StockStatus.LOW.value
+    
+    def open_alert(alert_type):
+        return exists().where(
+            Alert.chemical_id == ChemicalInventory.id,
+            Alert.type == alert_type,
+            Alert.resolved_at.is_(None)
+        )
+    
+    missing = db.query(ChemicalInventory).filter(
+        ((out_of_stock) & ~open_alert(AlertType.OUT_OF_STOCK)) |
+        ((low_stock) & ~open_alert(AlertType.LOW_STOCK))
+    ).all()
+    raised = create_alerts(db, [_stock_alert_for(chemical) for chemical in missing])
+    
+    def still_applies(condition):
+        return exists().where(ChemicalInventory.id == Alert.chemical_id, condition)
+    
+    stale_ids = [alert_id for (alert_id,) in db.query(Alert.id).filter(
+        Alert.resolved_at.is_(None),
+        ((Alert.type == AlertType.OUT_OF_STOCK) & ~still_applies(out_of_stock)) |
+        ((Alert.type == AlertType.LOW_STOCK) & ~still_applies(low_stock))
+    )]
+    resolved = resolve_alerts(db, stale_ids)
+    
+    if raised or resolved:
+        logger.info(f"📦 Stock sweep raised {len(raised)} and resolved {resolved} alerts")
+    return len(raised), resolved 
\ No newline at end of file
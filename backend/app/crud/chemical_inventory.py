@@ -1,15 +1,35 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import List, Optional
-from app.models.chemical_inventory import ChemicalInventory
+from sqlalchemy import and_, or_, tuple_, text, insert, select, update, func, literal, type_coerce, String
+from pydantic import ValidationError
+from typing import Iterable, List, Optional, Tuple
+from app.models.chemical_inventory import ChemicalInventory, StockStatus, stock_status_for, stock_status_expression
+from app.models.chemical_notes import ChemicalNote
 from app.models.activity_log import ActivityLog
+from app.crud.unit_of_work import UnitOfWork
 from app.models.user import User, UserRole
-from app.schema.chemical_inventory import ChemicalInventoryCreate, ChemicalInventoryUpdate, ChemicalInventoryAddNote
+from app.schema.chemical_inventory import ChemicalInventoryCreate, ChemicalInventoryUpdate, ChemicalInventoryAddNote, ChemicalQuantityAdjust
+from app.crud.pagination import encode_cursor, decode_cursor
+from app.crud.alerts import evaluate_stock_alerts, sweep_stock_alerts, detach_chemical_alerts
+from app.crud.stock_movements import record_movement, record_movements
+from app.models.stock_movements import MovementReason
+from app.services.chemical_import import ImportFileError
 from datetime import datetime
+import logging
 
-def get_chemical_inventory_with_user_info(db: Session, skip: int = 0, limit: int = 100, user_role: UserRole = None) -> List[dict]:
+# Set up logging
+logger = logging.getLogger(__name__)
+
+class StaleVersionError(ValueError):
+    """The chemical changed since the version the caller based its adjustment on"""
+
+# Keyset orderings for cursor pagination, each backed by a composite (column, id) index
+CHEMICAL_CURSOR_ORDERINGS = {"last_updated", "name"}
+
+def get_chemical_inventory_with_user_info(db: Session, skip: int = 0, limit: int = 100, user_role: UserRole = None, stock_status: Optional[StockStatus] = None) -> List[dict]:
     """Get all chemical inventory items with user information"""
-    query = db.query(ChemicalInventory).join(User, ChemicalInventory.updated_by == User.uid, isouter=True)
+    query = _chemical_with_user_query(db)
+    if stock_status:
+        query = query.filter(ChemicalInventory.stock_status == stock_status.value)
     
     # Apply role-based filtering if specified
     if user_role == UserRole.ALL_USERS:
@@ -19,70 +39,258 @@ def get_chemical_inventory_with_user_info(db: Session, skip: int = 0, limit: int
         # These roles can see everything
         pass
     
-    chemicals = query.offset(skip).limit(limit).all()
-    
-    # Convert to dict with user info
-    result = []
-    for chemical in chemicals:
-        chemical_dict = {
-            "id": chemical.id,
-            "name": chemical.name,
-            "quantity": chemical.quantity,
-            "unit": chemical.unit,
-            "formulation": chemical.formulation,
-            "notes": chemical.notes,
-            "alert_threshold": chemical.alert_threshold,
-            "supplier": chemical.supplier,
-            "location": chemical.location,
-            "last_updated": chemical.last_updated,
-            "updated_by": chemical.updated_by,
-            "updated_by_user": None
-        }
-        
-        # Add user info if available
-        if chemical.user:
-            chemical_dict["updated_by_user"] = {
-                "uid": chemical.user.uid,
-                "first_name": chemical.user.first_name,
-                "last_name": chemical.user.last_name,
-                "role": chemical.user.role
-            }
-        
-        print(f"Returning chemical: {chemical_dict['name']}, alert_threshold: {chemical_dict['alert_threshold']}")
-        result.append(chemical_dict)
+    rows = query.order_by(ChemicalInventory.id).offset(skip).limit(limit).all()
     
-    return result
+    return [_chemical_row_to_dict(row) for row in rows]
 
-def get_chemical_inventory_by_id_with_user_info(db: Session, chemical_id: int, user_role: UserRole = None) -> Optional[dict]:
-    """Get a specific chemical inventory item by ID with user information"""
-    chemical = db.query(ChemicalInventory).join(User, ChemicalInventory.updated_by == User.uid, isouter=True).filter(ChemicalInventory.id == chemical_id).first()
-    
-    if not chemical:
-        return None
-    
+def get_chemical_inventory_page_with_user_info(
+    db: Session,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    order_by: str = "last_updated",
+    user_role: UserRole = None,
+    stock_status: Optional[StockStatus] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """Get one keyset-paginated page of chemical inventory items and the cursor for the next page"""
+    if order_by not in CHEMICAL_CURSOR_ORDERINGS:
+        raise ValueError(f"Unsupported ordering: {order_by}")
+    
+    query = _chemical_with_user_query(db)
+    if stock_status:
+        query = query.filter(ChemicalInventory.stock_status == stock_status.value)
+    
+    if order_by == "last_updated":
+        # Most recently updated first. SQLite stores timestamps as text in more than one
+        # format (CURRENT_TIMESTAMP has no fractional seconds, bound datetimes do) and
+        # compares them as strings, so there the cursor carries the stored text itself
+        stored_as_text = db.get_bind().dialect.name == "sqlite"
+        last_updated_key = type_coerce(ChemicalInventory.last_updated, String) if stored_as_text else ChemicalInventory.last_updated
+        query = query.add_columns(last_updated_key.label("cursor_key"))
+        if cursor:
+            last_updated, last_id = decode_cursor(cursor, order_by)
+            if not stored_as_text:
+                last_updated = datetime.fromisoformat(last_updated)
+            query = query.filter(
+                tuple_(last_updated_key, ChemicalInventory.id) < tuple_(last_updated, last_id)
+            )
+        query = query.order_by(ChemicalInventory.last_updated.desc(), ChemicalInventory.id.desc())
+    else:
+        # Alphabetical
+        query = query.add_columns(ChemicalInventory.name.label("cursor_key"))
+        if cursor:
+            last_name, last_id = decode_cursor(cursor, order_by)
+            query = query.filter(tuple_(ChemicalInventory.name, ChemicalInventory.id) > tuple_(last_name, last_id))
+        query = query.order_by(ChemicalInventory.name.asc(), ChemicalInventory.id.asc())
+    
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        next_cursor = encode_cursor(order_by, last.cursor_key, last.id)
+    
+    return [_chemical_row_to_dict(row) for row in rows], next_cursor
+
+def _chemical_with_user_query(db: Session):
+    """Select chemical columns and the updating user's columns in a single outer join.
+    
+    Returns plain row tuples rather than hydrated ORM objects, so serializing a page
+    never triggers a per-row lazy load of ChemicalInventory.user. The note history is
+    summarized as a count plus the latest note, both resolved via the (chemical_id, id)
+    index on chemical_notes.
+    """
+    note_count = select(func.count(ChemicalNote.id)).where(
+        ChemicalNote.chemical_id == ChemicalInventory.id
+    ).correlate(ChemicalInventory).scalar_subquery()
+    latest_note_id = select(func.max(ChemicalNote.id)).where(
+        ChemicalNote.chemical_id == ChemicalInventory.id
+    ).correlate(ChemicalInventory).scalar_subquery()
+    
+    return db.query(
+        ChemicalInventory.id,
+        ChemicalInventory.name,
+        ChemicalInventory.quantity,
+        ChemicalInventory.unit,
+        ChemicalInventory.formulation,
+        ChemicalInventory.notes,
+        ChemicalInventory.alert_threshold,
+        ChemicalInventory.stock_status,
+        ChemicalInventory.version,
+        ChemicalInventory.supplier,
+        ChemicalInventory.location,
+        ChemicalInventory.last_updated,
+        ChemicalInventory.updated_by,
+        User.uid.label("user_uid"),
+        User.first_name.label("user_first_name"),
+        User.last_name.label("user_last_name"),
+        User.role.label("user_role"),
+        note_count.label("note_count"),
+        ChemicalNote.id.label("latest_note_id"),
+        ChemicalNote.author_uid.label("latest_note_author_uid"),
+        ChemicalNote.created_at.label("latest_note_created_at"),
+        ChemicalNote.body.label("latest_note_body")
+    ).outerjoin(User, ChemicalInventory.updated_by == User.uid).outerjoin(ChemicalNote, ChemicalNote.id == latest_note_id)
+
+def _chemical_row_to_dict(row) -> dict:
+    """Convert a row from _chemical_with_user_query to a response dict with user info"""
     chemical_dict = {
-        "id": chemical.id,
-        "name": chemical.name,
-        "quantity": chemical.quantity,
-        "unit": chemical.unit,
-        "formulation": chemical.formulation,
-        "notes": chemical.notes,
-        "last_updated": chemical.last_updated,
-        "updated_by": chemical.updated_by,
-        "updated_by_user": None
+        "id": row.id,
+        "name": row.name,
+        "quantity": row.quantity,
+        "unit": row.unit,
+        "formulation": row.formulation,
+        "notes": row.notes,
+        "alert_threshold": row.alert_threshold,
+        "stock_status": row.stock_status,
+        "version": row.version,
+        "supplier": row.supplier,
+        "location": row.location,
+        "last_updated": row.last_updated,
+        "updated_by": row.updated_by,
+        "updated_by_user": None,
+        "note_count": row.note_count,
+        "latest_note": None
     }
     
     # Add user info if available
-    if chemical.user:
+    if row.user_uid:
         chemical_dict["updated_by_user"] = {
-            "uid": chemical.user.uid,
-            "first_name": chemical.user.first_name,
-            "last_name": chemical.user.last_name,
-            "role": chemical.user.role
+            "uid": row.user_uid,
+            "first_name": row.user_first_name,
+            "last_name": row.user_last_name,
+            "role": row.user_role
+        }
+    
+    if row.latest_note_id:
+        chemical_dict["latest_note"] = {
+            "id": row.latest_note_id,
+            "chemical_id": row.id,
+            "author_uid": row.latest_note_author_uid,
+            "created_at": row.latest_note_created_at,
+            "body": row.latest_note_body
         }
     
     return chemical_dict
 
+def get_chemical_inventory_by_id_with_user_info(db: Session, chemical_id: int, user_role: UserRole = None) -> Optional[dict]:
+    """Get a specific chemical inventory item by ID with user information"""
+    row = _chemical_with_user_query(db).filter(ChemicalInventory.id == chemical_id).first()
+    
+    if not row:
+        return None
+    
+    return _chemical_row_to_dict(row)
+
+# Searchable text of a chemical. The Postgres GIN index and the search query must use
+# this exact expression for the planner to match them.
+CHEMICAL_SEARCH_DOCUMENT = (
+    "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(supplier, '') || ' ' "
+    "|| coalesce(location, '') || ' ' || coalesce(formulation, ''))"
+)
+
+def get_stock_status_summary(db: Session) -> dict:
+    """Number of chemicals per stock status, from the stock_status index"""
+    counts = dict(
+        db.query(ChemicalInventory.stock_status, func.count(ChemicalInventory.id))
+        .group_by(ChemicalInventory.stock_status)
+        .all()
+    )
+    summary = {status.value: counts.get(status.value, 0) for status in StockStatus}
+    summary["total"] = sum(summary.values())
+    return summary
+
+def setup_chemical_search(engine) -> None:
+    """Create the full-text search structures for chemical inventory (idempotent).
+    
+    Postgres: a GIN index over the tsvector document plus a trigram GIN index on name
+    for typo-tolerant and substring matches. SQLite: an FTS5 table kept in sync by triggers.
+    """
+    dialect = engine.dialect.name
+    with engine.begin() as connection:
+        if dialect == "postgresql":
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            connection.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_chemical_inventory_search_document "
+                f"ON chemical_inventory USING GIN ({CHEMICAL_SEARCH_DOCUMENT})"
+            ))
+            connection.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_chemical_inventory_name_trgm "
+                "ON chemical_inventory USING GIN (name gin_trgm_ops)"
+            ))
+        elif dialect == "sqlite":
+            exists = connection.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'chemical_inventory_fts'"
+            )).fetchone()
+            if exists:
+                return
+            connection.execute(text(
+                "CREATE VIRTUAL TABLE chemical_inventory_fts USING fts5("
+                "name, supplier, location, formulation, content='chemical_inventory', content_rowid='id')"
+            ))
+            connection.execute(text(
+                "CREATE TRIGGER chemical_inventory_fts_ai AFTER INSERT ON chemical_inventory BEGIN "
+                "INSERT INTO chemical_inventory_fts(rowid, name, supplier, location, formulation) "
+                "VALUES (new.id, new.name, new.supplier, new.location, new.formulation); END"
+            ))
+            connection.execute(text(
+                "CREATE TRIGGER chemical_inventory_fts_ad AFTER DELETE ON chemical_inventory BEGIN "
+                "INSERT INTO chemical_inventory_fts(chemical_inventory_fts, rowid, name, supplier, location, formulation) "
+                "VALUES ('delete', old.id, old.name, old.supplier, old.location, old.formulation); END"
+            ))
+            connection.execute(text(
+                "CREATE TRIGGER chemical_inventory_fts_au AFTER UPDATE ON chemical_inventory BEGIN "
+                "INSERT INTO chemical_inventory_fts(chemical_inventory_fts, rowid, name, supplier, location, formulation) "
+                "VALUES ('delete', old.id, old.name, old.supplier, old.location, old.formulation); "
+                "INSERT INTO chemical_inventory_fts(rowid, name, supplier, location, formulation) "
+                "VALUES (new.id, new.name, new.supplier, new.location, new.formulation); END"
+            ))
+            # Index rows that existed before the FTS table
+            connection.execute(text("INSERT INTO chemical_inventory_fts(chemical_inventory_fts) VALUES ('rebuild')"))
+
+def search_chemical_inventory(db: Session, q: str, skip: int = 0, limit: int = 20) -> List[dict]:
+    """Ranked search over name, supplier, location and formulation"""
+    dialect = db.get_bind().dialect.name
+    
+    if dialect == "postgresql":
+        ranked = db.execute(text(
+            f"SELECT id, GREATEST(ts_rank({CHEMICAL_SEARCH_DOCUMENT}, query), similarity(name, :q)) AS rank "
+            f"FROM chemical_inventory, websearch_to_tsquery('simple', :q) AS query "
+            f"WHERE {CHEMICAL_SEARCH_DOCUMENT} @@ query OR name % :q OR name ILIKE :pattern "
+            f"ORDER BY rank DESC, id LIMIT :limit OFFSET :skip"
+        ), {"q": q, "pattern": f"%{q}%", "limit": limit, "skip": skip}).all()
+    elif dialect == "sqlite":
+        # Prefix-match every term; quoting keeps FTS5 query syntax out of user input
+        terms = [term.replace('"', '""') for term in q.split()]
+        match = " ".join(f'"{term}"*' for term in terms)
+        if not match:
+            return []
+        ranked = db.execute(text(
+            "SELECT rowid AS id, -bm25(chemical_inventory_fts) AS rank FROM chemical_inventory_fts "
+            "WHERE chemical_inventory_fts MATCH :match ORDER BY bm25(chemical_inventory_fts), rowid "
+            "LIMIT :limit OFFSET :skip"
+        ), {"match": match, "limit": limit, "skip": skip}).all()
+    else:
+        pattern = f"%{q}%"
+        ranked = db.query(ChemicalInventory.id, text("1.0 AS rank")).filter(or_(
+            ChemicalInventory.name.ilike(pattern),
+            ChemicalInventory.supplier.ilike(pattern),
+            ChemicalInventory.location.ilike(pattern),
+            ChemicalInventory.formulation.ilike(pattern)
+        )).order_by(ChemicalInventory.name, ChemicalInventory.id).offset(skip).limit(limit).all()
+    
+    if not ranked:
+        return []
+    
+    ranks = {row.id: float(row.rank) for row in ranked}
+    rows = _chemical_with_user_query(db).filter(ChemicalInventory.id.in_(ranks.keys())).all()
+    
+    results = [dict(_chemical_row_to_dict(row), rank=ranks[row.id]) for row in rows]
+    results.sort(key=lambda chemical: (-chemical["rank"], chemical["id"]))
+    return results
+
 def get_chemical_inventory(db: Session, skip: int = 0, limit: int = 100, user_role: UserRole = None) -> List[ChemicalInventory]:
     """Get all chemical inventory items with role-based filtering"""
     query = db.query(ChemicalInventory)
@@ -105,7 +313,8 @@ def create_chemical_inventory(
     db: Session, 
     chemical: ChemicalInventoryCreate, 
     user_uid: str,
-    user_role: UserRole
+    user_role: UserRole,
+    user_id: Optional[int] = None
 ) -> ChemicalInventory:
     """Create a new chemical inventory item with role-based access control"""
     
@@ -117,34 +326,147 @@ def create_chemical_inventory(
     
     db_chemical = ChemicalInventory(
         **chemical.dict(),
+        stock_status=stock_status_for(chemical.quantity, chemical.alert_threshold).value,
         updated_by=user_uid
     )
     print(f"Created chemical object: {db_chemical.name}, alert_threshold: {db_chemical.alert_threshold}")
     
-    db.add(db_chemical)
-    db.commit()
+    with UnitOfWork(db, user_id=user_id, user_uid=user_uid) as uow:
+        uow.add(db_chemical)
+        uow.flush()  # Assigns the id referenced by the audit row and the ledger
+        record_movement(db, db_chemical.id, chemical.quantity, MovementReason.OPENING, user_uid=user_uid)
+        
+        # Log the activity
+        uow.log(
+            action="create_chemical_inventory",
+            table_modified="chemical_inventory",
+            description=f"Created chemical inventory item: {chemical.name}",
+            new_value=f"ID: {db_chemical.id}, Name: {chemical.name}, Quantity: {chemical.quantity} {chemical.unit}"
+        )
     db.refresh(db_chemical)
+    _evaluate_stock_alerts(db, db_chemical)
     
     print(f"Chemical created successfully: {db_chemical.name}, alert_threshold: {db_chemical.alert_threshold}")
     
-    # Log the activity
-    log_activity(
-        db=db,
-        user_uid=user_uid,
-        action="create_chemical_inventory",
-        table_modified="chemical_inventory",
-        description=f"Created chemical inventory item: {chemical.name}",
-        new_value=f"ID: {db_chemical.id}, Name: {chemical.name}, Quantity: {chemical.quantity} {chemical.unit}"
-    )
-    
     return db_chemical
 
+def import_chemical_inventory(
+    db: Session,
+    rows: Iterable[Tuple[int, dict]],
+    user_uid: str,
+    user_role: UserRole,
+    source: str = "upload",
+    batch_size: int = 500,
+    user_id: Optional[int] = None
+) -> dict:
+    """Bulk-create chemical inventory items from (row_number, row) pairs.
+    
+    Rows are validated with ChemicalInventoryCreate and inserted in multi-row batches,
+    one transaction per batch with a single summarized activity log entry. Invalid rows
+    are skipped and reported back rather than aborting the import. If the file itself
+    becomes unreadable partway through, the rows read so far are still imported and the
+    read error is returned as file_error, so the caller knows where the import stopped.
+    """
+    
+    # Check permissions
+    if user_role not in [UserRole.ADMIN, UserRole.LAB_STAFF, UserRole.PRODUCT]:
+        raise PermissionError("Insufficient permissions to create chemical inventory")
+    
+    if user_id is None:
+        user = db.query(User).filter(User.uid == user_uid).first()
+        user_id = user.id if user else None
+    
+    total_rows = 0
+    imported = 0
+    errors = []
+    batch = []
+    file_error = None
+    
+    def flush_batch():
+        nonlocal imported
+        if not batch:
+            return
+        row_numbers = [row_number for row_number, _ in batch]
+        try:
+            created = db.execute(
+                insert(ChemicalInventory).returning(ChemicalInventory.id, ChemicalInventory.quantity),
+                [values for _, values in batch]
+            ).all()
+            record_movements(db, (
+                {
+                    "chemical_id": chemical_id,
+                    "delta": quantity,
+                    "reason": MovementReason.IMPORT.value,
+                    "reference": source,
+                    "user_uid": user_uid
+                }
+                for chemical_id, quantity in created
+            ))
+            db.add(ActivityLog(
+                user_id=user_id,
+                action="import_chemical_inventory",
+                table_modified="chemical_inventory",
+                description=f"Imported {len(batch)} chemical inventory items from {source}",
+                new_value=f"Rows {row_numbers[0]}-{row_numbers[-1]}"
+            ))
+            db.commit()
+            imported += len(batch)
+        except Exception as e:
+            db.rollback()
+            errors.extend({"row": row_number, "errors": [f"Database error: {e}"]} for row_number in row_numbers)
+        batch.clear()
+    
+    rows = iter(rows)
+    while True:
+        try:
+            row_number, row = next(rows)
+        except StopIteration:
+            break
+        except ImportFileError as e:
+            file_error = str(e)
+            break
+        total_rows += 1
+        try:
+            chemical = ChemicalInventoryCreate(**row)
+        except ValidationError as e:
+            errors.append({
+                "row": row_number,
+                "errors": [f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}" for error in e.errors()]
+            })
+            continue
+        
+        batch.append((row_number, dict(
+            chemical.dict(),
+            stock_status=stock_status_for(chemical.quantity, chemical.alert_threshold).value,
+            updated_by=user_uid
+        )))
+        if len(batch) >= batch_size:
+            flush_batch()
+    
+    flush_batch()
+    if imported:
+        # Imported rows skip per-row evaluation; one set-based pass covers them all
+        try:
+            sweep_stock_alerts(db)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"⚠️ Stock alert sweep after import failed: {e}")
+    
+    return {
+        "total_rows": total_rows,
+        "imported": imported,
+        "failed": len(errors),
+        "errors": sorted(errors, key=lambda error: error["row"]),
+        "file_error": file_error
+    }
+
 def update_chemical_inventory(
     db: Session, 
     chemical_id: int, 
     chemical_update: ChemicalInventoryUpdate, 
     user_uid: str,
-    user_role: UserRole
+    user_role: UserRole,
+    user_id: Optional[int] = None
 ) -> Optional[ChemicalInventory]:
     """Update a chemical inventory item with role-based access control"""
     
@@ -170,7 +492,7 @@ def update_chemical_inventory(
     print(f"Old values: {old_values}")
     
     # Apply role-based update restrictions
-    update_data = chemical_update.dict(exclude_unset=True)
+    update_data = chemical_update.dict(exclude_unset=True, exclude={"version"})
     print(f"Update data before role filtering: {update_data}")
     
     if user_role == UserRole.ADMIN:
@@ -193,84 +515,245 @@ def update_chemical_inventory(
         print("No data to update")
         return db_chemical
     
-    # Update fields
-    for field, value in update_data.items():
-        print(f"Setting {field} = {value}")
-        setattr(db_chemical, field, value)
-    
-    db_chemical.updated_by = user_uid
-    db.commit()
+    # Update fields and log changes in one transaction
+    with UnitOfWork(db, user_id=user_id, user_uid=user_uid) as uow:
+        for field, value in update_data.items():
+            if field == "quantity":
+                continue  # Written by _write_stock_fields below
+            print(f"Setting {field} = {value}")
+            setattr(db_chemical, field, value)
+        
+        db_chemical.updated_by = user_uid
+        if "quantity" in update_data or "alert_threshold" in update_data:
+            uow.flush()  # A new alert_threshold must be in place for the stock_status below
+            expected_version = chemical_update.version if chemical_update.version is not None else db_chemical.version
+            _write_stock_fields(db, chemical_id, update_data.get("quantity"), expected_version)
+        if "quantity" in update_data:
+            # The version check guarantees old_values["quantity"] was still current
+            record_movement(db, chemical_id, update_data["quantity"] - old_values["quantity"], MovementReason.UPDATE, user_uid=user_uid)
+        
+        for field, new_value in update_data.items():
+            old_value = old_values.get(field)
+            if old_value != new_value:
+                uow.log(
+                    action="update_chemical_inventory",
+                    table_modified="chemical_inventory",
+                    field_modified=field,
+                    description=f"Updated {field} for chemical: {db_chemical.name}",
+                    old_value=str(old_value),
+                    new_value=str(new_value)
+                )
     db.refresh(db_chemical)
+    if "quantity" in update_data or "alert_threshold" in update_data:
+        _evaluate_stock_alerts(db, db_chemical)
     
     print(f"Chemical updated successfully: {db_chemical.name}")
     
-    # Log changes
-    for field, new_value in update_data.items():
-        old_value = old_values.get(field)
-        if old_value != new_value:
-            log_activity(
-                db=db,
-                user_uid=user_uid,
-                action="update_chemical_inventory",
-                table_modified="chemical_inventory",
-                field_modified=field,
-                description=f"Updated {field} for chemical: {db_chemical.name}",
-                old_value=str(old_value),
-                new_value=str(new_value)
-            )
+    return db_chemical
+
+def _write_stock_fields(db: Session, chemical_id: int, quantity: Optional[float], expected_version: int):
+    """Recompute stock_status in the database, setting quantity first if given.
+    
+    A new quantity is only written while the chemical is still at expected_version
+    (and bumps it), so a concurrent adjustment can never be overwritten; raises
+    StaleVersionError otherwise.
+    """
+    if quantity is None:
+        db.execute(
+            update(ChemicalInventory).where(ChemicalInventory.id == chemical_id).values(
+                stock_status=stock_status_expression(ChemicalInventory.quantity, ChemicalInventory.alert_threshold)
+            ),
+            execution_options={"synchronize_session": False}
+        )
+        return
+    
+    updated = db.execute(
+        update(ChemicalInventory).where(
+            ChemicalInventory.id == chemical_id,
+            ChemicalInventory.version == expected_version
+        ).values(
+            quantity=quantity,
+            stock_status=stock_status_expression(literal(quantity), ChemicalInventory.alert_threshold),
+            version=ChemicalInventory.version + 1
+        ).returning(ChemicalInventory.id),
+        execution_options={"synchronize_session": False}
+    ).first()
+    if updated is None:
+        current = db.query(ChemicalInventory.version).filter(ChemicalInventory.id == chemical_id).scalar()
+        raise StaleVersionError(f"Chemical inventory item is at version {current}, not {expected_version}")
+
+def adjust_chemical_quantity(
+    db: Session,
+    chemical_id: int,
+    adjustment: ChemicalQuantityAdjust,
+    user_uid: str,
+    user_role: UserRole,
+    user_id: Optional[int] = None
+) -> Optional[ChemicalInventory]:
+    """Add a signed delta to a chemical's quantity in a single UPDATE ... RETURNING.
+    
+    The database applies the delta to the current quantity, so concurrent adjustments
+    never overwrite each other and no row lock is held across a read. The ledger
+    movement and activity log are written in the same transaction. Raises ValueError if
+    the result would go below zero, or StaleVersionError if adjustment.version is given
+    and no longer matches.
+    """
+    if user_role not in [UserRole.ADMIN, UserRole.LAB_STAFF, UserRole.PRODUCT, UserRole.ACCOUNT]:
+        raise PermissionError("Insufficient permissions to adjust chemical inventory")
+    if not adjustment.delta:
+        raise ValueError("Adjustment delta must not be zero")
+    
+    new_quantity = ChemicalInventory.quantity + adjustment.delta
+    conditions = [ChemicalInventory.id == chemical_id, new_quantity >= 0]
+    if adjustment.version is not None:
+        conditions.append(ChemicalInventory.version == adjustment.version)
+    
+    with UnitOfWork(db, user_id=user_id, user_uid=user_uid) as uow:
+        adjusted = db.execute(
+            update(ChemicalInventory).where(*conditions).values(
+                quantity=new_quantity,
+                stock_status=stock_status_expression(new_quantity, ChemicalInventory.alert_threshold),
+                version=ChemicalInventory.version + 1,
+                updated_by=user_uid
+            ).returning(ChemicalInventory.name, ChemicalInventory.quantity, ChemicalInventory.unit),
+            execution_options={"synchronize_session": False}
+        ).first()
+        
+        if adjusted is None:
+            current = db.query(ChemicalInventory.quantity, ChemicalInventory.version).filter(ChemicalInventory.id == chemical_id).first()
+            if current is None:
+                return None
+            if adjustment.version is not None and current.version != adjustment.version:
+                raise StaleVersionError(f"Chemical inventory item is at version {current.version}, not {adjustment.version}")
+            raise ValueError(f"Adjustment of {adjustment.delta} would take quantity {current.quantity} below zero")
+        
+        record_movement(
+            db,
+            chemical_id,
+            adjustment.delta,
+            MovementReason.ADJUSTMENT,
+            user_uid=user_uid,
+            transaction_id=adjustment.transaction_id,
+            reference=adjustment.reference
+        )
+        uow.log(
+            action="adjust_chemical_inventory",
+            table_modified="chemical_inventory",
+            field_modified="quantity",
+            description=f"Adjusted quantity for chemical: {adjusted.name} by {adjustment.delta:+g} {adjusted.unit}",
+            old_value=str(adjusted.quantity - adjustment.delta),
+            new_value=str(adjusted.quantity),
+            note=adjustment.reference
+        )
     
+    db_chemical = get_chemical_inventory_by_id(db, chemical_id)
+    if db_chemical:
+        _evaluate_stock_alerts(db, db_chemical)
     return db_chemical
 
+def _evaluate_stock_alerts(db: Session, db_chemical: ChemicalInventory):
+    # The inventory change is already committed; a failure here is picked up by the next stock sweep
+    try:
+        evaluate_stock_alerts(db, db_chemical)
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"⚠️ Stock alert evaluation failed for chemical {db_chemical.id}: {e}")
+
+def get_chemical_notes(
+    db: Session,
+    chemical_id: int,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """Get one page of a chemical's note history (newest first) and the cursor for the next page"""
+    query = db.query(
+        ChemicalNote.id,
+        ChemicalNote.chemical_id,
+        ChemicalNote.author_uid,
+        ChemicalNote.created_at,
+        ChemicalNote.body,
+        User.first_name,
+        User.last_name
+    ).outerjoin(User, ChemicalNote.author_uid == User.uid).filter(ChemicalNote.chemical_id == chemical_id)
+    
+    if cursor:
+        (last_id,) = decode_cursor(cursor, "id")
+        query = query.filter(ChemicalNote.id < last_id)
+    
+    rows = query.order_by(ChemicalNote.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    notes = [
+        {
+            "id": row.id,
+            "chemical_id": row.chemical_id,
+            "author_uid": row.author_uid,
+            "author_name": f"{row.first_name} {row.last_name or ''}".strip() if row.first_name else None,
+            "created_at": row.created_at,
+            "body": row.body
+        }
+        for row in rows
+    ]
+    
+    next_cursor = encode_cursor("id", rows[-1].id) if has_more and rows else None
+    return notes, next_cursor
+
 def add_note_to_chemical_inventory(
     db: Session, 
     chemical_id: int, 
     note_data: ChemicalInventoryAddNote, 
     user_uid: str,
-    user_role: UserRole
-) -> Optional[ChemicalInventory]:
-    """Add a note to a chemical inventory item (append-only)"""
+    user_role: UserRole,
+    user_id: Optional[int] = None,
+    author_name: Optional[str] = None
+) -> Optional[dict]:
+    """Add a note to a chemical inventory item's history (append-only)
+    
+    author_name is the caller's display name, echoed in the response so the author
+    does not have to be looked up again.
+    """
     
     db_chemical = get_chemical_inventory_by_id(db, chemical_id)
     if not db_chemical:
         return None
     
-    # Get user info for the note
-    user = db.query(User).filter(User.uid == user_uid).first()
-    user_name = f"{user.first_name} {user.last_name or ''}".strip() if user else user_uid
-    
-    # All users can add notes
-    current_notes = db_chemical.notes or ""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    new_note = f"[{timestamp}] {user_name}: {note_data.note}"
-    
-    if current_notes:
-        updated_notes = f"{current_notes}\n{new_note}"
-    else:
-        updated_notes = new_note
-    
-    db_chemical.notes = updated_notes
-    db_chemical.updated_by = user_uid
-    db.commit()
-    db.refresh(db_chemical)
-    
-    # Log the note addition
-    log_activity(
-        db=db,
-        user_uid=user_uid,
-        action="add_note_chemical_inventory",
-        table_modified="chemical_inventory",
-        field_modified="notes",
-        description=f"Added note to chemical: {db_chemical.name}",
-        new_value=note_data.note
+    # All users can add notes. Each note is its own row, so the cost of adding one
+    # does not grow with the length of the history.
+    db_note = ChemicalNote(
+        chemical_id=chemical_id,
+        author_uid=user_uid,
+        body=note_data.note
     )
-    
-    return db_chemical
+    with UnitOfWork(db, user_id=user_id, user_uid=user_uid) as uow:
+        uow.add(db_note)
+        db_chemical.updated_by = user_uid
+        
+        # Log the note addition
+        uow.log(
+            action="add_note_chemical_inventory",
+            table_modified="chemical_notes",
+            field_modified="body",
+            description=f"Added note to chemical: {db_chemical.name}",
+            new_value=note_data.note
+        )
+    db.refresh(db_note)
+    
+    return {
+        "id": db_note.id,
+        "chemical_id": db_note.chemical_id,
+        "author_uid": db_note.author_uid,
+        "author_name": author_name,
+        "created_at": db_note.created_at,
+        "body": db_note.body
+    }
 
 def delete_chemical_inventory(
     db: Session, 
     chemical_id: int, 
     user_uid: str,
-    user_role: UserRole
+    user_role: UserRole,
+    user_id: Optional[int] = None
 ) -> bool:
     """Delete a chemical inventory item with role-based access control"""
     
@@ -284,44 +767,17 @@ def delete_chemical_inventory(
     
     chemical_name = db_chemical.name
     
-    # Log before deletion
-    log_activity(
-        db=db,
-        user_uid=user_uid,
-        action="delete_chemical_inventory",
-        table_modified="chemical_inventory",
-        description=f"Deleted chemical inventory item: {chemical_name}",
-        old_value=f"ID: {chemical_id}, Name: {chemical_name}"
-    )
-    
-    db.delete(db_chemical)
-    db.commit()
+    with UnitOfWork(db, user_id=user_id, user_uid=user_uid) as uow:
+        # Alerts (resolved stock alerts included) are kept, unlinked from the chemical
+        detach_chemical_alerts(db, chemical_id)
+        uow.log(
+            action="delete_chemical_inventory",
+            table_modified="chemical_inventory",
+            description=f"Deleted chemical inventory item: {chemical_name}",
+            old_value=f"ID: {chemical_id}, Name: {chemical_name}"
+        )
+        # The ledger outlives the chemical; close it out at zero
+        record_movement(db, chemical_id, -db_chemical.quantity, MovementReason.REMOVAL, user_uid=user_uid)
+        uow.delete(db_chemical)
     
     return True
-
-def log_activity(
-    db: Session,
-    user_uid: str,
-    action: str,
-    description: str,
-    table_modified: str = None,
-    field_modified: str = None,
-    old_value: str = None,
-    new_value: str = None
-):
-    """Helper function to log activities"""
-    # Get user ID from UID
-    user = db.query(User).filter(User.uid == user_uid).first()
-    user_id = user.id if user else None
-    
-    activity_log = ActivityLog(
-        user_id=user_id,
-        action=action,
-        description=description,
-        table_modified=table_modified,
-        field_modified=field_modified,
-        old_value=old_value,
-        new_value=new_value
-    )
-    db.add(activity_log)
-    db.commit() 
\ No newline at end of file
@@ -0,0 +1,88 @@
+from sqlalchemy import select
+from sqlalchemy.sql import Select
+from typing import Optional
+from datetime import datetime
+from app.models.chemical_inventory import ChemicalInventory
+from app.models.account_transactions import AccountTransaction
+from app.models.activity_log import ActivityLog
+from app.models.user import User
+
+EXPORT_RESOURCES = ("chemicals", "transactions", "logs")
+
+def build_chemicals_export() -> Select:
+    """All chemical inventory items with the updating user's email"""
+    return select(
+        ChemicalInventory.id,
+        ChemicalInventory.name,
+        ChemicalInventory.quantity,
+        ChemicalInventory.unit,
+        ChemicalInventory.formulation,
+        ChemicalInventory.notes,
+        ChemicalInventory.alert_threshold,
+        ChemicalInventory.supplier,
+        ChemicalInventory.location,
+        ChemicalInventory.last_updated,
+        ChemicalInventory.updated_by,
+        User.email.label("updated_by_email")
+    ).outerjoin(User, ChemicalInventory.updated_by == User.uid).order_by(ChemicalInventory.id)
+
+def build_transactions_export(chemical_id: Optional[int] = None) -> Select:
+    """Account transactions, optionally for one chemical (same filter as GET /account/transactions)"""
+    statement = select(
+        AccountTransaction.id,
+        AccountTransaction.chemical_id,
+        ChemicalInventory.name.label("chemical_name"),
+        AccountTransaction.transaction_type,
+        AccountTransaction.quantity,
+        AccountTransaction.unit,
+        AccountTransaction.amount,
+        AccountTransaction.currency,
+        AccountTransaction.supplier,
+        AccountTransaction.purchase_date,
+        AccountTransaction.delivery_date,
+        AccountTransaction.status,
+        AccountTransaction.notes,
+        AccountTransaction.created_by,
+        AccountTransaction.created_at,
+        AccountTransaction.updated_at
+    ).outerjoin(ChemicalInventory, AccountTransaction.chemical_id == ChemicalInventory.id)
+    
+    if chemical_id:
+        statement = statement.where(AccountTransaction.chemical_id == chemical_id)
+    
+    return statement.order_by(AccountTransaction.id)
+
+def build_logs_export(
+    user_id: Optional[int] = None,
+    action: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> Select:
+    """Activity logs with the same filters as GET /admin/logs"""
+    statement = select(
+        ActivityLog.id,
+        ActivityLog.timestamp,
+        ActivityLog.user_id,
+        User.email.label("user_email"),
+        ActivityLog.action,
+        ActivityLog.description,
+        ActivityLog.table_modified,
+        ActivityLog.field_modified,
+        ActivityLog.old_value,
+        ActivityLog.new_value,
+        ActivityLog.note
+    ).outerjoin(User, ActivityLog.user_id == User.id)
+    
+    if user_id:
+        statement = statement.where(ActivityLog.user_id == user_id)
+    
+    if action:
+        statement = statement.where(ActivityLog.action == action)
+    
+    if start_date:
+        statement = statement.where(ActivityLog.timestamp >= start_date)
+    
+    if end_date:
+        statement = statement.where(ActivityLog.timestamp <= end_date)
+    
+    return statement.order_by(ActivityLog.timestamp.desc(), ActivityLog.id.desc())
@@ -4,6 +4,7 @@ from typing import List, Optional
 from app.models.formulation_details import FormulationDetails
 from app.models.chemical_inventory import ChemicalInventory
 from app.models.activity_log import ActivityLog
+from app.crud.unit_of_work import UnitOfWork
 from app.models.user import User, UserRole
 from app.schema.formulation_details import FormulationDetailsCreate, FormulationDetailsUpdate, FormulationDetailsAddNote
 from datetime import datetime
@@ -72,7 +73,8 @@ def create_formulation_details(
     db: Session, 
     formulation: FormulationDetailsCreate, 
     user_uid: str,
-    user_role: UserRole
+    user_role: UserRole,
+    user_id: Optional[int] = None
 ) -> FormulationDetails:
     """Create a new formulation detail with role-based access control"""
     
@@ -89,20 +91,19 @@ def create_formulation_details(
         **formulation.dict(),
         updated_by=user_uid
     )
-    db.add(db_formulation)
-    db.commit()
+    with UnitOfWork(db, user_id=user_id, user_uid=user_uid) as uow:
+        uow.add(db_formulation)
+        uow.flush()  # Assigns the id referenced by the audit row
+        
+        # Log the activity
+        uow.log(
+            action="create_formulation_details",
+            table_modified="formulation_details",
+            description=f"Created formulation detail: {formulation.component_name} for chemical: {chemical.name}",
+            new_value=f"ID: {db_formulation.id}, Component: {formulation.component_name}, Amount: {formulation.amount} {formulation.unit}"
+        )
     db.refresh(db_formulation)
     
-    # Log the activity
-    log_activity(
-        db=db,
-        user_uid=user_uid,
-        action="create_formulation_details",
-        table_modified="formulation_details",
-        description=f"Created formulation detail: {formulation.component_name} for chemical: {chemical.name}",
-        new_value=f"ID: {db_formulation.id}, Component: {formulation.component_name}, Amount: {formulation.amount} {formulation.unit}"
-    )
-    
     return db_formulation
 
 def update_formulation_details(
@@ -110,7 +111,8 @@ def update_formulation_details(
     formulation_id: int, 
     formulation_update: FormulationDetailsUpdate, 
     user_uid: str,
-    user_role: UserRole
+    user_role: UserRole,
+    user_id: Optional[int] = None
 ) -> Optional[FormulationDetails]:
     """Update a formulation detail with role-based access control"""
     
@@ -148,29 +150,26 @@ def update_formulation_details(
     if not update_data:
         return db_formulation
     
-    # Update fields
-    for field, value in update_data.items():
-        setattr(db_formulation, field, value)
-    
-    db_formulation.updated_by = user_uid
-    db.commit()
+    # Update fields and log changes in one transaction
+    with UnitOfWork(db, user_id=user_id, user_uid=user_uid) as uow:
+        for field, value in update_data.items():
+            setattr(db_formulation, field, value)
+        
+        db_formulation.updated_by = user_uid
+        
+        for field, new_value in update_data.items():
+            old_value = old_values.get(field)
+            if old_value != new_value:
+                uow.log(
+                    action="update_formulation_details",
+                    table_modified="formulation_details",
+                    field_modified=field,
+                    description=f"Updated {field} for formulation: {db_formulation.component_name}",
+                    old_value=str(old_value),
+                    new_value=str(new_value)
+                )
     db.refresh(db_formulation)
     
-    # Log changes
-    for field, new_value in update_data.items():
-        old_value = old_values.get(field)
-        if old_value != new_value:
-            log_activity(
-                db=db,
-                user_uid=user_uid,
-                action="update_formulation_details",
-                table_modified="formulation_details",
-                field_modified=field,
-                description=f"Updated {field} for formulation: {db_formulation.component_name}",
-                old_value=str(old_value),
-                new_value=str(new_value)
-            )
-    
     return db_formulation
 
 def add_note_to_formulation_details(
@@ -178,7 +177,8 @@ def add_note_to_formulation_details(
     formulation_id: int, 
     note_data: FormulationDetailsAddNote, 
     user_uid: str,
-    user_role: UserRole
+    user_role: UserRole,
+    user_id: Optional[int] = None
 ) -> Optional[FormulationDetails]:
     """Add a note to a formulation detail (append-only)"""
     
@@ -200,29 +200,28 @@ def add_note_to_formulation_details(
     else:
         updated_notes = new_note
     
-    db_formulation.notes = updated_notes
-    db_formulation.updated_by = user_uid
-    db.commit()
+    with UnitOfWork(db, user_id=user_id or (user.id if user else None)) as uow:
+        db_formulation.notes = updated_notes
+        db_formulation.updated_by = user_uid
+        
+        # Log the note addition
+        uow.log(
+            action="add_note_formulation_details",
+            table_modified="formulation_details",
+            field_modified="notes",
+            description=f"Added note to formulation: {db_formulation.component_name}",
+            new_value=note_data.note
+        )
     db.refresh(db_formulation)
     
-    # Log the note addition
-    log_activity(
-        db=db,
-        user_uid=user_uid,
-        action="add_note_formulation_details",
-        table_modified="formulation_details",
-        field_modified="notes",
-        description=f"Added note to formulation: {db_formulation.component_name}",
-        new_value=note_data.note
-    )
-    
     return db_formulation
 
 def delete_formulation_details(
     db: Session, 
     formulation_id: int, 
     user_uid: str,
-    user_role: UserRole
+    user_role: UserRole,
+    user_id: Optional[int] = None
 ) -> bool:
     """Delete a formulation detail with role-based access control"""
     
@@ -236,44 +235,13 @@ def delete_formulation_details(
     
     component_name = db_formulation.component_name
     
-    # Log before deletion
-    log_activity(
-        db=db,
-        user_uid=user_uid,
-        action="delete_formulation_details",
-        table_modified="formulation_details",
-        description=f"Deleted formulation detail: {component_name}",
-        old_value=f"ID: {formulation_id}, Component: {component_name}"
-    )
-    
-    db.delete(db_formulation)
-    db.commit()
+    with UnitOfWork(db, user_id=user_id, user_uid=user_uid) as uow:
+        uow.log(
+            action="delete_formulation_details",
+            table_modified="formulation_details",
+            description=f"Deleted formulation detail: {component_name}",
+            old_value=f"ID: {formulation_id}, Component: {component_name}"
+        )
+        uow.delete(db_formulation)
     
     return True
-
-def log_activity(
-    db: Session,
-    user_uid: str,
-    action: str,
-    description: str,
-    table_modified: str = None,
-    field_modified: str = None,
-    old_value: str = None,
-    new_value: str = None
-):
-    """Helper function to log activities"""
-    # Get user ID from UID
-    user = db.query(User).filter(User.uid == user_uid).first()
-    user_id = user.id if user else None
-    
-    activity_log = ActivityLog(
-        user_id=user_id,
-        action=action,
-        description=description,
-        table_modified=table_modified,
-        field_modified=field_modified,
-        old_value=old_value,
-        new_value=new_value
-    )
-    db.add(activity_log)
-    db.commit() 
\ No newline at end of file
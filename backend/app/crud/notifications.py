@@ -1,7 +1,16 @@
-from sqlalchemy.orm import Session
-from app.models.notifications import Notification, NotificationCategory, NotificationPriority, NotificationStatus
+from sqlalchemy import or_, not_, exists, select, update
+from sqlalchemy.orm import Session, selectinload
+from app.models.notifications import Notification, NotificationRecipient, NotificationCategory, NotificationPriority, NotificationStatus
+from app.models.user import User
 from app.schema.notifications import NotificationCreate, NotificationUpdate, NotificationFilter
-from typing import List, Optional
+from app.schema.alerts import BulkAction
+from app.crud.pagination import encode_cursor, decode_cursor, MAX_FEED_PAGE_SIZE
+from app.services.notification_hub import notification_hub
+from app.services.unread_counters import unread_counters
+from typing import List, Optional, Tuple
+from collections import Counter
+from datetime import datetime
+import pytz
 import json
 
 def create_notification(db: Session, notification: NotificationCreate, user_id: Optional[str] = None, created_by: Optional[str] = None) -> Notification:
@@ -17,17 +26,48 @@ def create_notification(db: Session, notification: NotificationCreate, user_id:
         created_by=created_by,
         recipients=json.dumps(notification.recipients) if notification.recipients else None
     )
+    # The message is stored once; each recipient gets a delivery/read-state row.
+    # Everything goes out in one INSERT batch and one COMMIT.
+    roles = list(dict.fromkeys(notification.recipients or []))
+    user_uids = list(dict.fromkeys(notification.recipient_users or []))
+    if user_uids and roles:
+        # Users already reached through one of the roles would otherwise see it twice
+        covered = db.query(User.uid).filter(User.uid.in_(user_uids), User.role.in_(roles)).all()
+        user_uids = [uid for uid in user_uids if uid not in {uid for (uid,) in covered}]
+    db_notification.recipient_rows = (
+        [NotificationRecipient(role=role, is_read=False) for role in roles] +
+        [NotificationRecipient(user_uid=uid, is_read=False) for uid in user_uids]
+    )
     db.add(db_notification)
     db.commit()
     db.refresh(db_notification)
+    
+    _apply_unread_delta(Counter(), _unread_keys(db_notification))
+    # Push to connected /notifications/stream clients
+    notification_hub.publish_notification(db_notification)
     return db_notification
 
-def get_notifications(db: Session, skip: int = 0, limit: int = 100, user_role: Optional[str] = None, filters: Optional[NotificationFilter] = None) -> List[Notification]:
+def _unread_keys(notification: Notification) -> Counter:
+    """Counter keys of the recipients for whom this notification is currently unread"""
+    if notification.is_dismissed:
+        return Counter()
+    return Counter(row.counter_key for row in notification.recipient_rows if not row.is_read)
+
+def _apply_unread_delta(before: Counter, after: Counter):
+    for key in set(before) | set(after):
+        delta = after[key] - before[key]
+        if delta:
+            unread_counters.add_notification([key], delta)
+
+# List queries load every page's recipient rows in one extra SELECT ... IN
+_with_recipients = selectinload(Notification.recipient_rows)
+
+def get_notifications(db: Session, skip: int = 0, limit: int = 100, user_role: Optional[str] = None, filters: Optional[NotificationFilter] = None, user_uid: Optional[str] = None) -> List[Notification]:
     query = db.query(Notification)
     
-    # Filter by user role if specified
+    # Filter by user role (and the user's own notifications) if specified
     if user_role:
-        query = query.filter(Notification.recipients.contains(user_role))
+        query = _for_role(query, user_role, user_uid)
     
     # Apply additional filters
     if filters:
@@ -40,11 +80,12 @@ def get_notifications(db: Session, skip: int = 0, limit: int = 100, user_role: O
         if filters.severity:
             query = query.filter(Notification.severity == filters.severity)
         if filters.is_read is not None:
-            query = query.filter(Notification.is_read == filters.is_read)
+            is_read_column = NotificationRecipient.is_read if user_role else Notification.is_read
+            query = query.filter(is_read_column == filters.is_read)
         if filters.is_dismissed is not None:
             query = query.filter(Notification.is_dismissed == filters.is_dismissed)
     
-    return query.order_by(Notification.timestamp.desc()).offset(skip).limit(limit).all()
+    return query.options(_with_recipients).order_by(_newest_first(user_role)).offset(skip).limit(limit).all()
 
 def get_notification(db: Session, notification_id: int) -> Optional[Notification]:
     return db.query(Notification).filter(Notification.id == notification_id).first()
@@ -52,11 +93,16 @@ def get_notification(db: Session, notification_id: int) -> Optional[Notification
 def update_notification(db: Session, notification_id: int, notification_update: NotificationUpdate) -> Optional[Notification]:
     db_notification = get_notification(db, notification_id)
     if db_notification:
+        before = _unread_keys(db_notification)
         update_data = notification_update.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_notification, field, value)
+        if "is_read" in update_data:
+            # A notification-level read/unread applies to every recipient
+            _set_recipients_read(db_notification.recipient_rows, update_data["is_read"])
         db.commit()
         db.refresh(db_notification)
+        _apply_unread_delta(before, _unread_keys(db_notification))
     return db_notification
 
 def set_delete_comment(db: Session, notification_id: int, comment: str) -> Optional[Notification]:
@@ -71,52 +117,243 @@ def delete_notification(db: Session, notification_id: int) -> bool:
     db_notification = get_notification(db, notification_id)
     if not db_notification:
         return False
+    before = _unread_keys(db_notification)
     db.delete(db_notification)
     db.commit()
+    _apply_unread_delta(before, Counter())
     return True
 
 def dismiss_notification(db: Session, notification_id: int) -> Optional[Notification]:
     return update_notification(db, notification_id, NotificationUpdate(is_dismissed=True))
 
-def mark_notification_read(db: Session, notification_id: int) -> Optional[Notification]:
-    return update_notification(db, notification_id, NotificationUpdate(is_read=True))
+def mark_notification_read(
+    db: Session,
+    notification_id: int,
+    user_role: Optional[str] = None,
+    user_uid: Optional[str] = None
+) -> Optional[Notification]:
+    """Mark a notification read for the caller's recipient rows (their role and themselves).
+
+    Callers that are not recipients (e.g. an admin reviewing everything), or calls without
+    a role/uid, mark it read for every recipient. The notification's own is_read flag is
+    set once no recipient has it unread.
+    """
+    db_notification = get_notification(db, notification_id)
+    if not db_notification:
+        return None
+
+    before = _unread_keys(db_notification)
+    rows = [
+        row for row in db_notification.recipient_rows
+        if (user_role is not None and row.role == user_role) or (user_uid is not None and row.user_uid == user_uid)
+    ] or db_notification.recipient_rows
+    _set_recipients_read(rows, True)
+    db_notification.is_read = all(row.is_read for row in db_notification.recipient_rows)
+    db.commit()
+    db.refresh(db_notification)
+    _apply_unread_delta(before, _unread_keys(db_notification))
+    return db_notification
+
+def _set_recipients_read(rows: List[NotificationRecipient], is_read: bool):
+    now = datetime.now(pytz.UTC)
+    for row in rows:
+        if row.is_read != is_read:
+            row.is_read = is_read
+            row.read_at = now if is_read else None
+
+def bulk_update_notifications(
+    db: Session,
+    action: BulkAction,
+    ids: Optional[List[int]] = None,
+    filters: Optional[NotificationFilter] = None,
+    user_role: Optional[str] = None,
+    user_uid: Optional[str] = None
+) -> List[int]:
+    """Apply a read/unread/dismiss action to many notifications with set-based UPDATEs.
+
+    Targets the given ids, or every notification matching filters when ids is None,
+    limited to the caller's inbox when user_role is given (admins pass None and act for
+    every recipient). Read/unread change the caller's recipient rows with one
+    UPDATE ... RETURNING and then resync notifications.is_read; dismiss is a single
+    UPDATE on notifications. Returns the ids of the notifications that changed.
+    """
+    if ids is None and filters is None:
+        raise ValueError("Either ids or a filter is required")
+
+    target = [Notification.id.in_(ids)] if ids is not None else _filter_conditions(filters, per_recipient=bool(user_role))
+    if user_role:
+        in_inbox = [_addressed_to(user_role, user_uid)]
+        if ids is None and filters.is_read is not None:
+            # Read state is per recipient: match the caller's copy, as get_notifications does
+            in_inbox.append(NotificationRecipient.is_read == filters.is_read)
+        target.append(Notification.id.in_(
+            select(NotificationRecipient.notification_id).where(*in_inbox)
+        ))
+
+    if action == BulkAction.DISMISS:
+        changed_ids = db.execute(
+            update(Notification).where(*target, Notification.is_dismissed == False)
+            .values(is_dismissed=True).returning(Notification.id),
+            execution_options={"synchronize_session": False}
+        ).scalars().all()
+        # Every recipient that still had them unread loses them from the count
+        no_longer_unread = Counter(
+            _counter_key(role, uid) for role, uid in db.query(NotificationRecipient.role, NotificationRecipient.user_uid).filter(
+                NotificationRecipient.notification_id.in_(changed_ids),
+                NotificationRecipient.is_read == False
+            )
+        ) if changed_ids else Counter()
+        db.commit()
+        _apply_unread_delta(no_longer_unread, Counter())
+        return list(changed_ids)
+
+    is_read = action == BulkAction.READ
+    recipient_conditions = [
+        NotificationRecipient.notification_id.in_(select(Notification.id).where(*target)),
+        NotificationRecipient.is_read == (not is_read)
+    ]
+    if user_role:
+        recipient_conditions.append(_addressed_to(user_role, user_uid))
+    rows = db.execute(
+        update(NotificationRecipient).where(*recipient_conditions)
+        .values(is_read=is_read, read_at=datetime.now(pytz.UTC) if is_read else None)
+        .returning(NotificationRecipient.notification_id, NotificationRecipient.role, NotificationRecipient.user_uid),
+        execution_options={"synchronize_session": False}
+    ).all()
+    changed_ids = sorted({notification_id for notification_id, _, _ in rows})
+
+    dismissed = set()
+    if changed_ids:
+        # A notification is read once none of its recipients has it unread
+        has_unread = exists().where(
+            NotificationRecipient.notification_id == Notification.id,
+            NotificationRecipient.is_read == False
+        )
+        db.execute(
+            update(Notification).where(Notification.id.in_(changed_ids)).values(is_read=not_(has_unread)),
+            execution_options={"synchronize_session": False}
+        )
+        dismissed = set(db.scalars(
+            select(Notification.id).where(Notification.id.in_(changed_ids), Notification.is_dismissed == True)
+        ))
+    db.commit()
+
+    # Dismissed notifications are not counted either way
+    changed = Counter(_counter_key(role, uid) for notification_id, role, uid in rows if notification_id not in dismissed)
+    if is_read:
+        _apply_unread_delta(changed, Counter())
+    else:
+        _apply_unread_delta(Counter(), changed)
+    return changed_ids
+
+def _filter_conditions(filters: NotificationFilter, per_recipient: bool = False) -> list:
+    """Conditions on notifications for a filter; with per_recipient, is_read is left to the
+    caller to apply to the recipient rows"""
+    conditions = []
+    if filters.category:
+        conditions.append(Notification.category == filters.category)
+    if filters.priority:
+        conditions.append(Notification.priority == filters.priority)
+    if filters.status:
+        conditions.append(Notification.status == filters.status)
+    if filters.severity:
+        conditions.append(Notification.severity == filters.severity)
+    if filters.is_read is not None and not per_recipient:
+        conditions.append(Notification.is_read == filters.is_read)
+    if filters.is_dismissed is not None:
+        conditions.append(Notification.is_dismissed == filters.is_dismissed)
+    return conditions
+
+def _counter_key(role: Optional[str], user_uid: Optional[str]) -> str:
+    # Same key as NotificationRecipient.counter_key, for rows returned as tuples
+    return role if role is not None else f"user:{user_uid}"
 
-def get_unread_notifications(db: Session, user_role: Optional[str] = None) -> List[Notification]:
-    query = db.query(Notification).filter(Notification.is_read == False)
+def get_unread_notifications_page(
+    db: Session,
+    user_role: Optional[str] = None,
+    user_uid: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> Tuple[List[Notification], Optional[str]]:
+    """One newest-first page of unread notifications and the cursor for the next page"""
+    query = db.query(Notification)
     
     if user_role:
-        query = query.filter(Notification.recipients.contains(user_role))
+        query = _for_role(query, user_role, user_uid).filter(NotificationRecipient.is_read == False)
+    else:
+        query = query.filter(Notification.is_read == False)
     
-    return query.order_by(Notification.timestamp.desc()).all()
+    return _feed_page(query, user_role, limit, cursor)
 
-def get_active_notifications(db: Session, user_role: Optional[str] = None) -> List[Notification]:
+def get_active_notifications_page(
+    db: Session,
+    user_role: Optional[str] = None,
+    user_uid: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> Tuple[List[Notification], Optional[str]]:
+    """One newest-first page of undismissed notifications and the cursor for the next page"""
     query = db.query(Notification).filter(Notification.is_dismissed == False)
     
     if user_role:
-        query = query.filter(Notification.recipients.contains(user_role))
+        query = _for_role(query, user_role, user_uid)
+    
+    return _feed_page(query, user_role, limit, cursor)
+
+def _feed_page(query, user_role: Optional[str], limit: int, cursor: Optional[str]) -> Tuple[List[Notification], Optional[str]]:
+    """Keyset page on the notification id, capped at MAX_FEED_PAGE_SIZE rows"""
+    limit = min(limit, MAX_FEED_PAGE_SIZE)
+    # With a role filter, page on the recipient row's copy so its partial index is used
+    id_column = NotificationRecipient.notification_id if user_role else Notification.id
+    if cursor:
+        (last_id,) = decode_cursor(cursor, "id")
+        query = query.filter(id_column < last_id)
+    
+    # Fetch one extra row to know whether another page exists
+    rows = query.options(_with_recipients).order_by(id_column.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
     
-    return query.order_by(Notification.timestamp.desc()).all()
+    next_cursor = encode_cursor("id", rows[-1].id) if has_more and rows else None
+    return rows, next_cursor
 
 def get_notifications_by_status(db: Session, status: NotificationStatus, user_role: Optional[str] = None) -> List[Notification]:
     query = db.query(Notification).filter(Notification.status == status)
     
     if user_role:
-        query = query.filter(Notification.recipients.contains(user_role))
+        query = _for_role(query, user_role)
     
-    return query.order_by(Notification.timestamp.desc()).all()
+    return query.options(_with_recipients).order_by(_newest_first(user_role)).all()
 
 def get_notifications_by_priority(db: Session, priority: NotificationPriority, user_role: Optional[str] = None) -> List[Notification]:
     query = db.query(Notification).filter(Notification.priority == priority)
     
     if user_role:
-        query = query.filter(Notification.recipients.contains(user_role))
+        query = _for_role(query, user_role)
     
-    return query.order_by(Notification.timestamp.desc()).all()
+    return query.options(_with_recipients).order_by(_newest_first(user_role)).all()
 
 def get_notifications_by_category(db: Session, category: NotificationCategory, user_role: Optional[str] = None) -> List[Notification]:
     query = db.query(Notification).filter(Notification.category == category)
     
     if user_role:
-        query = query.filter(Notification.recipients.contains(user_role))
+        query = _for_role(query, user_role)
     
-    return query.order_by(Notification.timestamp.desc()).all() 
\ No newline at end of file
+    return query.options(_with_recipients).order_by(_newest_first(user_role)).all()
+
+def _for_role(query, user_role: str, user_uid: Optional[str] = None):
+    """Restrict a Notification query to one role's inbox (plus the user's own, if given)"""
+    return query.join(NotificationRecipient, NotificationRecipient.notification_id == Notification.id).filter(
+        _addressed_to(user_role, user_uid)
+    )
+
+def _addressed_to(user_role: str, user_uid: Optional[str] = None):
+    """Recipient rows belonging to a role (and to the user, if given)"""
+    recipient = NotificationRecipient.role == user_role
+    if user_uid:
+        recipient = or_(recipient, NotificationRecipient.user_uid == user_uid)
+    return recipient
+
+def _newest_first(user_role: Optional[str]):
+    # With a role filter, order on the recipient row's copy so the composite index is used
+    return NotificationRecipient.timestamp.desc() if user_role else Notification.timestamp.desc()
@@ -0,0 +1,28 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List
+
+# Hard cap on the page size of feed endpoints, whatever the client asks for
+MAX_FEED_PAGE_SIZE = 200
+# Hard cap on the page size of GET /chemicals
+MAX_CHEMICAL_PAGE_SIZE = 1000
+
+def encode_cursor(order_by: str, *values: Any) -> str:
+    """Encode the sort key and the last row's keyset values into an opaque cursor"""
+    payload = [order_by] + [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, order_by: str) -> List[Any]:
+    """Decode a cursor produced by encode_cursor for the given sort key"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, binascii.Error):
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(payload, list) or not payload or payload[0] != order_by:
+        raise ValueError(f"Cursor does not match ordering '{order_by}'")
+
+    return payload[1:]
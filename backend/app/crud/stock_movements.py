@@ -0,0 +1,162 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import case, func, insert, select, tuple_
+from typing import Iterable, List, Optional, Tuple
+from datetime import datetime, timedelta
+import pytz
+from app.models.stock_movements import StockMovement, StockBalanceSnapshot, MovementReason
+from app.models.user import User
+from app.crud.pagination import encode_cursor, decode_cursor
+
+def record_movement(
+    db: Session,
+    chemical_id: int,
+    delta: float,
+    reason: MovementReason,
+    user_uid: Optional[str] = None,
+    transaction_id: Optional[int] = None,
+    reference: Optional[str] = None
+) -> Optional[StockMovement]:
+    """Add a ledger row to the session; the caller commits it together with the quantity change"""
+    if not delta:
+        return None
+    movement = StockMovement(
+        chemical_id=chemical_id,
+        delta=delta,
+        reason=reason.value,
+        transaction_id=transaction_id,
+        reference=reference,
+        user_uid=user_uid
+    )
+    db.add(movement)
+    return movement
+
+def record_movements(db: Session, movements: Iterable[dict]):
+    """Multi-row insert of ledger rows (chemical_id, delta, reason, ...), for bulk writes"""
+    rows = [movement for movement in movements if movement["delta"]]
+    if rows:
+        db.execute(insert(StockMovement), rows)
+
+def get_stock_movements(
+    db: Session,
+    chemical_id: int,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """Get one page of a chemical's stock movements (newest first) and the cursor for the next page"""
+    query = db.query(
+        StockMovement,
+        User.first_name,
+        User.last_name
+    ).outerjoin(User, StockMovement.user_uid == User.uid).filter(StockMovement.chemical_id == chemical_id)
+    
+    if cursor:
+        (last_id,) = decode_cursor(cursor, "id")
+        query = query.filter(StockMovement.id < last_id)
+    
+    rows = query.order_by(StockMovement.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    movements = [
+        {
+            "id": movement.id,
+            "chemical_id": movement.chemical_id,
+            "delta": movement.delta,
+            "reason": movement.reason,
+            "transaction_id": movement.transaction_id,
+            "reference": movement.reference,
+            "user_uid": movement.user_uid,
+            "user_name": f"{first_name} {last_name or ''}".strip() if first_name else None,
+            "created_at": movement.created_at
+        }
+        for movement, first_name, last_name in rows
+    ]
+    
+    next_cursor = encode_cursor("id", rows[-1][0].id) if has_more and rows else None
+    return movements, next_cursor
+
+def get_balance_at(db: Session, chemical_id: int, at: datetime) -> float:
+    """Quantity of a chemical at a point in time: the nearest earlier snapshot plus one
+    indexed range sum over the movements recorded after it"""
+    snapshot = db.query(StockBalanceSnapshot).filter(
+        StockBalanceSnapshot.chemical_id == chemical_id,
+        StockBalanceSnapshot.as_of <= at
+    ).order_by(StockBalanceSnapshot.as_of.desc(), StockBalanceSnapshot.id.desc()).first()
+    
+    query = db.query(func.coalesce(func.sum(StockMovement.delta), 0.0)).filter(
+        StockMovement.chemical_id == chemical_id,
+        StockMovement.created_at <= at
+    )
+    if snapshot:
+        query = query.filter(StockMovement.id > snapshot.last_movement_id)
+    return (snapshot.balance if snapshot else 0.0) + query.scalar()
+
+def get_consumption_series(db: Session, chemical_id: int, start: datetime, end: datetime) -> List[dict]:
+    """Daily stock received and consumed for a chemical between start and end.
+    
+    Removals (the chemical being deleted) are not consumption and are left out.
+    """
+    day = func.date(StockMovement.created_at)
+    rows = db.query(
+        day.label("day"),
+        func.sum(case((StockMovement.delta > 0, StockMovement.delta), else_=0.0)).label("received"),
+        func.sum(case((StockMovement.delta < 0, -StockMovement.delta), else_=0.0)).label("consumed")
+    ).filter(
+        StockMovement.chemical_id == chemical_id,
+        StockMovement.created_at >= start,
+        StockMovement.created_at < end,
+        StockMovement.reason != MovementReason.REMOVAL.value
+    ).group_by(day).order_by(day).all()
+    
+    return [
+        {"day": row.day, "received": row.received, "consumed": row.consumed, "net": row.received - row.consumed}
+        for row in rows
+    ]
+
+def take_balance_snapshots(db: Session, settle_seconds: float = 60) -> int:
+    """Snapshot the balance of every chemical with movements since its last snapshot.
+    
+    Movements younger than settle_seconds are left for the next run, so a transaction
+    that is still committing cannot slip in below a snapshotted movement id.
+    Returns the number of snapshots written.
+    """
+    cutoff_id = db.query(func.max(StockMovement.id)).filter(
+        StockMovement.created_at <= datetime.now(pytz.UTC) - timedelta(seconds=settle_seconds)
+    ).scalar()
+    if cutoff_id is None:
+        return 0
+    
+    latest = select(
+        StockBalanceSnapshot.chemical_id,
+        func.max(StockBalanceSnapshot.last_movement_id).label("last_movement_id")
+    ).group_by(StockBalanceSnapshot.chemical_id).subquery()
+    
+    pending = db.query(
+        StockMovement.chemical_id,
+        func.max(StockMovement.id).label("last_movement_id"),
+        func.max(StockMovement.created_at).label("as_of"),
+        func.sum(StockMovement.delta).label("delta")
+    ).outerjoin(latest, latest.c.chemical_id == StockMovement.chemical_id).filter(
+        StockMovement.id > func.coalesce(latest.c.last_movement_id, 0),
+        StockMovement.id <= cutoff_id
+    ).group_by(StockMovement.chemical_id).all()
+    if not pending:
+        return 0
+    
+    previous = dict(db.query(StockBalanceSnapshot.chemical_id, StockBalanceSnapshot.balance).filter(
+        tuple_(StockBalanceSnapshot.chemical_id, StockBalanceSnapshot.last_movement_id).in_(
+            select(latest.c.chemical_id, latest.c.last_movement_id)
+        )
+    ).all())
+    
+    db.execute(insert(StockBalanceSnapshot), [
+        {
+            "chemical_id": row.chemical_id,
+            "last_movement_id": row.last_movement_id,
+            "as_of": row.as_of,
+            "balance": previous.get(row.chemical_id, 0.0) + row.delta
+        }
+        for row in pending
+    ])
+    db.commit()
+    return len(pending)
@@ -0,0 +1,96 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from typing import Callable, Optional
+from app.models.activity_log import ActivityLog
+from app.models.user import User
+
+AFTER_COMMIT_KEY = "after_commit"
+
+def after_commit(db: Session, callback: Callable[[], None]):
+    """Run callback once the session's current transaction commits.
+
+    For in-process side effects (counters, pushes) that must not happen if the change
+    is rolled back; on rollback the callback is dropped.
+    """
+    db.info.setdefault(AFTER_COMMIT_KEY, []).append(callback)
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session):
+    for callback in session.info.pop(AFTER_COMMIT_KEY, []):
+        callback()
+
+@event.listens_for(Session, "after_rollback")
+def _drop_after_commit(session: Session):
+    session.info.pop(AFTER_COMMIT_KEY, None)
+
+class UnitOfWork:
+    """Groups an entity change and its audit rows into a single transaction.
+
+    Usage:
+        with UnitOfWork(db, user_id=current_user.id) as uow:
+            setattr(entity, field, value)
+            uow.log(action="update_...", description="...")
+
+    Audit rows are added to the same session as the change, so both go out in one
+    flush and one COMMIT on a clean exit, and neither is written if the block raises.
+    """
+
+    def __init__(self, db: Session, user_id: Optional[int] = None, user_uid: Optional[str] = None):
+        self.db = db
+        self._user_id = user_id
+        self._user_uid = user_uid
+
+    @property
+    def user_id(self) -> Optional[int]:
+        # Resolved at most once, and only for callers that did not pass the id
+        if self._user_id is None and self._user_uid:
+            user = self.db.query(User.id).filter(User.uid == self._user_uid).first()
+            self._user_id = user.id if user else None
+            self._user_uid = None
+        return self._user_id
+
+    def __enter__(self) -> "UnitOfWork":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        if exc_type is not None:
+            self.db.rollback()
+            return False
+        self.db.commit()
+        return False
+
+    def add(self, instance):
+        self.db.add(instance)
+
+    def delete(self, instance):
+        self.db.delete(instance)
+
+    def flush(self):
+        """Flush pending changes early, e.g. to get a generated id for the audit row"""
+        self.db.flush()
+
+    def after_commit(self, callback: Callable[[], None]):
+        """Run callback after this unit of work commits, and not at all if it rolls back"""
+        after_commit(self.db, callback)
+
+    def log(
+        self,
+        action: str,
+        description: str,
+        table_modified: Optional[str] = None,
+        field_modified: Optional[str] = None,
+        old_value: Optional[str] = None,
+        new_value: Optional[str] = None,
+        note: Optional[str] = None
+    ):
+        """Add an activity log row to this unit of work"""
+        self.db.add(ActivityLog(
+            user_id=self.user_id,
+            action=action,
+            description=description,
+            table_modified=table_modified,
+            field_modified=field_modified,
+            old_value=old_value,
+            new_value=new_value,
+            note=note
+        ))
@@ -1,7 +1,10 @@
 from sqlalchemy.orm import Session
 from app.models.user import User, UserRole
 from app.schema.user import UserCreate, UserUpdate
-from typing import Optional, List
+from app.models.user_sessions import UserSession
+from app.crud.user_sessions import open_user_session, close_user_session
+from app.services.user_principal_cache import user_principal_cache
+from typing import Optional, List, Dict, Iterable
 from datetime import datetime, timedelta
 import pytz
 import logging
@@ -57,34 +60,35 @@ def update_user(db: Session, user_id: int, user_update: UserUpdate) -> Optional[
     db.commit()
     db.refresh(db_user)
     
-    logger.info(f"[{datetime.now().isoformat()}] User {db_user.email} updated successfully")
-    return db_user
-
-def update_user_last_seen(db: Session, user_id: int) -> Optional[User]:
-    """Update user's last seen timestamp"""
-    db_user = get_user_by_id(db, user_id)
-    if not db_user:
-        logger.warning(f"[{datetime.now().isoformat()}] User ID {user_id} not found for last_seen update")
-        return None
+    # Approval, role and name changes must be visible on the user's next request
+    user_principal_cache.invalidate(db_user.uid)
     
-    old_last_seen = db_user.last_seen
-    db_user.last_seen = datetime.now(pytz.UTC)
-    db.commit()
-    db.refresh(db_user)
-    
-    logger.info(f"[{datetime.now().isoformat()}] Last seen updated for user {db_user.email} ({db_user.uid})")
+    logger.info(f"[{datetime.now().isoformat()}] User {db_user.email} updated successfully")
     return db_user
 
-def get_online_users(db: Session, minutes_threshold: int = 5) -> List[User]:
-    """Get users who were active in the last N minutes"""
-    threshold_time = datetime.now(pytz.UTC) - timedelta(minutes=minutes_threshold)
-    online_users = db.query(User).filter(
-        User.last_seen >= threshold_time,
-        User.is_approved == True
-    ).all()
-    
-    logger.info(f"[{datetime.now().isoformat()}] Retrieved {len(online_users)} online users (threshold: {minutes_threshold} minutes)")
-    return online_users
+def get_approved_users_by_ids(db: Session, user_ids: List[int]) -> List[User]:
+    """Get approved users by id, e.g. the ids currently held by the presence store"""
+    if not user_ids:
+        return []
+    return db.query(User).filter(User.id.in_(user_ids), User.is_approved == True).all()
+
+def get_display_names_by_uids(db: Session, uids: Iterable[str]) -> Dict[str, str]:
+    """First + last name per uid, from the principal cache with one IN query for the misses"""
+    names: Dict[str, str] = {}
+    missing = []
+    for uid in set(filter(None, uids)):
+        principal = user_principal_cache.get(uid)
+        if principal is None:
+            missing.append(uid)
+        else:
+            names[uid] = _display_name(principal)
+    if missing:
+        for user in db.query(User).filter(User.uid.in_(missing)).all():
+            names[user.uid] = _display_name(user_principal_cache.set(user))
+    return names
+
+def _display_name(user) -> str:
+    return f"{user.first_name} {user.last_name or ''}".strip()
 
 def delete_user(db: Session, user_id: int) -> bool:
     logger.info(f"[{datetime.now().isoformat()}] Attempting to delete user ID: {user_id}")
@@ -99,6 +103,7 @@ def delete_user(db: Session, user_id: int) -> bool:
     
     db.delete(db_user)
     db.commit()
+    user_principal_cache.invalidate(user_uid)
     
     logger.info(f"[{datetime.now().isoformat()}] User {user_email} ({user_uid}) deleted successfully")
     return True
@@ -126,57 +131,14 @@ def get_admin_user(db: Session) -> Optional[User]:
         logger.info(f"[{datetime.now().isoformat()}] No admin user found")
     return admin_user
 
-def set_user_online(db: Session, user_id: int) -> Optional[User]:
-    """Set user as online and log the event"""
-    logger.info(f"[{datetime.now().isoformat()}] Setting user ID {user_id} as online")
-    
-    user = get_user_by_id(db, user_id)
-    if not user:
-        logger.warning(f"[{datetime.now().isoformat()}] User ID {user_id} not found for online status update")
-        return None
-    
-    old_status = user.is_online
-    user.is_online = True
-    user.last_seen = datetime.now(pytz.UTC)
-    db.commit()
-    db.refresh(user)
-    
-    # Log activity
-    from app.crud.activity_log import create_activity_log
-    create_activity_log(
-        db=db,
-        user_id=user.id,
-        action="user_online",
-        description=f"User {user.email} went online",
-        note=f"User {user.email} ({user.role}) is now online at {datetime.now().isoformat()}"
-    )
-    
-    logger.info(f"[{datetime.now().isoformat()}] User {user.email} ({user.uid}) is now ONLINE (was: {old_status})")
-    return user
-
-def set_user_offline(db: Session, user_id: int) -> Optional[User]:
-    """Set user as offline and log the event"""
-    logger.info(f"[{datetime.now().isoformat()}] Setting user ID {user_id} as offline")
-    
-    user = get_user_by_id(db, user_id)
-    if not user:
-        logger.warning(f"[{datetime.now().isoformat()}] User ID {user_id} not found for offline status update")
-        return None
-    
-    old_status = user.is_online
-    user.is_online = False
-    db.commit()
-    db.refresh(user)
-    
-    # Log activity
-    from app.crud.activity_log import create_activity_log
-    create_activity_log(
-        db=db,
-        user_id=user.id,
-        action="user_offline",
-        description=f"User {user.email} went offline",
-        note=f"User {user.email} ({user.role}) is now offline at {datetime.now().isoformat()}"
-    )
-    
-    logger.info(f"[{datetime.now().isoformat()}] User {user.email} ({user.uid}) is now OFFLINE (was: {old_status})")
-    return user
+def set_user_online(db: Session, user_id: int) -> UserSession:
+    """Set user as online by opening (or continuing) their session"""
+    session = open_user_session(db, user_id)
+    logger.info(f"[{datetime.now().isoformat()}] User ID {user_id} is now ONLINE (session {session.id}, flaps: {session.flap_count})")
+    return session
+
+def set_user_offline(db: Session, user_id: int) -> Optional[UserSession]:
+    """Set user as offline by closing their open session"""
+    session = close_user_session(db, user_id)
+    logger.info(f"[{datetime.now().isoformat()}] User ID {user_id} is now OFFLINE (session {session.id if session else None})")
+    return session
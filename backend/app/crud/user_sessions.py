@@ -0,0 +1,83 @@
+import os
+from sqlalchemy.orm import Session, joinedload
+from app.models.user_sessions import UserSession
+from typing import Optional, List, Tuple
+from datetime import datetime, timedelta
+import pytz
+
+# An offline/online flip within this window continues the previous session
+SESSION_COALESCE_SECONDS = int(os.getenv("SESSION_COALESCE_SECONDS", 120))
+
+def get_open_session(db: Session, user_id: int) -> Optional[UserSession]:
+    return db.query(UserSession).filter(
+        UserSession.user_id == user_id,
+        UserSession.ended_at.is_(None)
+    ).order_by(UserSession.started_at.desc()).first()
+
+def open_user_session(db: Session, user_id: int) -> UserSession:
+    """Mark a user online, reusing the open or just-closed session instead of starting a new one"""
+    now = datetime.now(pytz.UTC)
+
+    session = get_open_session(db, user_id)
+    if session is None:
+        latest = db.query(UserSession).filter(
+            UserSession.user_id == user_id
+        ).order_by(UserSession.started_at.desc()).first()
+        if latest is not None and _as_utc(latest.ended_at) >= now - timedelta(seconds=SESSION_COALESCE_SECONDS):
+            # Rapid flap: reopen the previous session
+            session = latest
+            session.ended_at = None
+            session.flap_count += 1
+        else:
+            session = UserSession(user_id=user_id, started_at=now, flap_count=0)
+            db.add(session)
+
+    session.last_seen_at = now
+    db.commit()
+    db.refresh(session)
+    return session
+
+def close_user_session(db: Session, user_id: int) -> Optional[UserSession]:
+    """Mark a user offline by closing the open session, if any"""
+    session = get_open_session(db, user_id)
+    if session is None:
+        return None
+
+    now = datetime.now(pytz.UTC)
+    session.last_seen_at = now
+    session.ended_at = now
+    db.commit()
+    db.refresh(session)
+    return session
+
+def get_user_sessions(
+    db: Session,
+    user_id: Optional[int] = None,
+    active_only: bool = False,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    skip: int = 0,
+    limit: int = 100
+) -> Tuple[List[UserSession], int]:
+    """Get sessions (newest first) with their users, and the total matching count"""
+    query = db.query(UserSession)
+
+    if user_id is not None:
+        query = query.filter(UserSession.user_id == user_id)
+    if active_only:
+        query = query.filter(UserSession.ended_at.is_(None))
+    if start_date:
+        # Sessions that overlap the window, not only those that started in it
+        query = query.filter((UserSession.ended_at.is_(None)) | (UserSession.ended_at >= start_date))
+    if end_date:
+        query = query.filter(UserSession.started_at <= end_date)
+
+    total = query.count()
+    sessions = query.options(joinedload(UserSession.user)).order_by(
+        UserSession.started_at.desc(), UserSession.id.desc()
+    ).offset(skip).limit(limit).all()
+    return sessions, total
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite returns naive datetimes for timezone-aware columns
+    return pytz.UTC.localize(value) if value.tzinfo is None else value
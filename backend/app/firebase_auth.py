@@ -1,4 +1,10 @@
 import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
 import firebase_admin
 from firebase_admin import credentials, auth
 from fastapi import HTTPException, Depends, Request
@@ -6,10 +12,20 @@ from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 from app.database import get_db
 from app.crud.user import get_user_by_uid
+from app.services.user_principal_cache import user_principal_cache
 from app.models.user import UserRole
 
 load_dotenv()
 
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Verified tokens are cached until the earlier of their own exp and this TTL
+FIREBASE_TOKEN_CACHE_SIZE = int(os.getenv("FIREBASE_TOKEN_CACHE_SIZE", 10000))
+FIREBASE_TOKEN_CACHE_TTL = float(os.getenv("FIREBASE_TOKEN_CACHE_TTL", 300))
+# Google rotates the signing certificates roughly daily and serves them with max-age of a few hours
+FIREBASE_CERT_REFRESH_INTERVAL = float(os.getenv("FIREBASE_CERT_REFRESH_INTERVAL", 3600))
+
 # Initialize Firebase App only once
 if not firebase_admin._apps:
     cred_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
@@ -24,7 +40,69 @@ if not firebase_admin._apps:
         except ValueError:
             pass  # App already initialized
 
-def verify_firebase_token(request: Request):
+class TokenCache:
+    """Thread-safe LRU cache of decoded Firebase ID tokens.
+
+    Entries are keyed by a SHA-256 of the raw token (the token itself is never kept) and
+    expire at the earlier of the token's exp claim and ttl seconds after verification.
+    """
+
+    def __init__(self, max_size: int = FIREBASE_TOKEN_CACHE_SIZE, ttl: float = FIREBASE_TOKEN_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self.key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            decoded_token, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return decoded_token
+
+    def set(self, token: str, decoded_token: dict):
+        expires_at = min(float(decoded_token.get("exp", 0)), time.time() + self.ttl)
+        if expires_at <= time.time():
+            return
+        key = self.key(token)
+        with self._lock:
+            self._entries[key] = (decoded_token, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+token_cache = TokenCache()
+
+def verify_id_token(token: str, check_revoked: bool = False) -> dict:
+    """Verify a raw Firebase ID token, serving repeat tokens from the cache.
+
+    With check_revoked=True the cache is bypassed and Firebase is asked whether the
+    token has been revoked (one network round trip), so only sensitive routes opt in.
+    """
+    if not check_revoked:
+        decoded_token = token_cache.get(token)
+        if decoded_token is not None:
+            return decoded_token
+
+    decoded_token = auth.verify_id_token(token, check_revoked=check_revoked)
+    token_cache.set(token, decoded_token)
+    return decoded_token
+
+def verify_firebase_token(request: Request, check_revoked: bool = False):
     """Verify Firebase ID token and return decoded token"""
     auth_header = request.headers.get("Authorization")
     if not auth_header:
@@ -32,8 +110,7 @@ def verify_firebase_token(request: Request):
 
     try:
         token = auth_header.split(" ")[1]  # "Bearer <token>"
-        decoded_token = auth.verify_id_token(token)
-        return decoded_token
+        return verify_id_token(token, check_revoked=check_revoked)
     except Exception as e:
         raise HTTPException(status_code=401, detail=f"Token invalid: {str(e)}")
 
@@ -41,20 +118,90 @@ def get_firebase_token(request: Request):
     """Dependency to get verified Firebase token"""
     return verify_firebase_token(request)
 
+def get_firebase_token_check_revoked(request: Request):
+    """Dependency to get a verified Firebase token that has not been revoked"""
+    return verify_firebase_token(request, check_revoked=True)
+
+class CertificateRefresher:
+    """Keeps Firebase's public signing certificates warm in the background.
+
+    firebase_admin fetches the certificates lazily inside verify_id_token whenever its
+    HTTP cache has expired, which puts that fetch on some unlucky request. Fetching them
+    on a timer keeps the HTTP cache fresh so verification stays local.
+    """
+
+    def __init__(self, interval: float = FIREBASE_CERT_REFRESH_INTERVAL):
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def start(self):
+        if not firebase_admin._apps or (self._worker is not None and self._worker.is_alive()):
+            return
+        self._stop_event.clear()
+        self._worker = threading.Thread(target=self._run, name="firebase-cert-refresh", daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._worker is not None:
+            self._worker.join(5)
+            self._worker = None
+
+    def refresh(self) -> bool:
+        """Fetch the ID token certificates through firebase_admin's own cached request.
+
+        Only firebase_admin's request object shares the HTTP cache that verify_id_token
+        reads, and it is not public API: requirements.txt pins the major versions it is
+        known to exist in. If a release moves it, refreshing is switched off (verification
+        keeps working, fetching lazily) rather than failing on every tick.
+        """
+        try:
+            from firebase_admin import _token_gen
+            request = auth._get_client(None)._token_verifier.request
+            cert_uri = _token_gen.ID_TOKEN_CERT_URI
+        except (ImportError, AttributeError) as e:
+            logger.warning(f"⚠️ firebase_admin {firebase_admin.__version__} has no cached certificate request ({e}); certificate refresh disabled")
+            self._stop_event.set()
+            return False
+        try:
+            request(url=cert_uri, method="GET")
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Firebase certificate refresh failed: {e}")
+            return False
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self.refresh()
+            self._stop_event.wait(self.interval)
+
+certificate_refresher = CertificateRefresher()
+
 def get_current_user(
     token: dict = Depends(get_firebase_token),
     db: Session = Depends(get_db)
 ):
-    """Get current user from database"""
-    user = get_user_by_uid(db, token["uid"])
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    """Get current user, from the principal cache or the database"""
+    user = user_principal_cache.get(token["uid"])
+    if user is None:
+        db_user = get_user_by_uid(db, token["uid"])
+        if not db_user:
+            raise HTTPException(status_code=404, detail="User not found")
+        user = user_principal_cache.set(db_user)
     
     if not user.is_approved:
         raise HTTPException(status_code=403, detail="User not approved")
     
     return user
 
+def get_current_user_check_revoked(
+    token: dict = Depends(get_firebase_token_check_revoked),
+    db: Session = Depends(get_db)
+):
+    """Get current user, additionally rejecting revoked tokens"""
+    return get_current_user(token=token, db=db)
+
 def get_admin_user(
     current_user = Depends(get_current_user)
 ):
@@ -63,6 +210,14 @@ def get_admin_user(
         raise HTTPException(status_code=403, detail="Admin access required")
     return current_user
 
+def get_admin_user_check_revoked(
+    current_user = Depends(get_current_user_check_revoked)
+):
+    """Dependency to ensure user is admin, for sensitive routes that also reject revoked tokens"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
+
 def get_approved_user(
     current_user = Depends(get_current_user)
 ):
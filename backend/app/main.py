@@ -1,7 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.database import engine, check_database_connection
-from app.models import user, activity_log, chemical_inventory, formulation_details, notifications, account_transactions, alerts
+from app.models import user, activity_log, chemical_inventory, chemical_notes, formulation_details, notifications, account_transactions, alerts, user_sessions, archive, stock_movements
+from app.crud.chemical_inventory import setup_chemical_search
+from app.services.activity_log_sink import activity_log_sink
+from app.firebase_auth import certificate_refresher
+from app.services.presence import presence_store
+from app.services.notification_hub import notification_hub
+from app.services.unread_counters import unread_counters
+from app.services.retention import retention_job
+from app.services.stock_alerts import stock_alert_sweeper
+from app.services.stock_snapshots import stock_snapshotter
 import os
 
 app = FastAPI(title="Chemical Inventory API", version="1.0.0")
@@ -13,6 +22,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Keyset pagination cursor on list endpoints
 )
 
 @app.on_event("startup")
@@ -23,12 +33,47 @@ async def startup_event():
         user.Base.metadata.create_all(bind=engine)
         activity_log.Base.metadata.create_all(bind=engine)
         chemical_inventory.Base.metadata.create_all(bind=engine)
+        chemical_notes.Base.metadata.create_all(bind=engine)
         formulation_details.Base.metadata.create_all(bind=engine)
         notifications.Base.metadata.create_all(bind=engine)
         account_transactions.Base.metadata.create_all(bind=engine)
         alerts.Base.metadata.create_all(bind=engine)
+        user_sessions.Base.metadata.create_all(bind=engine)
+        archive.Base.metadata.create_all(bind=engine)
+        stock_movements.Base.metadata.create_all(bind=engine)
         print("✅ Database tables created successfully!")
         
+        # Full-text search indexes (GIN/trigram on Postgres, FTS5 on SQLite)
+        try:
+            setup_chemical_search(engine)
+            print("✅ Chemical search index ready!")
+        except Exception as e:
+            print(f"⚠️ Chemical search index not created: {e}")
+        
+        # Start the write-behind activity log worker
+        activity_log_sink.start()
+        
+        # Keep Firebase signing certificates fresh off the request path
+        certificate_refresher.start()
+        
+        # Batch presence heartbeats into periodic last_seen updates
+        presence_store.start()
+        
+        # Relay notification events between workers (Postgres LISTEN/NOTIFY)
+        notification_hub.start()
+        
+        # Rebuild unread notification/alert counts from the database
+        unread_counters.rebuild()
+        
+        # Archive expired notifications/alerts periodically (if RETENTION_INTERVAL is set)
+        retention_job.start()
+        
+        # Raise/resolve stock alerts for changes made outside the inventory API
+        stock_alert_sweeper.start()
+        
+        # Snapshot stock balances so point-in-time queries stay cheap
+        stock_snapshotter.start()
+        
         # Check database connection
         if check_database_connection():
             print("✅ Database connection verified!")
@@ -39,6 +84,17 @@ async def startup_event():
         print(f"❌ Error creating database tables: {e}")
         raise
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush buffered activity logs and stop background workers on shutdown"""
+    activity_log_sink.stop()
+    certificate_refresher.stop()
+    presence_store.stop()
+    notification_hub.stop()
+    retention_job.stop()
+    stock_alert_sweeper.stop()
+    stock_snapshotter.stop()
+
 # Include routers
 from app.routers.auth import router as auth_router
 from app.routers.admin import router as admin_router
@@ -48,6 +104,7 @@ from app.routers.formulation_details import router as formulation_details_router
 from app.routers.notifications import router as notifications_router
 from app.routers.alerts import router as alerts_router
 from app.routers.account_transactions import router as account_transactions_router
+from app.routers.export import router as export_router
 
 app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
 app.include_router(admin_router, prefix="/admin", tags=["Admin"])
@@ -57,6 +114,7 @@ app.include_router(formulation_details_router, prefix="/formulations", tags=["Fo
 app.include_router(notifications_router, prefix="/notifications", tags=["Notifications"])
 app.include_router(alerts_router, prefix="/alerts", tags=["Alerts"])
 app.include_router(account_transactions_router, tags=["Account Transactions"])
+app.include_router(export_router, prefix="/export", tags=["Export"])
 
 @app.get("/")
 def root():
@@ -69,5 +127,5 @@ def health_check():
     return {
         "status": "healthy" if db_status else "unhealthy",
         "database": "connected" if db_status else "disconnected",
-        "tables": ["users", "activity_logs", "chemical_inventory", "formulation_details", "notifications", "alerts", "account_transactions", "purchase_orders", "purchase_order_items"]
+        "tables": ["users", "activity_logs", "chemical_inventory", "chemical_notes", "formulation_details", "notifications", "notification_recipients", "alerts", "account_transactions", "purchase_orders", "purchase_order_items", "user_sessions", "notifications_archive", "alerts_archive", "stock_movements", "stock_balance_snapshots"]
     }
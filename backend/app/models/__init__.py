@@ -1,10 +1,14 @@
 from .user import User, UserRole
 from .invitation import Invitation, InvitationStatus
 from .activity_log import ActivityLog
-from .chemical_inventory import ChemicalInventory
+from .chemical_inventory import ChemicalInventory, StockStatus
+from .chemical_notes import ChemicalNote
 from .formulation_details import FormulationDetails
-from .notifications import Notification
+from .notifications import Notification, NotificationRecipient
 from .alerts import Alert, AlertType, AlertSeverity
 from .account_transactions import AccountTransaction, PurchaseOrder, PurchaseOrderItem
+from .user_sessions import UserSession
+from .archive import NotificationArchive, AlertArchive
+from .stock_movements import StockMovement, StockBalanceSnapshot, MovementReason
 
-__all__ = ["User", "UserRole", "Invitation", "InvitationStatus", "ActivityLog", "ChemicalInventory", "FormulationDetails", "Notification", "Alert", "AlertType", "AlertSeverity", "AccountTransaction", "PurchaseOrder", "PurchaseOrderItem"] 
\ No newline at end of file
+__all__ = ["User", "UserRole", "Invitation", "InvitationStatus", "ActivityLog", "ChemicalInventory", "StockStatus", "ChemicalNote", "FormulationDetails", "Notification", "NotificationRecipient", "Alert", "AlertType", "AlertSeverity", "AccountTransaction", "PurchaseOrder", "PurchaseOrderItem", "UserSession", "NotificationArchive", "AlertArchive", "StockMovement", "StockBalanceSnapshot", "MovementReason"] 
\ No newline at end of file
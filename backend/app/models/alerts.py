@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Boolean, Enum
-from sqlalchemy.sql import func
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Boolean, Enum, Index
+from sqlalchemy.sql import func, text
 from sqlalchemy.orm import relationship
 from app.database import Base
 import enum
@@ -15,8 +15,18 @@ class AlertType(str, enum.Enum):
     EXPIRY = "expiry"
     SYSTEM = "system"
 
+# Alerts raised and cleared by the stock-threshold engine
+STOCK_ALERT_TYPES = (AlertType.LOW_STOCK, AlertType.OUT_OF_STOCK)
+
 class Alert(Base):
     __tablename__ = "alerts"
+    __table_args__ = (
+        # Partial indexes backing the /unread and /active feeds (keyset on id)
+        Index("ix_alerts_unread_id", "id", postgresql_where=text("is_read = false"), sqlite_where=text("is_read = 0")),
+        Index("ix_alerts_active_id", "id", postgresql_where=text("is_dismissed = false"), sqlite_where=text("is_dismissed = 0")),
+        # At most one open alert per problem; create_alert upserts against this index
+        Index("uq_alerts_open_type_chemical", "type", "chemical_id", unique=True, postgresql_where=text("resolved_at IS NULL"), sqlite_where=text("resolved_at IS NULL")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     type = Column(Enum(AlertType), nullable=False)
@@ -27,6 +37,11 @@ class Alert(Base):
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
     is_dismissed = Column(Boolean, default=False)
     is_read = Column(Boolean, default=False)
+    # Set when the condition behind the alert clears (e.g. stock recovered); NULL while open
+    resolved_at = Column(DateTime(timezone=True), nullable=True)
+    # Repeats of an open alert are coalesced into it rather than inserted
+    occurrence_count = Column(Integer, nullable=False, default=1, server_default="1")
+    last_seen_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     chemical = relationship("ChemicalInventory", foreign_keys=[chemical_id])
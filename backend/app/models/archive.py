@@ -0,0 +1,59 @@
+from sqlalchemy import Column, String, Integer, DateTime, Text, Boolean, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+class NotificationArchive(Base):
+    """Notifications moved out of the hot table by the retention job (see app.services.retention).
+
+    The archive has its own key and keeps the hot table's id as original_id, which is
+    not unique: SQLite reuses the ids of deleted rows, so a later run can archive a
+    different row with the same id. Enum columns are stored as plain strings and foreign
+    keys are dropped, so archived rows survive deletion of the chemical or user they
+    refer to.
+    """
+    __tablename__ = "notifications_archive"
+    __table_args__ = (
+        Index("ix_notifications_archive_timestamp", "timestamp"),
+        Index("ix_notifications_archive_original_id", "original_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    original_id = Column(Integer, nullable=False)
+    type = Column(String, nullable=False)
+    severity = Column(String, nullable=False)
+    message = Column(Text, nullable=False)
+    category = Column(String, nullable=True)
+    priority = Column(String, nullable=True)
+    status = Column(String, nullable=True)
+    chemical_id = Column(Integer, nullable=True)
+    user_id = Column(String, nullable=True)
+    created_by = Column(String, nullable=True)
+    timestamp = Column(DateTime(timezone=True), nullable=True)
+    is_read = Column(Boolean, nullable=True)
+    is_dismissed = Column(Boolean, nullable=True)
+    delete_comment = Column(Text, nullable=True)
+    recipients = Column(Text, nullable=True)  # JSON list of {role, user_uid, is_read, read_at}
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class AlertArchive(Base):
+    """Alerts moved out of the hot table by the retention job, keyed like NotificationArchive"""
+    __tablename__ = "alerts_archive"
+    __table_args__ = (
+        Index("ix_alerts_archive_timestamp", "timestamp"),
+        Index("ix_alerts_archive_original_id", "original_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    original_id = Column(Integer, nullable=False)
+    type = Column(String, nullable=False)
+    severity = Column(String, nullable=False)
+    message = Column(Text, nullable=False)
+    chemical_id = Column(Integer, nullable=True)
+    user_id = Column(String, nullable=True)
+    timestamp = Column(DateTime(timezone=True), nullable=True)
+    is_read = Column(Boolean, nullable=True)
+    is_dismissed = Column(Boolean, nullable=True)
+    resolved_at = Column(DateTime(timezone=True), nullable=True)
+    occurrence_count = Column(Integer, nullable=True)
+    last_seen_at = Column(DateTime(timezone=True), nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,10 +1,40 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, Float, ForeignKey
+from sqlalchemy import Column, String, Integer, DateTime, Text, Float, ForeignKey, Index, case
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
+from typing import Optional
+import enum
+
+class StockStatus(str, enum.Enum):
+    OUT_OF_STOCK = "out_of_stock"
+    LOW = "low"
+    IN_STOCK = "in_stock"
+
+def stock_status_for(quantity: float, alert_threshold: Optional[float]) -> StockStatus:
+    """Out of stock at quantity <= 0, low at quantity <= alert_threshold"""
+    if quantity <= 0:
+        return StockStatus.OUT_OF_STOCK
+    if alert_threshold is not None and quantity <= alert_threshold:
+        return StockStatus.LOW
+    return StockStatus.IN_STOCK
+
+def stock_status_expression(quantity, alert_threshold):
+    """stock_status_for as a SQL expression, for set-based UPDATEs"""
+    return case(
+        (quantity <= 0, StockStatus.OUT_OF_STOCK.value),
+        ((alert_threshold.isnot(None)) & (quantity <= alert_threshold), StockStatus.LOW.value),
+        else_=StockStatus.IN_STOCK.value
+    )
 
 class ChemicalInventory(Base):
     __tablename__ = "chemical_inventory"
+    __table_args__ = (
+        # Composite indexes backing keyset pagination on GET /chemicals
+        Index("ix_chemical_inventory_last_updated_id", "last_updated", "id"),
+        Index("ix_chemical_inventory_name_id", "name", "id"),
+        # GET /chemicals?status=... and the status summary
+        Index("ix_chemical_inventory_stock_status_id", "stock_status", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
@@ -13,6 +43,10 @@ class ChemicalInventory(Base):
     formulation = Column(Text, nullable=True)
     notes = Column(Text, nullable=True)
     alert_threshold = Column(Float, nullable=True)
+    # Derived from quantity and alert_threshold (stock_status_for); kept in step on every write
+    stock_status = Column(String, nullable=False, default=StockStatus.IN_STOCK.value, server_default=StockStatus.IN_STOCK.value)
+    # Bumped on every quantity write; POST /chemicals/{id}/adjust can require an expected version
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     supplier = Column(String, nullable=True)
     location = Column(String, nullable=True)
     last_updated = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -20,4 +54,5 @@ class ChemicalInventory(Base):
     
     # Relationships
     user = relationship("User", foreign_keys=[updated_by])
-    formulation_details = relationship("FormulationDetails", back_populates="chemical", cascade="all, delete-orphan") 
\ No newline at end of file
+    formulation_details = relationship("FormulationDetails", back_populates="chemical", cascade="all, delete-orphan")
+    note_entries = relationship("ChemicalNote", back_populates="chemical", cascade="all, delete-orphan") 
\ No newline at end of file
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Index
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+class ChemicalNote(Base):
+    __tablename__ = "chemical_notes"
+    __table_args__ = (
+        # Per-chemical note history, newest first
+        Index("ix_chemical_notes_chemical_id_id", "chemical_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    chemical_id = Column(Integer, ForeignKey("chemical_inventory.id", ondelete="CASCADE"), nullable=False)
+    author_uid = Column(String, ForeignKey("users.uid", ondelete="SET NULL"), nullable=True)  # NULL once the author is deleted
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    body = Column(Text, nullable=False)
+    
+    # Relationships
+    chemical = relationship("ChemicalInventory", back_populates="note_entries")
+    author = relationship("User", foreign_keys=[author_uid])
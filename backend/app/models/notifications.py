@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Boolean, Enum
-from sqlalchemy.sql import func
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Boolean, Enum, Index
+from sqlalchemy.sql import func, text
 from sqlalchemy.orm import relationship
 from app.database import Base
 import enum
@@ -24,6 +24,11 @@ class NotificationStatus(str, enum.Enum):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Partial indexes backing the admin /unread and /active feeds (keyset on id)
+        Index("ix_notifications_unread_id", "id", postgresql_where=text("is_read = false"), sqlite_where=text("is_read = 0")),
+        Index("ix_notifications_active_id", "id", postgresql_where=text("is_dismissed = false"), sqlite_where=text("is_dismissed = 0")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     type = Column(String, nullable=False)  # 'low_stock', 'out_of_stock', 'expiry', etc.
@@ -44,4 +49,39 @@ class Notification(Base):
     # Relationships
     chemical = relationship("ChemicalInventory", foreign_keys=[chemical_id])
     user = relationship("User", foreign_keys=[user_id])
-    creator = relationship("User", foreign_keys=[created_by]) 
\ No newline at end of file
+    creator = relationship("User", foreign_keys=[created_by])
+    recipient_rows = relationship("NotificationRecipient", back_populates="notification", cascade="all, delete-orphan")
+
+class NotificationRecipient(Base):
+    """Delivery and read state of a notification for one recipient (a role or a single user).
+
+    A notification is stored once; each recipient gets one of these rows, so per-role and
+    per-user inboxes are index lookups and reading is tracked per recipient.
+    """
+    __tablename__ = "notification_recipients"
+    __table_args__ = (
+        # Per-role and per-user inboxes: unread first filter, newest first
+        Index("ix_notification_recipients_role_is_read_timestamp", "role", "is_read", "timestamp"),
+        Index("ix_notification_recipients_user_uid_is_read_timestamp", "user_uid", "is_read", "timestamp"),
+        Index("ix_notification_recipients_notification_id", "notification_id"),
+        # Partial indexes backing the per-role and per-user /unread feeds (keyset on notification_id)
+        Index("ix_notification_recipients_unread_role", "role", "notification_id", postgresql_where=text("is_read = false"), sqlite_where=text("is_read = 0")),
+        Index("ix_notification_recipients_unread_user_uid", "user_uid", "notification_id", postgresql_where=text("is_read = false"), sqlite_where=text("is_read = 0")),
+    )
+
+    id = Column(Integer, primary_key=True)
+    notification_id = Column(Integer, ForeignKey("notifications.id", ondelete="CASCADE"), nullable=False)
+    role = Column(String, nullable=True)  # Set for role recipients
+    user_uid = Column(String, ForeignKey("users.uid", ondelete="CASCADE"), nullable=True)  # Set for user recipients
+    is_read = Column(Boolean, default=False, nullable=False)
+    read_at = Column(DateTime(timezone=True), nullable=True)
+    # Delivery time, copied from the notification so the index covers the inbox query
+    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+
+    @property
+    def counter_key(self) -> str:
+        """Key of this recipient in the unread counters"""
+        return self.role if self.role is not None else f"user:{self.user_uid}"
+    
+    # Relationships
+    notification = relationship("Notification", back_populates="recipient_rows")
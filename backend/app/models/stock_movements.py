@@ -0,0 +1,52 @@
+from sqlalchemy import Column, String, Integer, DateTime, Float, ForeignKey, Index
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.database import Base
+import enum
+
+class MovementReason(str, enum.Enum):
+    OPENING = "opening"        # Chemical created (or existing stock when the ledger was introduced)
+    IMPORT = "import"          # Chemical created by a bulk import
+    UPDATE = "update"          # Quantity edited on the chemical
+    ADJUSTMENT = "adjustment"  # Signed stock adjustment
+    REMOVAL = "removal"        # Chemical deleted; the remaining stock leaves the ledger
+
+class StockMovement(Base):
+    """Append-only ledger of stock changes; a chemical's quantity is the sum of its deltas.
+
+    chemical_id has no foreign key so the history outlives the chemical.
+    """
+    __tablename__ = "stock_movements"
+    __table_args__ = (
+        # Per-chemical history, point-in-time range sums and consumption series
+        Index("ix_stock_movements_chemical_id_created_at", "chemical_id", "created_at"),
+        Index("ix_stock_movements_chemical_id_id", "chemical_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    chemical_id = Column(Integer, nullable=False)
+    delta = Column(Float, nullable=False)
+    reason = Column(String, nullable=False)  # MovementReason value
+    transaction_id = Column(Integer, ForeignKey("account_transactions.id", ondelete="SET NULL"), nullable=True)
+    reference = Column(String, nullable=True)  # Free-form source, e.g. the import file
+    user_uid = Column(String, ForeignKey("users.uid", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    # Relationships
+    user = relationship("User", foreign_keys=[user_uid])
+
+class StockBalanceSnapshot(Base):
+    """A chemical's balance after every movement up to last_movement_id (taken by
+    app.services.stock_snapshots), so a point-in-time quantity only sums the movements
+    after the nearest snapshot"""
+    __tablename__ = "stock_balance_snapshots"
+    __table_args__ = (
+        Index("ix_stock_balance_snapshots_chemical_id_as_of", "chemical_id", "as_of"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    chemical_id = Column(Integer, nullable=False)
+    last_movement_id = Column(Integer, nullable=False)
+    as_of = Column(DateTime(timezone=True), nullable=False)  # created_at of the last movement included
+    balance = Column(Float, nullable=False)
+    taken_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+class UserSession(Base):
+    __tablename__ = "user_sessions"
+    __table_args__ = (
+        # Latest session per user, and the open session (ended_at IS NULL) lookup
+        Index("ix_user_sessions_user_id_started_at", "user_id", "started_at"),
+        Index("ix_user_sessions_user_id_ended_at", "user_id", "ended_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    started_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_seen_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    ended_at = Column(DateTime(timezone=True), nullable=True)  # NULL while the user is online
+    flap_count = Column(Integer, default=0, nullable=False)  # Offline/online flips folded into this session
+    
+    # Relationships
+    user = relationship("User")
@@ -1,10 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.firebase_auth import get_current_user
+from app.firebase_auth import get_current_user, get_current_user_check_revoked
 from app.crud import account_transactions as crud_account
-from app.crud import get_user_by_uid
-from app.crud.activity_log import create_activity_log
 from app.schema.account_transactions import (
     AccountTransactionCreate, AccountTransactionResponse, AccountTransactionUpdate,
     PurchaseOrderCreate, PurchaseOrderResponse, PurchaseOrderUpdate,
@@ -20,11 +18,15 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/account", tags=["account"])
 
+# Financial audit rows are written by the CRUD layer in the request's own session, so
+# they commit (or roll back) together with the change they describe. Routes that move
+# money or orders also reject revoked tokens (one extra round trip to Firebase).
+
 # Account Transaction Endpoints
 @router.post("/transactions", response_model=AccountTransactionResponse)
 def create_transaction(
     transaction: AccountTransactionCreate,
-    current_user: dict = Depends(get_current_user),
+    current_user: dict = Depends(get_current_user_check_revoked),
     db: Session = Depends(get_db)
 ):
     """Create a new account transaction"""
@@ -32,28 +34,18 @@ def create_transaction(
     
     try:
         # Check if user has account role
-        user_info = get_user_by_uid(db, current_user.uid)
-        if not user_info or user_info.role not in ['admin', 'account']:
-            logger.warning(f"[{datetime.now().isoformat()}] User {current_user.uid} ({user_info.email if user_info else 'unknown'}) attempted to create transaction without proper role")
+        if current_user.role not in ['admin', 'account']:
+            logger.warning(f"[{datetime.now().isoformat()}] User {current_user.uid} ({current_user.email}) attempted to create transaction without proper role")
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Only account team members can create transactions"
             )
         
         db_transaction = crud_account.create_account_transaction(
-            db, transaction, current_user.uid
-        )
-        
-        # Log the transaction creation
-        create_activity_log(
-            db=db,
-            user_id=user_info.id,
-            action="create_transaction",
-            description=f"Created {transaction.transaction_type} transaction: {transaction.quantity} {transaction.unit} of chemical ID {transaction.chemical_id} for ₹{transaction.amount} {transaction.currency}",
-            note=f"Transaction ID: {db_transaction.id}, Supplier: {transaction.supplier}, Status: {transaction.status}"
+            db, transaction, current_user.uid, user_id=current_user.id
         )
         
-        logger.info(f"[{datetime.now().isoformat()}] Transaction created successfully by user {current_user.uid} ({user_info.email}) - Transaction ID: {db_transaction.id}")
+        logger.info(f"[{datetime.now().isoformat()}] Transaction created successfully by user {current_user.uid} ({current_user.email}) - Transaction ID: {db_transaction.id}")
         return db_transaction
     except Exception as e:
         logger.error(f"[{datetime.now().isoformat()}] Failed to create transaction: {str(e)}")
@@ -110,7 +102,7 @@ def get_transaction(
 def update_transaction(
     transaction_id: int,
     transaction_update: AccountTransactionUpdate,
-    current_user: dict = Depends(get_current_user),
+    current_user: dict = Depends(get_current_user_check_revoked),
     db: Session = Depends(get_db)
 ):
     """Update a transaction"""
@@ -118,7 +110,7 @@ def update_transaction(
     
     try:
         transaction = crud_account.update_account_transaction(
-            db, transaction_id, transaction_update
+            db, transaction_id, transaction_update, user_id=current_user.id
         )
         if not transaction:
             logger.warning(f"[{datetime.now().isoformat()}] Transaction {transaction_id} not found for update by user {current_user.uid}")
@@ -127,17 +119,6 @@ def update_transaction(
                 detail="Transaction not found"
             )
         
-        # Log the transaction update
-        user_info = get_user_by_uid(db, current_user.uid)
-        if user_info:
-            create_activity_log(
-                db=db,
-                user_id=user_info.id,
-                action="update_transaction",
-                description=f"Updated transaction {transaction_id}",
-                note=f"Updated fields: {list(transaction_update.dict(exclude_unset=True).keys())}"
-            )
-        
         logger.info(f"[{datetime.now().isoformat()}] Transaction {transaction_id} updated successfully by user {current_user.uid}")
         return transaction
     except Exception as e:
@@ -150,7 +131,7 @@ def update_transaction(
 @router.delete("/transactions/{transaction_id}")
 def delete_transaction(
     transaction_id: int,
-    current_user: dict = Depends(get_current_user),
+    current_user: dict = Depends(get_current_user_check_revoked),
     db: Session = Depends(get_db)
 ):
     """Delete a transaction (admin only)"""
@@ -158,15 +139,17 @@ def delete_transaction(
     
     try:
         # Check if user is admin
-        user_info = get_user_by_uid(db, current_user.uid)
-        if not user_info or user_info.role != "admin":
-            logger.warning(f"[{datetime.now().isoformat()}] User {current_user.uid} ({user_info.email if user_info else 'unknown'}) attempted to delete transaction without admin role")
+        if current_user.role != "admin":
+            logger.warning(f"[{datetime.now().isoformat()}] User {current_user.uid} ({current_user.email}) attempted to delete transaction without admin role")
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Only admins can delete transactions"
             )
         
-        success = crud_account.delete_account_transaction(db, transaction_id)
+        success = crud_account.delete_account_transaction(
+            db, transaction_id, user_id=current_user.id,
+            note=f"Admin {current_user.email} deleted transaction"
+        )
         if not success:
             logger.warning(f"[{datetime.now().isoformat()}] Transaction {transaction_id} not found for deletion by admin {current_user.uid}")
             raise HTTPException(
@@ -174,16 +157,7 @@ def delete_transaction(
                 detail="Transaction not found"
             )
         
-        # Log the transaction deletion
-        create_activity_log(
-            db=db,
-            user_id=user_info.id,
-            action="delete_transaction",
-            description=f"Deleted transaction {transaction_id}",
-            note=f"Admin {user_info.email} deleted transaction"
-        )
-        
-        logger.info(f"[{datetime.now().isoformat()}] Transaction {transaction_id} deleted successfully by admin {current_user.uid} ({user_info.email})")
+        logger.info(f"[{datetime.now().isoformat()}] Transaction {transaction_id} deleted successfully by admin {current_user.uid} ({current_user.email})")
         return {"message": "Transaction deleted successfully"}
     except Exception as e:
         logger.error(f"[{datetime.now().isoformat()}] Failed to delete transaction {transaction_id}: {str(e)}")
@@ -195,7 +169,7 @@ def delete_transaction(
 @router.put("/transactions/{transaction_id}/approve")
 def approve_transaction(
     transaction_id: int,
-    current_user: dict = Depends(get_current_user),
+    current_user: dict = Depends(get_current_user_check_revoked),
     db: Session = Depends(get_db)
 ):
     """Approve a pending transaction (admin only)"""
@@ -203,9 +177,8 @@ def approve_transaction(
     
     try:
         # Check if user is admin
-        user_info = get_user_by_uid(db, current_user.uid)
-        if not user_info or user_info.role != "admin":
-            logger.warning(f"[{datetime.now().isoformat()}] User {current_user.uid} ({user_info.email if user_info else 'unknown'}) attempted to approve transaction without admin role")
+        if current_user.role != "admin":
+            logger.warning(f"[{datetime.now().isoformat()}] User {current_user.uid} ({current_user.email}) attempted to approve transaction without admin role")
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Only admins can approve transactions"
@@ -229,19 +202,13 @@ def approve_transaction(
         # Update transaction status to completed
         transaction_update = AccountTransactionUpdate(status="completed")
         updated_transaction = crud_account.update_account_transaction(
-            db, transaction_id, transaction_update
-        )
-        
-        # Log the approval
-        create_activity_log(
-            db=db,
-            user_id=user_info.id,
+            db, transaction_id, transaction_update, user_id=current_user.id,
             action="approve_transaction",
             description=f"Approved transaction {transaction_id}",
-            note=f"Admin {user_info.email} approved transaction from {transaction.status} to completed"
+            note=f"Admin {current_user.email} approved transaction from {transaction.status} to completed"
         )
         
-        logger.info(f"[{datetime.now().isoformat()}] Transaction {transaction_id} approved successfully by admin {current_user.uid} ({user_info.email})")
+        logger.info(f"[{datetime.now().isoformat()}] Transaction {transaction_id} approved successfully by admin {current_user.uid} ({current_user.email})")
         return updated_transaction
     except Exception as e:
         logger.error(f"[{datetime.now().isoformat()}] Failed to approve transaction {transaction_id}: {str(e)}")
@@ -253,7 +220,7 @@ def approve_transaction(
 @router.put("/transactions/{transaction_id}/reject")
 def reject_transaction(
     transaction_id: int,
-    current_user: dict = Depends(get_current_user),
+    current_user: dict = Depends(get_current_user_check_revoked),
     db: Session = Depends(get_db)
 ):
     """Reject a pending transaction (admin only)"""
@@ -261,9 +228,8 @@ def reject_transaction(
     
     try:
         # Check if user is admin
-        user_info = get_user_by_uid(db, current_user.uid)
-        if not user_info or user_info.role != "admin":
-            logger.warning(f"[{datetime.now().isoformat()}] User {current_user.uid} ({user_info.email if user_info else 'unknown'}) attempted to reject transaction without admin role")
+        if current_user.role != "admin":
+            logger.warning(f"[{datetime.now().isoformat()}] User {current_user.uid} ({current_user.email}) attempted to reject transaction without admin role")
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Only admins can reject transactions"
@@ -287,19 +253,13 @@ def reject_transaction(
         # Update transaction status to cancelled
         transaction_update = AccountTransactionUpdate(status="cancelled")
         updated_transaction = crud_account.update_account_transaction(
-            db, transaction_id, transaction_update
-        )
-        
-        # Log the rejection
-        create_activity_log(
-            db=db,
-            user_id=user_info.id,
+            db, transaction_id, transaction_update, user_id=current_user.id,
             action="reject_transaction",
             description=f"Rejected transaction {transaction_id}",
-            note=f"Admin {user_info.email} rejected transaction from {transaction.status} to cancelled"
+            note=f"Admin {current_user.email} rejected transaction from {transaction.status} to cancelled"
         )
         
-        logger.info(f"[{datetime.now().isoformat()}] Transaction {transaction_id} rejected successfully by admin {current_user.uid} ({user_info.email})")
+        logger.info(f"[{datetime.now().isoformat()}] Transaction {transaction_id} rejected successfully by admin {current_user.uid} ({current_user.email})")
         return updated_transaction
     except Exception as e:
         logger.error(f"[{datetime.now().isoformat()}] Failed to reject transaction {transaction_id}: {str(e)}")
@@ -312,7 +272,7 @@ def reject_transaction(
 @router.post("/purchase-orders", response_model=PurchaseOrderResponse)
 def create_purchase_order(
     purchase_order: PurchaseOrderCreate,
-    current_user: dict = Depends(get_current_user),
+    current_user: dict = Depends(get_current_user_check_revoked),
     db: Session = Depends(get_db)
 ):
     """Create a new purchase order"""
@@ -320,28 +280,18 @@ def create_purchase_order(
     
     try:
         # Check if user has account role
-        user_info = get_user_by_uid(db, current_user.uid)
-        if not user_info or user_info.role not in ['admin', 'account']:
-            logger.warning(f"[{datetime.now().isoformat()}] User {current_user.uid} ({user_info.email if user_info else 'unknown'}) attempted to create purchase order without proper role")
+        if current_user.role not in ['admin', 'account']:
+            logger.warning(f"[{datetime.now().isoformat()}] User {current_user.uid} ({current_user.email}) attempted to create purchase order without proper role")
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Only account team members can create purchase orders"
             )
         
         db_order = crud_account.create_purchase_order(
-            db, purchase_order, current_user.uid
+            db, purchase_order, current_user.uid, user_id=current_user.id
         )
         
-        # Log the purchase order creation
-        create_activity_log(
-            db=db,
-            user_id=user_info.id,
-            action="create_purchase_order",
-            description=f"Created purchase order {db_order.order_number} for supplier {purchase_order.supplier}",
-            note=f"Total amount: ₹{purchase_order.total_amount} {purchase_order.currency}, Items: {len(purchase_order.items)}"
-        )
-        
-        logger.info(f"[{datetime.now().isoformat()}] Purchase order {db_order.order_number} created successfully by user {current_user.uid} ({user_info.email})")
+        logger.info(f"[{datetime.now().isoformat()}] Purchase order {db_order.order_number} created successfully by user {current_user.uid} ({current_user.email})")
         return db_order
     except Exception as e:
         logger.error(f"[{datetime.now().isoformat()}] Failed to create purchase order: {str(e)}")
@@ -398,7 +348,7 @@ def get_purchase_order(
 def update_purchase_order(
     order_id: int,
     order_update: PurchaseOrderUpdate,
-    current_user: dict = Depends(get_current_user),
+    current_user: dict = Depends(get_current_user_check_revoked),
     db: Session = Depends(get_db)
 ):
     """Update a purchase order"""
@@ -406,7 +356,7 @@ def update_purchase_order(
     
     try:
         order = crud_account.update_purchase_order(
-            db, order_id, order_update
+            db, order_id, order_update, user_id=current_user.id
         )
         if not order:
             logger.warning(f"[{datetime.now().isoformat()}] Purchase order {order_id} not found for update by user {current_user.uid}")
@@ -415,17 +365,6 @@ def update_purchase_order(
                 detail="Purchase order not found"
             )
         
-        # Log the purchase order update
-        user_info = get_user_by_uid(db, current_user.uid)
-        if user_info:
-            create_activity_log(
-                db=db,
-                user_id=user_info.id,
-                action="update_purchase_order",
-                description=f"Updated purchase order {order_id}",
-                note=f"Updated fields: {list(order_update.dict(exclude_unset=True).keys())}"
-            )
-        
         logger.info(f"[{datetime.now().isoformat()}] Purchase order {order_id} updated successfully by user {current_user.uid}")
         return order
     except Exception as e:
@@ -438,7 +377,7 @@ def update_purchase_order(
 @router.delete("/purchase-orders/{order_id}")
 def delete_purchase_order(
     order_id: int,
-    current_user: dict = Depends(get_current_user),
+    current_user: dict = Depends(get_current_user_check_revoked),
     db: Session = Depends(get_db)
 ):
     """Delete a purchase order (admin only)"""
@@ -446,15 +385,17 @@ def delete_purchase_order(
     
     try:
         # Check if user is admin
-        user_info = get_user_by_uid(db, current_user.uid)
-        if not user_info or user_info.role != "admin":
-            logger.warning(f"[{datetime.now().isoformat()}] User {current_user.uid} ({user_info.email if user_info else 'unknown'}) attempted to delete purchase order without admin role")
+        if current_user.role != "admin":
+            logger.warning(f"[{datetime.now().isoformat()}] User {current_user.uid} ({current_user.email}) attempted to delete purchase order without admin role")
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Only admins can delete purchase orders"
             )
         
-        success = crud_account.delete_purchase_order(db, order_id)
+        success = crud_account.delete_purchase_order(
+            db, order_id, user_id=current_user.id,
+            note=f"Admin {current_user.email} deleted purchase order"
+        )
         if not success:
             logger.warning(f"[{datetime.now().isoformat()}] Purchase order {order_id} not found for deletion by admin {current_user.uid}")
             raise HTTPException(
@@ -462,16 +403,7 @@ def delete_purchase_order(
                 detail="Purchase order not found"
             )
         
-        # Log the purchase order deletion
-        create_activity_log(
-            db=db,
-            user_id=user_info.id,
-            action="delete_purchase_order",
-            description=f"Deleted purchase order {order_id}",
-            note=f"Admin {user_info.email} deleted purchase order"
-        )
-        
-        logger.info(f"[{datetime.now().isoformat()}] Purchase order {order_id} deleted successfully by admin {current_user.uid} ({user_info.email})")
+        logger.info(f"[{datetime.now().isoformat()}] Purchase order {order_id} deleted successfully by admin {current_user.uid} ({current_user.email})")
         return {"message": "Purchase order deleted successfully"}
     except Exception as e:
         logger.error(f"[{datetime.now().isoformat()}] Failed to delete purchase order {order_id}: {str(e)}")
@@ -3,14 +3,17 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.crud.user import (
     get_all_users, get_pending_users, update_user, delete_user,
-    get_user_by_id, get_users_by_role, get_user_by_email, get_online_users
+    get_user_by_id, get_users_by_role, get_user_by_email, get_approved_users_by_ids
 )
 from app.crud.activity_log import (
     get_activity_logs, update_activity_log_note, get_activity_log_by_id, get_activity_logs_with_user_info
 )
+from app.crud.user_sessions import get_user_sessions
 from app.schema.user import UserUpdate, UserResponse
+from app.schema.user_sessions import UserSessionResponse, UserSessionListResponse
 from app.schema.activity_log import ActivityLogFilter, ActivityLogListResponse, ActivityLogNote
-from app.firebase_auth import get_admin_user
+from app.firebase_auth import get_admin_user, get_admin_user_check_revoked
+from app.services.presence import presence_store
 from app.models.user import UserRole
 from typing import List, Optional
 import firebase_admin
@@ -22,7 +25,7 @@ router = APIRouter()
 async def approve_user(
     user_id: int,
     db: Session = Depends(get_db),
-    admin_user = Depends(get_admin_user)
+    admin_user = Depends(get_admin_user_check_revoked)
 ):
     """Approve a pending user (Admin only)"""
     user = get_user_by_id(db, user_id)
@@ -50,7 +53,7 @@ async def modify_user(
     user_id: int,
     user_update: UserUpdate,
     db: Session = Depends(get_db),
-    admin_user = Depends(get_admin_user)
+    admin_user = Depends(get_admin_user_check_revoked)
 ):
     """Modify user (Admin only)"""
     user = get_user_by_id(db, user_id)
@@ -77,7 +80,7 @@ async def modify_user(
 async def delete_user_admin(
     user_id: int,
     db: Session = Depends(get_db),
-    admin_user = Depends(get_admin_user)
+    admin_user = Depends(get_admin_user_check_revoked)
 ):
     """Delete user (Admin only)"""
     user = get_user_by_id(db, user_id)
@@ -96,6 +99,7 @@ async def delete_user_admin(
     success = delete_user(db, user_id)
     if not success:
         raise HTTPException(status_code=500, detail="Failed to delete user from database")
+    presence_store.forget(user_id)
     
     # Delete user from Firebase Authentication
     try:
@@ -191,6 +195,58 @@ async def get_activity_logs_admin(
         offset=offset
     )
 
+@router.get("/sessions", response_model=UserSessionListResponse)
+async def get_user_sessions_admin(
+    user_id: Optional[int] = Query(None),
+    active_only: bool = Query(False, description="Only sessions that are still open"),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    admin_user = Depends(get_admin_user)
+):
+    """Get user online sessions with filters (Admin only)"""
+    from datetime import datetime
+    
+    # Parse dates if provided
+    start_dt = None
+    end_dt = None
+    if start_date:
+        try:
+            start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid start_date format")
+    
+    if end_date:
+        try:
+            end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid end_date format")
+    
+    sessions, total = get_user_sessions(
+        db, user_id=user_id, active_only=active_only,
+        start_date=start_dt, end_date=end_dt, skip=offset, limit=limit
+    )
+    
+    return UserSessionListResponse(
+        sessions=[
+            UserSessionResponse(
+                id=session.id,
+                user_id=session.user_id,
+                started_at=session.started_at,
+                last_seen_at=session.last_seen_at,
+                ended_at=session.ended_at,
+                flap_count=session.flap_count,
+                user_info=session.user
+            )
+            for session in sessions
+        ],
+        total=total,
+        limit=limit,
+        offset=offset
+    )
+
 @router.patch("/logs/{log_id}/note")
 async def update_log_note(
     log_id: int,
@@ -221,5 +277,7 @@ async def get_online_users_admin(
     admin_user = Depends(get_admin_user)
 ):
     """Get currently online users (Admin only)"""
-    online_users = get_online_users(db, minutes_threshold)
+    # Heartbeats live in the presence store; users.last_seen may lag by one flush interval
+    online_user_ids = presence_store.online_user_ids(minutes_threshold)
+    online_users = get_approved_users_by_ids(db, online_user_ids)
     return online_users 
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.firebase_auth import get_current_user
 from app.crud import alerts as crud_alerts
-from app.schema.alerts import AlertCreate, AlertResponse, AlertUpdate, AlertFilter
+from app.crud.pagination import MAX_FEED_PAGE_SIZE
+from app.services.unread_counters import unread_counters
+from app.schema.alerts import AlertCreate, AlertResponse, AlertUpdate, AlertFilter, AlertBulkRequest, BulkActionResponse
 from app.models.alerts import AlertType, AlertSeverity
 from typing import List, Optional
 
@@ -43,34 +45,68 @@ def get_alerts(
 
 @router.get("/unread", response_model=List[AlertResponse])
 def get_unread_alerts(
+    response: Response,
+    limit: int = Query(50, ge=1, le=MAX_FEED_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
     current_user = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get unread alerts"""
+    """Get unread alerts, newest first, keyset-paginated via the X-Next-Cursor header"""
     try:
-        alerts = crud_alerts.get_unread_alerts(db)
+        alerts, next_cursor = crud_alerts.get_unread_alerts_page(db, limit=limit, cursor=cursor)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return alerts
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch unread alerts: {str(e)}"
         )
 
+@router.get("/unread/count")
+def get_unread_alert_count(
+    current_user = Depends(get_current_user)
+):
+    """Number of unread, undismissed alerts"""
+    return {"count": unread_counters.alert_count()}
+
 @router.get("/active", response_model=List[AlertResponse])
 def get_active_alerts(
+    response: Response,
+    limit: int = Query(50, ge=1, le=MAX_FEED_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
     current_user = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get active (non-dismissed) alerts"""
+    """Get active (non-dismissed) alerts, newest first, keyset-paginated via the X-Next-Cursor header"""
     try:
-        alerts = crud_alerts.get_active_alerts(db)
+        alerts, next_cursor = crud_alerts.get_active_alerts_page(db, limit=limit, cursor=cursor)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return alerts
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch active alerts: {str(e)}"
         )
 
+@router.post("/bulk", response_model=BulkActionResponse)
+def bulk_update_alerts(
+    request: AlertBulkRequest,
+    current_user = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Mark read/unread or dismiss many alerts at once, by id list or filter"""
+    try:
+        ids = crud_alerts.bulk_update_alerts(db, request.action, ids=request.ids, filters=request.filter)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"action": request.action, "updated": len(ids), "ids": ids}
+
 @router.get("/{alert_id}", response_model=AlertResponse)
 def get_alert(
     alert_id: int,
@@ -139,9 +175,7 @@ def delete_alert(
     db: Session = Depends(get_db)
 ):
     """Delete an alert (admin only)"""
-    from app.crud import user as crud_users
-    user_info = crud_users.get_user_by_uid(db, current_user.uid)
-    if not user_info or user_info.role != "admin":
+    if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Only admins can delete alerts")
     
     success = crud_alerts.delete_alert(db, alert_id)
@@ -4,8 +4,9 @@ from app.database import get_db
 from app.crud.user import get_user_by_uid, create_user, get_user_by_email, get_user_by_phone, get_admin_user
 from app.crud.invitation import get_invitation_by_email, accept_invitation
 from app.crud.activity_log import create_activity_log
+from app.services.activity_log_sink import activity_log_sink
 from app.schema.user import UserLogin, UserLoginResponse, UserCreate
-from app.firebase_auth import verify_firebase_token, get_current_user
+from app.firebase_auth import verify_id_token, get_current_user
 from app.models.user import UserRole
 from app.services.otp_service import OTPService
 from typing import Optional
@@ -35,7 +36,7 @@ async def login(
     
     try:
         # Verify Firebase token
-        token = verify_firebase_token(login_data.firebase_token)
+        token = verify_id_token(login_data.firebase_token, check_revoked=True)
         uid = token["uid"]
         email = token["email"]
         
@@ -101,10 +102,11 @@ async def login(
                 detail="Account pending approval. Please contact administrator."
             )
         
-        # Log successful login activity
-        create_activity_log(
-            db, user.id, "login", 
-            f"User logged in: {email}",
+        # Log successful login activity (buffered: a lost login row is not worth a second commit)
+        activity_log_sink.record(
+            user_id=user.id,
+            action="login",
+            description=f"User logged in: {email}",
             note=f"Successful login for user {email} ({user.role}) at {datetime.now().isoformat()}"
         )
         
@@ -1,43 +1,122 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, UploadFile, File
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime, timedelta
+import pytz
 from app.database import get_db
 from app.firebase_auth import get_current_user
 from app.models.user import User, UserRole
+from app.models.chemical_inventory import StockStatus
 from app.schema.chemical_inventory import (
     ChemicalInventoryCreate, 
     ChemicalInventoryUpdate, 
     ChemicalInventoryResponse, 
     ChemicalInventoryWithFormulations,
-    ChemicalInventoryAddNote
+    ChemicalInventoryAddNote,
+    ChemicalQuantityAdjust,
+    ChemicalInventorySearchResult,
+    ChemicalImportResult,
+    ChemicalNoteResponse,
+    StockStatusSummary,
+    StockMovementResponse,
+    StockBalanceResponse,
+    StockConsumptionPoint
 )
 from app.crud import chemical_inventory as crud_chemical_inventory
 from app.crud import formulation_details as crud_formulation_details
+from app.crud import stock_movements as crud_stock_movements
+from app.crud.pagination import MAX_CHEMICAL_PAGE_SIZE
+from app.services.chemical_import import detect_import_format, iter_import_rows
 
 router = APIRouter()
 
 @router.get("/", response_model=List[ChemicalInventoryResponse])
 def get_chemical_inventory(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_CHEMICAL_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    order_by: Optional[str] = Query(None, pattern="^(last_updated|name)$", description="Enables cursor pagination with this ordering"),
+    stock_status: Optional[StockStatus] = Query(None, alias="status", description="Only chemicals with this stock status"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all chemical inventory items"""
+    """Get all chemical inventory items
+    
+    Passing order_by (and then cursor) switches to keyset pagination: every page
+    costs the same regardless of depth, and the next page's cursor is returned
+    in the X-Next-Cursor response header (absent on the last page).
+    """
     if not current_user.is_approved:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User not approved"
         )
     
+    if cursor or order_by:
+        try:
+            chemicals, next_cursor = crud_chemical_inventory.get_chemical_inventory_page_with_user_info(
+                db=db,
+                limit=limit,
+                cursor=cursor,
+                order_by=order_by or "last_updated",
+                user_role=current_user.role,
+                stock_status=stock_status
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return chemicals
+    
     chemicals = crud_chemical_inventory.get_chemical_inventory_with_user_info(
         db=db, 
         skip=skip, 
         limit=limit, 
-        user_role=current_user.role
+        user_role=current_user.role,
+        stock_status=stock_status
     )
     return chemicals
 
+@router.get("/status/summary", response_model=StockStatusSummary)
+def get_stock_status_summary(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Number of chemicals that are out of stock, low and in stock"""
+    if not current_user.is_approved:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User not approved"
+        )
+    
+    return crud_chemical_inventory.get_stock_status_summary(db)
+
+@router.get("/search", response_model=List[ChemicalInventorySearchResult])
+def search_chemical_inventory(
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Search chemical inventory by name, supplier, location and formulation, ranked by relevance"""
+    if not current_user.is_approved:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User not approved"
+        )
+    
+    return crud_chemical_inventory.search_chemical_inventory(
+        db=db,
+        q=q.strip(),
+        skip=skip,
+        limit=limit
+    )
+
 @router.get("/{chemical_id}", response_model=ChemicalInventoryWithFormulations)
 def get_chemical_inventory_by_id(
     chemical_id: int,
@@ -76,9 +155,13 @@ def get_chemical_inventory_by_id(
         unit=chemical["unit"],
         formulation=chemical["formulation"],
         notes=chemical["notes"],
+        stock_status=chemical["stock_status"],
+        version=chemical["version"],
         last_updated=chemical["last_updated"],
         updated_by=chemical["updated_by"],
         updated_by_user=chemical["updated_by_user"],
+        note_count=chemical["note_count"],
+        latest_note=chemical["latest_note"],
         formulation_details=formulation_details
     )
     
@@ -102,7 +185,8 @@ def create_chemical_inventory(
             db=db,
             chemical=chemical,
             user_uid=current_user.uid,
-            user_role=current_user.role
+            user_role=current_user.role,
+            user_id=current_user.id
         )
     except PermissionError as e:
         raise HTTPException(
@@ -110,6 +194,47 @@ def create_chemical_inventory(
             detail=str(e)
         )
 
+@router.post("/import", response_model=ChemicalImportResult)
+def import_chemical_inventory(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Bulk-create chemical inventory items from a CSV or XLSX sheet
+    
+    The header row names the columns (name, quantity, unit, formulation, notes,
+    alert_threshold, supplier, location). Valid rows are imported; invalid rows
+    are reported back by row number. A file that cannot be opened is rejected with
+    400 before anything is imported; one that breaks partway through keeps the rows
+    read so far and reports where it stopped in file_error.
+    """
+    if not current_user.is_approved:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User not approved"
+        )
+    
+    try:
+        file_format = detect_import_format(file.filename, file.content_type)
+        return crud_chemical_inventory.import_chemical_inventory(
+            db=db,
+            rows=iter_import_rows(file.file, file_format),
+            user_uid=current_user.uid,
+            user_role=current_user.role,
+            source=file.filename or "upload",
+            user_id=current_user.id
+        )
+    except PermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Could not read import file: {str(e)}"
+        )
+
 @router.patch("/{chemical_id}", response_model=ChemicalInventoryResponse)
 def update_chemical_inventory(
     chemical_id: int,
@@ -117,7 +242,12 @@ def update_chemical_inventory(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Update a chemical inventory item"""
+    """Update a chemical inventory item
+    
+    A quantity change only applies while the chemical is still at the version the
+    caller read (the version field, or else the server's own read); otherwise 409.
+    Use /adjust to add or remove stock relative to the current quantity.
+    """
     if not current_user.is_approved:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -130,7 +260,8 @@ def update_chemical_inventory(
             chemical_id=chemical_id,
             chemical_update=chemical_update,
             user_uid=current_user.uid,
-            user_role=current_user.role
+            user_role=current_user.role,
+            user_id=current_user.id
         )
         if not updated_chemical:
             raise HTTPException(
@@ -143,8 +274,101 @@ def update_chemical_inventory(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=str(e)
         )
+    except crud_chemical_inventory.StaleVersionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
 
-@router.post("/{chemical_id}/notes", response_model=ChemicalInventoryResponse)
+@router.post("/{chemical_id}/adjust", response_model=ChemicalInventoryResponse)
+def adjust_chemical_quantity(
+    chemical_id: int,
+    adjustment: ChemicalQuantityAdjust,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Add a signed delta to a chemical's quantity
+    
+    Safe under concurrent use: the delta is applied by the database to the current
+    quantity. Pass the version from the last read to reject the adjustment (409) if the
+    chemical has changed since.
+    """
+    if not current_user.is_approved:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User not approved"
+        )
+    
+    try:
+        adjusted_chemical = crud_chemical_inventory.adjust_chemical_quantity(
+            db=db,
+            chemical_id=chemical_id,
+            adjustment=adjustment,
+            user_uid=current_user.uid,
+            user_role=current_user.role,
+            user_id=current_user.id
+        )
+    except PermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except crud_chemical_inventory.StaleVersionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if not adjusted_chemical:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chemical inventory item not found"
+        )
+    return adjusted_chemical
+
+@router.get("/{chemical_id}/notes", response_model=List[ChemicalNoteResponse])
+def get_chemical_notes(
+    chemical_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a chemical inventory item's note history, newest first"""
+    if not current_user.is_approved:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User not approved"
+        )
+    
+    if not crud_chemical_inventory.get_chemical_inventory_by_id(db=db, chemical_id=chemical_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chemical inventory item not found"
+        )
+    
+    try:
+        notes, next_cursor = crud_chemical_inventory.get_chemical_notes(
+            db=db,
+            chemical_id=chemical_id,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return notes
+
+@router.post("/{chemical_id}/notes", response_model=ChemicalNoteResponse)
 def add_note_to_chemical_inventory(
     chemical_id: int,
     note_data: ChemicalInventoryAddNote,
@@ -158,19 +382,101 @@ def add_note_to_chemical_inventory(
             detail="User not approved"
         )
     
-    updated_chemical = crud_chemical_inventory.add_note_to_chemical_inventory(
+    note = crud_chemical_inventory.add_note_to_chemical_inventory(
         db=db,
         chemical_id=chemical_id,
         note_data=note_data,
         user_uid=current_user.uid,
-        user_role=current_user.role
+        user_role=current_user.role,
+        user_id=current_user.id,
+        author_name=f"{current_user.first_name} {current_user.last_name or ''}".strip()
     )
-    if not updated_chemical:
+    if not note:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Chemical inventory item not found"
         )
-    return updated_chemical
+    return note
+
+@router.get("/{chemical_id}/movements", response_model=List[StockMovementResponse])
+def get_stock_movements(
+    chemical_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a chemical's stock ledger, newest first (kept after the chemical is deleted)"""
+    if not current_user.is_approved:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User not approved"
+        )
+    
+    try:
+        movements, next_cursor = crud_stock_movements.get_stock_movements(
+            db=db,
+            chemical_id=chemical_id,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return movements
+
+@router.get("/{chemical_id}/balance", response_model=StockBalanceResponse)
+def get_stock_balance(
+    chemical_id: int,
+    at: Optional[datetime] = Query(None, description="Point in time (defaults to now; naive values are UTC)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a chemical's quantity at a point in time, from the stock ledger"""
+    if not current_user.is_approved:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User not approved"
+        )
+    
+    at = _as_utc(at) if at else datetime.now(pytz.UTC)
+    return {
+        "chemical_id": chemical_id,
+        "at": at,
+        "quantity": crud_stock_movements.get_balance_at(db=db, chemical_id=chemical_id, at=at)
+    }
+
+@router.get("/{chemical_id}/consumption", response_model=List[StockConsumptionPoint])
+def get_stock_consumption(
+    chemical_id: int,
+    start: Optional[datetime] = Query(None, description="Defaults to 30 days before end"),
+    end: Optional[datetime] = Query(None, description="Defaults to now"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a chemical's daily received/consumed quantities, from the stock ledger"""
+    if not current_user.is_approved:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User not approved"
+        )
+    
+    end = _as_utc(end) if end else datetime.now(pytz.UTC)
+    start = _as_utc(start) if start else end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end"
+        )
+    return crud_stock_movements.get_consumption_series(db=db, chemical_id=chemical_id, start=start, end=end)
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=pytz.UTC)
 
 @router.delete("/{chemical_id}")
 def delete_chemical_inventory(
@@ -190,7 +496,8 @@ def delete_chemical_inventory(
             db=db,
             chemical_id=chemical_id,
             user_uid=current_user.uid,
-            user_role=current_user.role
+            user_role=current_user.role,
+            user_id=current_user.id
         )
         if not success:
             raise HTTPException(
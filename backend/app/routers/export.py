@@ -0,0 +1,113 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from typing import Iterator, Optional
+from datetime import datetime
+import csv
+import enum
+import io
+import json
+import logging
+from app.database import SessionLocal
+from app.firebase_auth import get_current_user
+from app.models.user import User, UserRole
+from app.crud import export as crud_export
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson"
+}
+
+def _serialize(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+def _stream_export(statement, file_format: str) -> Iterator[str]:
+    """Stream a select statement as CSV or NDJSON, one cursor batch at a time.
+    
+    Uses its own session so the connection stays open for as long as the response
+    is being sent, and yield_per so the driver uses a server-side cursor and memory
+    stays flat regardless of the number of rows.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        columns = list(result.keys())
+        
+        if file_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            yield buffer.getvalue()
+            for partition in result.partitions():
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows([[_serialize(value) for value in row] for row in partition])
+                yield buffer.getvalue()
+        else:
+            for partition in result.partitions():
+                yield "".join(
+                    json.dumps({column: _serialize(value) for column, value in zip(columns, row)}) + "\n"
+                    for row in partition
+                )
+    finally:
+        db.close()
+
+@router.get("/{resource}")
+def export_resource(
+    resource: str,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    chemical_id: Optional[int] = Query(None, description="transactions: filter by chemical"),
+    user_id: Optional[int] = Query(None, description="logs: filter by user"),
+    action: Optional[str] = Query(None, description="logs: filter by action"),
+    start_date: Optional[datetime] = Query(None, description="logs: on or after this time"),
+    end_date: Optional[datetime] = Query(None, description="logs: on or before this time"),
+    current_user: User = Depends(get_current_user)
+):
+    """Export chemicals, account transactions or activity logs as CSV or NDJSON"""
+    if not current_user.is_approved:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User not approved"
+        )
+    
+    if resource == "chemicals":
+        statement = crud_export.build_chemicals_export()
+    elif resource == "transactions":
+        statement = crud_export.build_transactions_export(chemical_id=chemical_id)
+    elif resource == "logs":
+        if current_user.role != UserRole.ADMIN:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Admin access required"
+            )
+        statement = crud_export.build_logs_export(
+            user_id=user_id,
+            action=action,
+            start_date=start_date,
+            end_date=end_date
+        )
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown export resource: {resource}. Available: {', '.join(crud_export.EXPORT_RESOURCES)}"
+        )
+    
+    logger.info(f"[{datetime.now().isoformat()}] User {current_user.uid} exporting {resource} as {format}")
+    
+    filename = f"{resource}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{format}"
+    return StreamingResponse(
+        _stream_export(statement, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
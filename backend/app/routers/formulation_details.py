@@ -98,7 +98,8 @@ def create_formulation_details(
             db=db,
             formulation=formulation,
             user_uid=current_user.uid,
-            user_role=current_user.role
+            user_role=current_user.role,
+            user_id=current_user.id
         )
     except PermissionError as e:
         raise HTTPException(
@@ -131,7 +132,8 @@ def update_formulation_details(
             formulation_id=formulation_id,
             formulation_update=formulation_update,
             user_uid=current_user.uid,
-            user_role=current_user.role
+            user_role=current_user.role,
+            user_id=current_user.id
         )
         if not updated_formulation:
             raise HTTPException(
@@ -164,7 +166,8 @@ def add_note_to_formulation_details(
         formulation_id=formulation_id,
         note_data=note_data,
         user_uid=current_user.uid,
-        user_role=current_user.role
+        user_role=current_user.role,
+        user_id=current_user.id
     )
     if not updated_formulation:
         raise HTTPException(
@@ -191,7 +194,8 @@ def delete_formulation_details(
             db=db,
             formulation_id=formulation_id,
             user_uid=current_user.uid,
-            user_role=current_user.role
+            user_role=current_user.role,
+            user_id=current_user.id
         )
         if not success:
             raise HTTPException(
@@ -1,18 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.firebase_auth import get_current_user
+from app.database import get_db, SessionLocal
+from app.firebase_auth import get_current_user, verify_firebase_token
+from app.services.notification_hub import notification_hub
+from app.services.unread_counters import unread_counters
+from app.services.stream_tickets import stream_tickets
 from app.crud import notifications as crud_notifications
 from app.crud import user as crud_users
-from app.schema.notifications import NotificationCreate, NotificationResponse, NotificationUpdate, NotificationSend, NotificationFilter, NotificationDeleteRequest
+from app.crud.pagination import MAX_FEED_PAGE_SIZE
+from app.schema.notifications import NotificationCreate, NotificationResponse, NotificationUpdate, NotificationSend, NotificationFilter, NotificationDeleteRequest, NotificationBulkRequest, StreamTicketResponse
+from app.schema.alerts import BulkActionResponse
 from app.models.notifications import NotificationCategory, NotificationPriority, NotificationStatus
 from typing import List, Optional
+import asyncio
 import json
 
 router = APIRouter(tags=["notifications"])
 
-def enrich_notification_response(notification, db: Session) -> dict:
-    """Enrich notification response with creator information"""
+def enrich_notification_response(notification, db: Session, current_user=None) -> dict:
+    """Enrich notification response with creator information and the caller's read state"""
+    return enrich_notification_responses([notification], db, current_user)[0]
+
+def enrich_notification_responses(notifications, db: Session, current_user=None) -> List[dict]:
+    """Enrich a page of notifications, resolving all creators in a single query"""
+    creator_names = crud_users.get_display_names_by_uids(db, (n.created_by for n in notifications))
+    return [_notification_response(n, creator_names, current_user) for n in notifications]
+
+def _notification_response(notification, creator_names: dict, current_user=None) -> dict:
     response_data = {
         "id": notification.id,
         "type": notification.type,
@@ -25,19 +40,25 @@ def enrich_notification_response(notification, db: Session) -> dict:
         "user_id": notification.user_id,
         "created_by": notification.created_by,
         "timestamp": notification.timestamp,
-        "is_read": notification.is_read,
+        "is_read": _is_read_for(notification, current_user),
         "is_dismissed": notification.is_dismissed,
-        "recipients": json.loads(notification.recipients) if notification.recipients else []
+        # Built from the (eager-loaded) recipient rows rather than parsing the JSON column
+        "recipients": [row.role for row in notification.recipient_rows if row.role is not None],
+        "recipient_users": [row.user_uid for row in notification.recipient_rows if row.user_uid is not None],
+        "creator_name": creator_names.get(notification.created_by)
     }
-    
-    # Add creator name if available
-    if notification.created_by:
-        creator = crud_users.get_user_by_uid(db, notification.created_by)
-        if creator:
-            response_data["creator_name"] = f"{creator.first_name} {creator.last_name or ''}".strip()
-    
     return response_data
 
+def _is_read_for(notification, current_user) -> bool:
+    """Read state of the caller's own recipient rows, falling back to the notification's flag"""
+    if current_user is None:
+        return notification.is_read
+    rows = [
+        row for row in notification.recipient_rows
+        if row.role == current_user.role or row.user_uid == current_user.uid
+    ]
+    return all(row.is_read for row in rows) if rows else notification.is_read
+
 @router.post("/send", response_model=NotificationResponse)
 def send_notification(
     notification: NotificationSend,
@@ -46,27 +67,21 @@ def send_notification(
 ):
     """Send a notification to specified recipients"""
     try:
-        # Create notification for each recipient role
-        notifications = []
-        for recipient_role in notification.recipients:
-            notification_data = NotificationCreate(
-                type=notification.type,
-                severity=notification.severity,
-                message=notification.message,
-                category=notification.category,
-                priority=notification.priority,
-                chemical_id=notification.chemical_id,
-                recipients=[recipient_role]
-            )
-            db_notification = crud_notifications.create_notification(
-                db, notification_data, current_user.uid, current_user.uid
-            )
-            notifications.append(db_notification)
-        
-        # Return the first notification enriched with creator info
-        if notifications:
-            return enrich_notification_response(notifications[0], db)
-        return None
+        # Stored once, with one delivery row per recipient role/user
+        notification_data = NotificationCreate(
+            type=notification.type,
+            severity=notification.severity,
+            message=notification.message,
+            category=notification.category,
+            priority=notification.priority,
+            chemical_id=notification.chemical_id,
+            recipients=notification.recipients,
+            recipient_users=notification.recipient_users
+        )
+        db_notification = crud_notifications.create_notification(
+            db, notification_data, current_user.uid, current_user.uid
+        )
+        return enrich_notification_response(db_notification, db, current_user)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -88,9 +103,8 @@ def get_notifications(
 ):
     """Get notifications for the current user's role with filters"""
     try:
-        # Get user role from the database
-        user_info = crud_users.get_user_by_uid(db, current_user.uid)
-        user_role = user_info.role if user_info else "all_users"
+        # Role comes from the resolved principal, no extra lookup
+        user_role = current_user.role
 
         # Only filter by user_role if not admin
         role_filter = None if user_role == "admin" else user_role
@@ -108,15 +122,11 @@ def get_notifications(
         )
 
         notifications = crud_notifications.get_notifications(
-            db, skip=skip, limit=limit, user_role=role_filter, filters=filters
+            db, skip=skip, limit=limit, user_role=role_filter, filters=filters, user_uid=current_user.uid
         )
 
         # Enrich responses with creator information
-        enriched_notifications = []
-        for notification in notifications:
-            enriched_notifications.append(enrich_notification_response(notification, db))
-
-        return enriched_notifications
+        return enrich_notification_responses(notifications, db, current_user)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -125,52 +135,154 @@ def get_notifications(
 
 @router.get("/unread", response_model=List[NotificationResponse])
 def get_unread_notifications(
+    response: Response,
+    limit: int = Query(50, ge=1, le=MAX_FEED_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
     current_user = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get unread notifications for the current user's role"""
+    """Get unread notifications for the current user's role, newest first.
+    
+    Keyset-paginated: the next page's cursor is returned in the X-Next-Cursor
+    response header (absent on the last page).
+    """
     try:
-        user_info = crud_users.get_user_by_uid(db, current_user.uid)
-        user_role = user_info.role if user_info else "all_users"
+        user_role = current_user.role
         
-        notifications = crud_notifications.get_unread_notifications(db, user_role)
+        notifications, next_cursor = crud_notifications.get_unread_notifications_page(
+            db, user_role, current_user.uid, limit=limit, cursor=cursor
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         
         # Enrich responses with creator information
-        enriched_notifications = []
-        for notification in notifications:
-            enriched_notifications.append(enrich_notification_response(notification, db))
-        
-        return enriched_notifications
+        return enrich_notification_responses(notifications, db, current_user)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch unread notifications: {str(e)}"
         )
 
+@router.get("/unread/count")
+def get_unread_notification_count(
+    current_user = Depends(get_current_user)
+):
+    """Number of unread, undismissed notifications for the current user's role and the user"""
+    return {"count": unread_counters.notification_count(current_user.role) + unread_counters.notification_count(f"user:{current_user.uid}")}
+
 @router.get("/active", response_model=List[NotificationResponse])
 def get_active_notifications(
+    response: Response,
+    limit: int = Query(50, ge=1, le=MAX_FEED_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
     current_user = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get active (non-dismissed) notifications for the current user's role"""
+    """Get active (non-dismissed) notifications for the current user's role, newest first.
+    
+    Keyset-paginated: the next page's cursor is returned in the X-Next-Cursor
+    response header (absent on the last page).
+    """
     try:
-        user_info = crud_users.get_user_by_uid(db, current_user.uid)
-        user_role = user_info.role if user_info else "all_users"
+        user_role = current_user.role
         
-        notifications = crud_notifications.get_active_notifications(db, user_role)
+        notifications, next_cursor = crud_notifications.get_active_notifications_page(
+            db, user_role, current_user.uid, limit=limit, cursor=cursor
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         
         # Enrich responses with creator information
-        enriched_notifications = []
-        for notification in notifications:
-            enriched_notifications.append(enrich_notification_response(notification, db))
-        
-        return enriched_notifications
+        return enrich_notification_responses(notifications, db, current_user)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch active notifications: {str(e)}"
         )
 
+# Seconds between keep-alive comments, so proxies don't drop idle streams
+STREAM_KEEPALIVE_SECONDS = 15
+
+@router.post("/stream/ticket", response_model=StreamTicketResponse)
+def create_stream_ticket(
+    current_user = Depends(get_current_user)
+):
+    """Issue a short-lived, single-use ticket for opening the notification stream"""
+    return {"ticket": stream_tickets.issue(current_user.uid), "expires_in": stream_tickets.ttl}
+
+def get_stream_user(
+    request: Request,
+    ticket: Optional[str] = Query(None, description="Ticket from POST /stream/ticket, for EventSource clients that cannot send headers")
+):
+    """Authenticate a stream request, by ticket or by Authorization header.
+
+    A sync dependency, so FastAPI runs the blocking token verification and user lookup
+    in its threadpool instead of on the event loop that serves every open stream.
+    """
+    if ticket:
+        uid = stream_tickets.redeem(ticket)
+        if uid is None:
+            raise HTTPException(status_code=401, detail="Stream ticket invalid or expired")
+        decoded_token = {"uid": uid}
+    else:
+        decoded_token = verify_firebase_token(request)
+
+    # Resolve the user without holding a pooled connection for the life of the stream
+    db = SessionLocal()
+    try:
+        return get_current_user(token=decoded_token, db=db)
+    finally:
+        db.close()
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    current_user = Depends(get_stream_user)
+):
+    """Server-sent events stream of new notifications and alerts for the current user's role"""
+    subscription = notification_hub.subscribe(None if current_user.role == "admin" else current_user.role, current_user.uid)
+
+    async def event_stream():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            notification_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/bulk", response_model=BulkActionResponse)
+def bulk_update_notifications(
+    request: NotificationBulkRequest,
+    current_user = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Mark read/unread or dismiss many notifications at once, by id list or filter"""
+    # Admins act on every notification for every recipient; others on their own inbox
+    role_filter = None if current_user.role == "admin" else current_user.role
+    try:
+        ids = crud_notifications.bulk_update_notifications(
+            db, request.action, ids=request.ids, filters=request.filter,
+            user_role=role_filter, user_uid=current_user.uid
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"action": request.action, "updated": len(ids), "ids": ids}
+
 @router.get("/{notification_id}", response_model=NotificationResponse)
 def get_notification(
     notification_id: int,
@@ -184,7 +296,7 @@ def get_notification(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Notification not found"
         )
-    return enrich_notification_response(notification, db)
+    return enrich_notification_response(notification, db, current_user)
 
 @router.put("/{notification_id}", response_model=NotificationResponse)
 def update_notification(
@@ -200,7 +312,7 @@ def update_notification(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Notification not found"
         )
-    return enrich_notification_response(notification, db)
+    return enrich_notification_response(notification, db, current_user)
 
 @router.post("/{notification_id}/dismiss", response_model=NotificationResponse)
 def dismiss_notification(
@@ -215,7 +327,7 @@ def dismiss_notification(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Notification not found"
         )
-    return enrich_notification_response(notification, db)
+    return enrich_notification_response(notification, db, current_user)
 
 @router.post("/{notification_id}/read", response_model=NotificationResponse)
 def mark_notification_read(
@@ -223,14 +335,14 @@ def mark_notification_read(
     current_user = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Mark a notification as read"""
-    notification = crud_notifications.mark_notification_read(db, notification_id)
+    """Mark a notification as read for the current user's role (and the user)"""
+    notification = crud_notifications.mark_notification_read(db, notification_id, current_user.role, current_user.uid)
     if not notification:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Notification not found"
         )
-    return enrich_notification_response(notification, db)
+    return enrich_notification_response(notification, db, current_user)
 
 @router.delete("/{notification_id}")
 def delete_notification(
@@ -244,13 +356,8 @@ def delete_notification(
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
 
-    user_info = crud_users.get_user_by_uid(db, current_user.uid)
-    user_role = user_info.role if user_info else None
-    recipients = []
-    try:
-        recipients = json.loads(notification.recipients) if notification.recipients else []
-    except Exception:
-        pass
+    user_role = current_user.role
+    recipients = [row.role for row in notification.recipient_rows if row.role is not None]
 
     # Admin can delete any notification
     if user_role == "admin":
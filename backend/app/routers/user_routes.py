@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.crud.user import get_user_by_id, get_user_by_uid, update_user_last_seen, set_user_online, set_user_offline
-from app.crud.activity_log import get_user_activity_logs, create_activity_log
+from app.crud.user import get_user_by_id, get_user_by_uid, set_user_online, set_user_offline
+from app.crud.activity_log import get_user_activity_logs
+from app.services.presence import presence_store
 from app.schema.user import DashboardResponse, UserResponse
 from app.schema.activity_log import ActivityLogResponse
 from app.firebase_auth import get_approved_user, get_firebase_token
@@ -26,19 +27,14 @@ async def get_current_user_info(
 
 @router.post("/ping")
 async def update_last_seen(
-    current_user = Depends(get_approved_user),
-    db: Session = Depends(get_db)
+    current_user = Depends(get_approved_user)
 ):
     """Update user's last seen timestamp (heartbeat)"""
-    logger.info(f"[{datetime.now().isoformat()}] Heartbeat from user {current_user.uid} ({current_user.email})")
+    # Recorded in the presence store; users.last_seen is written in bulk by its flush worker
+    last_seen = presence_store.heartbeat(current_user.id)
     
-    updated_user = update_user_last_seen(db, current_user.id)
-    if not updated_user:
-        logger.warning(f"[{datetime.now().isoformat()}] User {current_user.uid} not found for heartbeat update")
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    logger.info(f"[{datetime.now().isoformat()}] Heartbeat updated successfully for user {current_user.uid} ({current_user.email})")
-    return {"message": "Last seen updated", "last_seen": updated_user.last_seen}
+    logger.debug(f"[{datetime.now().isoformat()}] Heartbeat recorded for user {current_user.uid} ({current_user.email})")
+    return {"message": "Last seen updated", "last_seen": last_seen}
 
 @router.get("/status")
 async def get_user_status(
@@ -140,47 +136,22 @@ async def set_online(
     current_user = Depends(get_approved_user),
     db: Session = Depends(get_db)
 ):
-    """Set user as online and log the event"""
+    """Set user as online (recorded as a user session, not an activity log)"""
     logger.info(f"[{datetime.now().isoformat()}] User {current_user.uid} ({current_user.email}) setting status to ONLINE")
     
-    user = set_user_online(db, current_user.id)
-    if not user:
-        logger.warning(f"[{datetime.now().isoformat()}] User {current_user.uid} not found for online status update")
-        raise HTTPException(status_code=404, detail="User not found")
+    set_user_online(db, current_user.id)
+    presence_store.heartbeat(current_user.id)
     
-    # Log the online status change
-    create_activity_log(
-        db=db,
-        user_id=current_user.id,
-        action="user_online",
-        description=f"User {current_user.email} went online",
-        note=f"User {current_user.email} ({current_user.role}) is now online"
-    )
-    
-    logger.info(f"[{datetime.now().isoformat()}] User {current_user.uid} ({current_user.email}) is now ONLINE")
-    return {"message": "User set as online", "is_online": user.is_online}
+    return {"message": "User set as online", "is_online": True}
 
 @router.post("/offline")
 async def set_offline(
     current_user = Depends(get_approved_user),
     db: Session = Depends(get_db)
 ):
-    """Set user as offline and log the event"""
+    """Set user as offline (closes the user session)"""
     logger.info(f"[{datetime.now().isoformat()}] User {current_user.uid} ({current_user.email}) setting status to OFFLINE")
     
-    user = set_user_offline(db, current_user.id)
-    if not user:
-        logger.warning(f"[{datetime.now().isoformat()}] User {current_user.uid} not found for offline status update")
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    # Log the offline status change
-    create_activity_log(
-        db=db,
-        user_id=current_user.id,
-        action="user_offline",
-        description=f"User {current_user.email} went offline",
-        note=f"User {current_user.email} ({current_user.role}) is now offline"
-    )
+    set_user_offline(db, current_user.id)
     
-    logger.info(f"[{datetime.now().isoformat()}] User {current_user.uid} ({current_user.email}) is now OFFLINE")
-    return {"message": "User set as offline", "is_online": user.is_online} 
\ No newline at end of file
+    return {"message": "User set as offline", "is_online": False}
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
+import enum
 from app.models.alerts import AlertSeverity, AlertType
 
 class AlertBase(BaseModel):
@@ -18,6 +19,9 @@ class AlertResponse(AlertBase):
     timestamp: datetime
     is_read: bool
     is_dismissed: bool
+    resolved_at: Optional[datetime] = None
+    occurrence_count: int = 1
+    last_seen_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
@@ -33,4 +37,19 @@ class AlertFilter(BaseModel):
     is_dismissed: Optional[bool] = None
     chemical_id: Optional[int] = None
     skip: int = 0
-    limit: int = 50 
+    limit: int = 50
+
+class BulkAction(str, enum.Enum):
+    READ = "read"
+    UNREAD = "unread"
+    DISMISS = "dismiss"
+
+class AlertBulkRequest(BaseModel):
+    action: BulkAction
+    ids: Optional[List[int]] = None
+    filter: Optional[AlertFilter] = None  # Used when ids is not given; skip/limit are ignored
+
+class BulkActionResponse(BaseModel):
+    action: BulkAction
+    updated: int
+    ids: List[int]
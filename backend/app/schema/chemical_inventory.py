@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 from app.models.user import UserRole
+from app.models.chemical_inventory import StockStatus
+from app.models.stock_movements import MovementReason
 
 # Base schema
 class ChemicalInventoryBase(BaseModel):
@@ -28,6 +30,22 @@ class ChemicalInventoryUpdate(BaseModel):
     alert_threshold: Optional[float] = Field(None, ge=0)
     supplier: Optional[str] = None
     location: Optional[str] = None
+    version: Optional[int] = Field(None, description="With quantity: reject the update unless the chemical is still at this version")
+
+    @field_validator("name", "quantity", "unit")
+    @classmethod
+    def not_null(cls, value, info):
+        # Optional means "may be left out"; these columns cannot be cleared
+        if value is None:
+            raise ValueError(f"{info.field_name} cannot be null; omit it to leave it unchanged")
+        return value
+
+# Signed quantity adjustment (POST /chemicals/{id}/adjust)
+class ChemicalQuantityAdjust(BaseModel):
+    delta: float
+    version: Optional[int] = Field(None, description="Reject the adjustment unless the chemical is still at this version")
+    transaction_id: Optional[int] = None
+    reference: Optional[str] = Field(None, max_length=255)
 
 # Add note schema (for appending notes)
 class ChemicalInventoryAddNote(BaseModel):
@@ -43,16 +61,85 @@ class UserInfo(BaseModel):
     class Config:
         from_attributes = True
 
+# Note history entry
+class ChemicalNoteResponse(BaseModel):
+    id: int
+    chemical_id: int
+    author_uid: Optional[str] = None
+    author_name: Optional[str] = None
+    created_at: datetime
+    body: str
+    
+    class Config:
+        from_attributes = True
+
 # Response schema
 class ChemicalInventoryResponse(ChemicalInventoryBase):
     id: int
+    stock_status: Optional[StockStatus] = None
+    version: Optional[int] = None
     last_updated: datetime
     updated_by: Optional[str] = None
     updated_by_user: Optional[UserInfo] = None
+    # Only populated by list/detail reads; the full history is at /chemicals/{id}/notes
+    note_count: Optional[int] = None
+    latest_note: Optional[ChemicalNoteResponse] = None
+    
+    class Config:
+        from_attributes = True
+
+# Search result with relevance score (higher is more relevant)
+class ChemicalInventorySearchResult(ChemicalInventoryResponse):
+    rank: float
+
+# Bulk import report
+class ChemicalImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+class ChemicalImportResult(BaseModel):
+    total_rows: int
+    imported: int
+    failed: int
+    errors: List[ChemicalImportRowError] = []
+    # Set when the file stopped being readable partway through; rows before it were imported
+    file_error: Optional[str] = None
+
+# Number of chemicals per stock status
+class StockStatusSummary(BaseModel):
+    out_of_stock: int
+    low: int
+    in_stock: int
+    total: int
+
+# Stock ledger entry
+class StockMovementResponse(BaseModel):
+    id: int
+    chemical_id: int
+    delta: float
+    reason: MovementReason
+    transaction_id: Optional[int] = None
+    reference: Optional[str] = None
+    user_uid: Optional[str] = None
+    user_name: Optional[str] = None
+    created_at: datetime
     
     class Config:
         from_attributes = True
 
+# Quantity of a chemical at a point in time
+class StockBalanceResponse(BaseModel):
+    chemical_id: int
+    at: datetime
+    quantity: float
+
+# One day of a consumption series
+class StockConsumptionPoint(BaseModel):
+    day: date
+    received: float
+    consumed: float
+    net: float
+
 # Response with formulation details
 class ChemicalInventoryWithFormulations(ChemicalInventoryResponse):
     formulation_details: List["FormulationDetailsResponse"] = []
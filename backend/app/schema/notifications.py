@@ -2,6 +2,7 @@ from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
 from app.models.notifications import NotificationCategory, NotificationPriority, NotificationStatus
+from app.schema.alerts import BulkAction
 
 class NotificationBase(BaseModel):
     type: str
@@ -12,6 +13,7 @@ class NotificationBase(BaseModel):
     status: NotificationStatus = NotificationStatus.PENDING
     chemical_id: Optional[int] = None
     recipients: Optional[List[str]] = None
+    recipient_users: Optional[List[str]] = None  # Firebase uids of individual recipients
 
 class NotificationCreate(NotificationBase):
     pass
@@ -44,6 +46,7 @@ class NotificationSend(BaseModel):
     chemical_id: Optional[int] = None
     timestamp: Optional[datetime] = None
     recipients: List[str] = ['admin', 'product']
+    recipient_users: List[str] = []
 
 class NotificationFilter(BaseModel):
     category: Optional[NotificationCategory] = None
@@ -56,4 +59,13 @@ class NotificationFilter(BaseModel):
     limit: int = 50
 
 class NotificationDeleteRequest(BaseModel):
-    delete_comment: Optional[str] = None 
\ No newline at end of file
+    delete_comment: Optional[str] = None
+
+class NotificationBulkRequest(BaseModel):
+    action: BulkAction
+    ids: Optional[List[int]] = None
+    filter: Optional[NotificationFilter] = None  # Used when ids is not given; skip/limit are ignored
+
+class StreamTicketResponse(BaseModel):
+    ticket: str
+    expires_in: int  # Seconds
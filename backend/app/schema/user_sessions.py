@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+from app.schema.activity_log import UserInfo
+
+class UserSessionResponse(BaseModel):
+    id: int
+    user_id: int
+    started_at: datetime
+    last_seen_at: datetime
+    ended_at: Optional[datetime] = None  # None while the session is open
+    flap_count: int
+    user_info: Optional[UserInfo] = None
+
+    class Config:
+        from_attributes = True
+
+class UserSessionListResponse(BaseModel):
+    sessions: List[UserSessionResponse]
+    total: int
+    limit: int
+    offset: int
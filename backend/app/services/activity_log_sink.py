@@ -0,0 +1,180 @@
+import os
+import queue
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import List, Optional
+import pytz
+from sqlalchemy import insert
+from app.database import SessionLocal
+from app.models.activity_log import ActivityLog
+from app.models.user import User
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# "async" buffers rows and writes them from a background worker; "sync" writes every row
+# immediately (useful for tests and scripts that read the log right after writing it)
+ACTIVITY_LOG_MODE = os.getenv("ACTIVITY_LOG_MODE", "async").lower()
+ACTIVITY_LOG_QUEUE_SIZE = int(os.getenv("ACTIVITY_LOG_QUEUE_SIZE", 10000))
+ACTIVITY_LOG_BATCH_SIZE = int(os.getenv("ACTIVITY_LOG_BATCH_SIZE", 200))
+ACTIVITY_LOG_FLUSH_INTERVAL = float(os.getenv("ACTIVITY_LOG_FLUSH_INTERVAL", 2.0))
+
+class ActivityLogSink:
+    """Write-behind sink for activity log rows.
+
+    Rows are queued in a bounded in-process queue and written by a background worker
+    in multi-row inserts, whenever batch_size rows are waiting or flush_interval seconds
+    have passed. The worker is started and stopped with the application; stopping flushes
+    everything still queued. Callers that must not lose the row to a crash (or need to
+    read it back immediately) pass sync=True. A batch that fails to insert is retried
+    one row at a time, so a bad row loses only itself (and is logged in full).
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = ACTIVITY_LOG_QUEUE_SIZE,
+        batch_size: int = ACTIVITY_LOG_BATCH_SIZE,
+        flush_interval: float = ACTIVITY_LOG_FLUSH_INTERVAL,
+        synchronous: bool = ACTIVITY_LOG_MODE == "sync"
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.synchronous = synchronous
+        self._queue: "queue.Queue[dict]" = queue.Queue(maxsize=max_queue_size)
+        self._stop_event = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._worker is not None and self._worker.is_alive()
+
+    def start(self):
+        """Start the background worker (no-op in synchronous mode)"""
+        if self.synchronous or self.is_running:
+            return
+        self._stop_event.clear()
+        self._worker = threading.Thread(target=self._run, name="activity-log-sink", daemon=True)
+        self._worker.start()
+        logger.info("✅ Activity log sink started")
+
+    def stop(self, timeout: float = 10.0):
+        """Stop the worker and write whatever is still queued"""
+        self._stop_event.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+        self.flush()
+        logger.info("✅ Activity log sink stopped")
+
+    def record(
+        self,
+        action: str,
+        description: str,
+        user_id: Optional[int] = None,
+        user_uid: Optional[str] = None,
+        table_modified: Optional[str] = None,
+        field_modified: Optional[str] = None,
+        old_value: Optional[str] = None,
+        new_value: Optional[str] = None,
+        note: Optional[str] = None,
+        sync: bool = False
+    ):
+        """Record an activity log row.
+
+        Pass user_id when it is already known; otherwise user_uid is resolved to an id
+        at write time, once per batch rather than once per row.
+        """
+        entry = {
+            "user_id": user_id,
+            "user_uid": user_uid,
+            "action": action,
+            "description": description,
+            "table_modified": table_modified,
+            "field_modified": field_modified,
+            "old_value": old_value,
+            "new_value": new_value,
+            "note": note,
+            # Keep the time of the event, not the time of the flush
+            "timestamp": datetime.now(pytz.UTC)
+        }
+
+        if sync or not self.is_running:
+            self._write([entry])
+            return
+
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            # Apply backpressure on the caller rather than drop audit rows
+            logger.warning("⚠️ Activity log queue full, writing synchronously")
+            self._write([entry])
+
+    def flush(self):
+        """Write every queued row now"""
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                return
+            self._write(batch)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and not self._stop_event.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=min(remaining, 0.5)))
+                except queue.Empty:
+                    continue
+            if batch:
+                self._write(batch)
+
+    def _drain(self, limit: int) -> List[dict]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, entries: List[dict]):
+        db = SessionLocal()
+        try:
+            db.execute(insert(ActivityLog), self._resolve_users(db, entries))
+            db.commit()
+            return
+        except Exception as e:
+            db.rollback()
+            if len(entries) == 1:
+                logger.error(f"❌ Failed to write activity log row {entries[0]}: {e}")
+                return
+            logger.warning(f"⚠️ Failed to write {len(entries)} activity log rows ({e}), retrying one at a time")
+        finally:
+            db.close()
+
+        # One bad row must not take the rest of the batch with it
+        for entry in entries:
+            self._write([entry])
+
+    def _resolve_users(self, db, entries: List[dict]) -> List[dict]:
+        """Turn queued entries into activity_logs rows, resolving user_uid to user_id"""
+        uids = {entry["user_uid"] for entry in entries if entry["user_id"] is None and entry["user_uid"]}
+        user_ids = dict(db.query(User.uid, User.id).filter(User.uid.in_(uids)).all()) if uids else {}
+
+        rows = []
+        for entry in entries:
+            row = dict(entry)
+            user_uid = row.pop("user_uid")
+            if row["user_id"] is None and user_uid:
+                row["user_id"] = user_ids.get(user_uid)
+            rows.append(row)
+        return rows
+
+# Shared sink used by the CRUD layer and routers
+activity_log_sink = ActivityLogSink()
@@ -0,0 +1,88 @@
+import csv
+import io
+import logging
+import zipfile
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_IMPORT_FORMATS = ("csv", "xlsx")
+
+class ImportFileError(ValueError):
+    """The uploaded sheet itself could not be read (as opposed to a row failing validation)"""
+
+    def __init__(self, message: str, row_number: Optional[int] = None):
+        super().__init__(message)
+        self.row_number = row_number
+
+def detect_import_format(filename: Optional[str], content_type: Optional[str] = None) -> str:
+    """Work out whether an uploaded stock sheet is CSV or XLSX"""
+    name = (filename or "").lower()
+    if name.endswith(".csv") or content_type == "text/csv":
+        return "csv"
+    if name.endswith(".xlsx") or content_type == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet":
+        return "xlsx"
+    raise ValueError(f"Unsupported file type: {filename}. Upload a .csv or .xlsx file")
+
+def iter_import_rows(file: BinaryIO, file_format: str) -> Iterator[Tuple[int, dict]]:
+    """Yield (row_number, row) pairs from an uploaded sheet without loading it all into memory.
+    
+    Row numbers match what the user sees in their spreadsheet (the header is row 1).
+    Header names are normalised, so "Alert Threshold" maps to alert_threshold, and
+    empty cells become None.
+    
+    The file is opened and its header read before this returns, so a file that cannot
+    be read at all raises ImportFileError here, before anything is imported. A read
+    error further down raises ImportFileError from the iterator, carrying the row number.
+    """
+    if file_format == "csv":
+        rows = csv.reader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+        read_errors = (UnicodeDecodeError, csv.Error)
+    elif file_format == "xlsx":
+        try:
+            from openpyxl import load_workbook
+            from openpyxl.utils.exceptions import InvalidFileException
+        except ImportError:
+            raise ValueError("XLSX import requires the openpyxl package")
+        try:
+            workbook = load_workbook(file, read_only=True, data_only=True)
+        except (zipfile.BadZipFile, InvalidFileException, KeyError, OSError) as e:
+            raise ImportFileError(f"Not a valid .xlsx file ({e})")
+        rows = workbook.active.iter_rows(values_only=True)
+        read_errors = (zipfile.BadZipFile, KeyError, OSError, ValueError)
+    else:
+        raise ValueError(f"Unsupported import format: {file_format}")
+    
+    try:
+        header = next(rows, None)
+    except read_errors as e:
+        raise ImportFileError(f"Could not read the header row ({e})", row_number=1)
+    if not header:
+        return iter(())
+    columns = [_normalize_column(column) for column in header]
+    return _iter_rows(rows, columns, read_errors)
+
+def _iter_rows(rows, columns, read_errors) -> Iterator[Tuple[int, dict]]:
+    row_number = 1
+    while True:
+        try:
+            values = next(rows, None)
+        except read_errors as e:
+            raise ImportFileError(f"Could not read the file past row {row_number} ({e})", row_number=row_number + 1)
+        if values is None:
+            return
+        row_number += 1
+        
+        row = {}
+        for column, value in zip(columns, values):
+            if not column:
+                continue
+            if isinstance(value, str):
+                value = value.strip()
+            row[column] = None if value in ("", None) else value
+        # Skip blank lines
+        if any(value is not None for value in row.values()):
+            yield row_number, row
+
+def _normalize_column(column) -> str:
+    return str(column or "").strip().lower().replace(" ", "_")
@@ -0,0 +1,172 @@
+import os
+import json
+import asyncio
+import select
+import threading
+import logging
+from typing import Optional, Set
+from sqlalchemy import text
+from app.database import engine
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# "local" delivers events within this process only; "postgres" relays them through
+# LISTEN/NOTIFY so a client connected to any worker sees events published by any other.
+# "auto" picks postgres whenever the database is Postgres.
+NOTIFICATION_HUB_BACKEND = os.getenv("NOTIFICATION_HUB_BACKEND", "auto").lower()
+NOTIFICATION_HUB_CHANNEL = "notification_events"
+# Slow clients lose events rather than grow memory without bound
+SUBSCRIBER_QUEUE_SIZE = 100
+# pg_notify payloads are limited to 8000 bytes
+MAX_MESSAGE_LENGTH = 1000
+
+class Subscription:
+    """One connected stream client"""
+
+    def __init__(self, role: Optional[str], loop: asyncio.AbstractEventLoop, uid: Optional[str] = None):
+        self.role = role
+        self.uid = uid
+        self.loop = loop
+        self.queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def wants(self, event: dict) -> bool:
+        # Admins (role None) see everything; notifications are otherwise addressed by role or uid
+        if self.role is None or event.get("recipients") is None:
+            return True
+        return self.role in event["recipients"] or (self.uid is not None and self.uid in event.get("recipient_users", []))
+
+    def deliver(self, event: dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass
+
+class NotificationHub:
+    """Publish/subscribe hub for notification and alert events.
+
+    CRUD code publishes after committing; the /notifications/stream endpoint subscribes
+    and forwards matching events to the client. Publishing is safe from any thread.
+    """
+
+    def __init__(self, backend: str = NOTIFICATION_HUB_BACKEND):
+        if backend == "auto":
+            backend = "postgres" if engine.dialect.name == "postgresql" else "local"
+        self.backend = backend
+        self._subscriptions: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._listener: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the LISTEN thread (postgres backend only)"""
+        if self.backend != "postgres" or (self._listener is not None and self._listener.is_alive()):
+            return
+        self._stop_event.clear()
+        self._listener = threading.Thread(target=self._listen, name="notification-hub-listener", daemon=True)
+        self._listener.start()
+        logger.info("✅ Notification hub listening on Postgres")
+
+    def stop(self):
+        self._stop_event.set()
+        if self._listener is not None:
+            self._listener.join(5)
+            self._listener = None
+
+    def subscribe(self, role: Optional[str], uid: Optional[str] = None) -> Subscription:
+        """Register a stream client; must be called from the client's event loop"""
+        subscription = Subscription(role, asyncio.get_running_loop(), uid)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event: dict):
+        """Publish an event to every matching subscriber, in every worker"""
+        if self.backend == "postgres":
+            try:
+                with engine.connect() as connection:
+                    connection.execute(
+                        text("SELECT pg_notify(:channel, :payload)"),
+                        {"channel": NOTIFICATION_HUB_CHANNEL, "payload": json.dumps(event, default=str)}
+                    )
+                    connection.commit()
+                return
+            except Exception as e:
+                logger.warning(f"⚠️ pg_notify failed, delivering locally only: {e}")
+        self._dispatch(event)
+
+    def publish_notification(self, notification):
+        self.publish({
+            "event": "notification",
+            "id": notification.id,
+            "type": notification.type,
+            "severity": notification.severity,
+            "message": notification.message[:MAX_MESSAGE_LENGTH],
+            "category": notification.category,
+            "priority": notification.priority,
+            "chemical_id": notification.chemical_id,
+            "recipients": [row.role for row in notification.recipient_rows if row.role is not None],
+            "recipient_users": [row.user_uid for row in notification.recipient_rows if row.user_uid is not None],
+            "timestamp": notification.timestamp.isoformat() if notification.timestamp else None
+        })
+
+    def publish_alert(self, alert):
+        self.publish({
+            "event": "alert",
+            "id": alert.id,
+            "type": alert.type,
+            "severity": alert.severity,
+            "message": alert.message[:MAX_MESSAGE_LENGTH],
+            "chemical_id": alert.chemical_id,
+            "recipients": None,  # Alerts are visible to everyone
+            "timestamp": alert.timestamp.isoformat() if alert.timestamp else None
+        })
+
+    def _dispatch(self, event: dict):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            if subscription.wants(event):
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+                except RuntimeError:
+                    # Event loop already closed; the stream is going away
+                    self.unsubscribe(subscription)
+
+    def _listen(self):
+        while not self._stop_event.is_set():
+            raw_connection = None
+            try:
+                # A dedicated connection, detached so it is never handed back to the pool
+                raw_connection = engine.raw_connection()
+                raw_connection.detach()
+                connection = raw_connection.driver_connection
+                connection.autocommit = True
+                connection.cursor().execute(f"LISTEN {NOTIFICATION_HUB_CHANNEL}")
+
+                while not self._stop_event.is_set():
+                    if select.select([connection], [], [], 5) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notify = connection.notifies.pop(0)
+                        try:
+                            self._dispatch(json.loads(notify.payload))
+                        except ValueError:
+                            logger.warning("⚠️ Ignoring malformed notification event")
+            except Exception as e:
+                logger.error(f"❌ Notification hub listener error: {e}")
+                self._stop_event.wait(5)
+            finally:
+                if raw_connection is not None:
+                    try:
+                        raw_connection.close()
+                    except Exception:
+                        pass
+
+# Shared hub used by the notifications/alerts CRUD and the stream endpoint
+notification_hub = NotificationHub()
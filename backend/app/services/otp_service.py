@@ -11,7 +11,7 @@ from twilio.rest import Client
 from twilio.base.exceptions import TwilioException
 from sqlalchemy.orm import Session
 from app.crud.user import get_user_by_phone
-from app.crud.activity_log import create_activity_log
+from app.services.activity_log_sink import activity_log_sink
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -350,9 +350,10 @@ class OTPService:
         OTPService.update_rate_limit(phone_number)
         
         # Log activity
-        create_activity_log(
-            db, user.id, "otp_sent",
-            f"OTP sent to phone number: {phone_number}"
+        activity_log_sink.record(
+            user_id=user.id,
+            action="otp_sent",
+            description=f"OTP sent to phone number: {phone_number}"
         )
         
         return {
@@ -418,9 +419,10 @@ class OTPService:
         OTPService.clear_otp(phone_number)
         
         # Log successful login
-        create_activity_log(
-            db, user.id, "login",
-            f"User logged in via OTP: {phone_number}"
+        activity_log_sink.record(
+            user_id=user.id,
+            action="login",
+            description=f"User logged in via OTP: {phone_number}"
         )
         
         return {
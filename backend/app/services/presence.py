@@ -0,0 +1,146 @@
+import os
+import threading
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import pytz
+from sqlalchemy import update
+from app.database import SessionLocal
+from app.models.user import User
+from app.services.redis_client import get_redis_client
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Heartbeats are written to users.last_seen in one bulk UPDATE per interval
+PRESENCE_FLUSH_INTERVAL = float(os.getenv("PRESENCE_FLUSH_INTERVAL", 30))
+# On startup, users seen this recently are loaded back into the in-memory store
+PRESENCE_SEED_MINUTES = int(os.getenv("PRESENCE_SEED_MINUTES", 60))
+
+LAST_SEEN_KEY = "presence:last_seen"
+DIRTY_KEY = "presence:dirty"
+
+class PresenceStore:
+    """Records user heartbeats and answers "who is online" without touching the database.
+
+    Each heartbeat only updates the store (a dict, or a Redis sorted set when REDIS_HOST
+    is set). A background worker writes the users seen since the last flush to
+    users.last_seen in a single bulk UPDATE every flush_interval seconds, so database
+    load depends on the interval rather than on the number of open tabs.
+    """
+
+    def __init__(self, flush_interval: float = PRESENCE_FLUSH_INTERVAL, redis_client=None):
+        self.flush_interval = flush_interval
+        self.redis = redis_client
+        self._last_seen: Dict[int, datetime] = {}
+        self._dirty: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def start(self):
+        """Seed the store from the database and start the flush worker"""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        if self.redis is None:
+            self._seed()
+        self._stop_event.clear()
+        self._worker = threading.Thread(target=self._run, name="presence-flush", daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        """Stop the worker and write any pending heartbeats"""
+        self._stop_event.set()
+        if self._worker is not None:
+            self._worker.join(5)
+            self._worker = None
+        self.flush()
+
+    def heartbeat(self, user_id: int) -> datetime:
+        """Record that a user is active now"""
+        now = datetime.now(pytz.UTC)
+        if self.redis is not None:
+            pipe = self.redis.pipeline()
+            pipe.zadd(LAST_SEEN_KEY, {user_id: now.timestamp()})
+            pipe.hset(DIRTY_KEY, user_id, now.timestamp())
+            pipe.execute()
+        else:
+            with self._lock:
+                self._last_seen[user_id] = now
+                self._dirty[user_id] = now
+        return now
+
+    def online_user_ids(self, minutes_threshold: int = 5) -> List[int]:
+        """Ids of users with a heartbeat in the last N minutes"""
+        threshold = datetime.now(pytz.UTC) - timedelta(minutes=minutes_threshold)
+        if self.redis is not None:
+            return [int(user_id) for user_id in self.redis.zrangebyscore(LAST_SEEN_KEY, threshold.timestamp(), "+inf")]
+        with self._lock:
+            return [user_id for user_id, last_seen in self._last_seen.items() if last_seen >= threshold]
+
+    def forget(self, user_id: int):
+        """Drop a user from the store, e.g. after the user is deleted"""
+        if self.redis is not None:
+            pipe = self.redis.pipeline()
+            pipe.zrem(LAST_SEEN_KEY, user_id)
+            pipe.hdel(DIRTY_KEY, user_id)
+            pipe.execute()
+        else:
+            with self._lock:
+                self._last_seen.pop(user_id, None)
+                self._dirty.pop(user_id, None)
+
+    def flush(self):
+        """Write every heartbeat received since the last flush to users.last_seen"""
+        pending = self._take_dirty()
+        if not pending:
+            return
+
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(User),
+                [{"id": user_id, "last_seen": last_seen} for user_id, last_seen in pending.items()]
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ Failed to flush {len(pending)} presence heartbeats: {e}")
+        finally:
+            db.close()
+
+    def _take_dirty(self) -> Dict[int, datetime]:
+        if self.redis is not None:
+            pipe = self.redis.pipeline()
+            pipe.hgetall(DIRTY_KEY)
+            pipe.delete(DIRTY_KEY)
+            entries, _ = pipe.execute()
+            return {
+                int(user_id): datetime.fromtimestamp(float(timestamp), pytz.UTC)
+                for user_id, timestamp in entries.items()
+            }
+        with self._lock:
+            pending, self._dirty = self._dirty, {}
+        return pending
+
+    def _seed(self):
+        threshold = datetime.now(pytz.UTC) - timedelta(minutes=PRESENCE_SEED_MINUTES)
+        db = SessionLocal()
+        try:
+            rows = db.query(User.id, User.last_seen).filter(User.last_seen >= threshold).all()
+            with self._lock:
+                for user_id, last_seen in rows:
+                    if last_seen.tzinfo is None:
+                        last_seen = pytz.UTC.localize(last_seen)
+                    self._last_seen.setdefault(user_id, last_seen)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not seed presence store: {e}")
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+# Shared presence store used by the user and admin routers
+presence_store = PresenceStore(redis_client=get_redis_client())
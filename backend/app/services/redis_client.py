@@ -0,0 +1,40 @@
+import os
+import logging
+from typing import Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+_client = None
+_connected = False
+
+def get_redis_client() -> Optional["redis.Redis"]:
+    """Shared Redis client for cross-worker state, or None when REDIS_HOST is not set.
+
+    Unlike the OTP service, which falls back to localhost, shared state only uses Redis
+    when it is configured explicitly; otherwise callers keep their state in-process.
+    """
+    global _client, _connected
+    if _connected:
+        return _client
+    _connected = True
+
+    if not os.getenv("REDIS_HOST"):
+        return None
+    try:
+        import redis
+        client = redis.Redis(
+            host=os.getenv("REDIS_HOST"),
+            port=int(os.getenv("REDIS_PORT", 6379)),
+            password=os.getenv("REDIS_PASSWORD"),
+            db=int(os.getenv("REDIS_DB", 0)),
+            decode_responses=True,
+            socket_connect_timeout=5,
+            socket_timeout=5
+        )
+        client.ping()
+        logger.info("✅ Shared state using Redis")
+        _client = client
+    except Exception as e:
+        logger.warning(f"⚠️ Redis not available: {e}. Using in-process shared state")
+    return _client
@@ -0,0 +1,231 @@
+import os
+import json
+import threading
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import pytz
+from sqlalchemy import delete, insert, or_
+from sqlalchemy.orm import selectinload
+from app.database import SessionLocal
+from app.models.notifications import Notification, NotificationRecipient
+from app.models.alerts import Alert, AlertType, AlertSeverity, STOCK_ALERT_TYPES
+from app.models.archive import NotificationArchive, AlertArchive
+from app.services.unread_counters import unread_counters
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Seconds between retention runs inside the API; 0 leaves retention to scripts/run_retention.py
+RETENTION_INTERVAL = float(os.getenv("RETENTION_INTERVAL", 0))
+# Rows moved per transaction
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", 1000))
+
+# Used when RETENTION_POLICIES (a JSON list of the same objects) is not set
+DEFAULT_RETENTION_POLICIES = [
+    {"table": "alerts", "severity": "info", "state": "dismissed", "days": 30},
+    {"table": "alerts", "state": "dismissed", "days": 90},
+    {"table": "notifications", "state": "dismissed", "days": 90},
+    {"table": "notifications", "state": "read", "days": 180},
+]
+
+class RetentionPolicy:
+    """Which rows of one table expire: older than `days`, optionally narrowed by type,
+    severity and state ("dismissed", "read" or "any")"""
+
+    TABLES = ("notifications", "alerts")
+    STATES = ("dismissed", "read", "any")
+
+    def __init__(self, table: str, days: int, type: Optional[str] = None, severity: Optional[str] = None, state: str = "dismissed"):
+        if table not in self.TABLES:
+            raise ValueError(f"Unknown retention table: {table}")
+        if state not in self.STATES:
+            raise ValueError(f"Unknown retention state: {state}")
+        if table == "alerts":
+            # Alert type/severity are enums; fail on typos when the policy is loaded
+            type = AlertType(type) if type else None
+            severity = AlertSeverity(severity) if severity else None
+        self.table = table
+        self.days = int(days)
+        self.type = type
+        self.severity = severity
+        self.state = state
+
+    @property
+    def model(self):
+        return Alert if self.table == "alerts" else Notification
+
+    def conditions(self, now: datetime) -> list:
+        model = self.model
+        conditions = [model.timestamp < now - timedelta(days=self.days)]
+        if self.type:
+            conditions.append(model.type == self.type)
+        if self.severity:
+            conditions.append(model.severity == self.severity)
+        if self.state == "dismissed":
+            conditions.append(model.is_dismissed == True)
+        elif self.state == "read":
+            conditions.append(model.is_read == True)
+        if model is Alert:
+            # Open stock alerts stay put, or the stock sweep would raise them again
+            conditions.append(or_(Alert.resolved_at.isnot(None), Alert.type.notin_(STOCK_ALERT_TYPES)))
+        return conditions
+
+    def __str__(self) -> str:
+        narrowed = " ".join(str(getattr(value, "value", value)) for value in (self.severity, self.type) if value)
+        state = "" if self.state == "any" else f"{self.state} "
+        return f"{state}{narrowed + ' ' if narrowed else ''}{self.table} older than {self.days} days"
+
+def load_retention_policies() -> List[RetentionPolicy]:
+    raw = os.getenv("RETENTION_POLICIES")
+    policies = json.loads(raw) if raw else DEFAULT_RETENTION_POLICIES
+    return [RetentionPolicy(**policy) for policy in policies]
+
+class RetentionJob:
+    """Moves expired notifications and alerts to the *_archive tables in batches.
+
+    Each batch copies up to batch_size rows into the archive table and deletes them (and,
+    for notifications, their recipient rows) from the hot table in one transaction, so
+    the hot tables and their feed indexes stay small. Unread counters are adjusted for
+    any archived row that was still counted.
+
+    Runs every interval seconds in the API when RETENTION_INTERVAL is set, or on demand
+    via scripts/run_retention.py.
+    """
+
+    def __init__(self, policies: Optional[List[RetentionPolicy]] = None, interval: float = RETENTION_INTERVAL, batch_size: int = RETENTION_BATCH_SIZE):
+        self.policies = policies if policies is not None else load_retention_policies()
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stop_event = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.interval <= 0 or (self._worker is not None and self._worker.is_alive()):
+            return
+        self._stop_event.clear()
+        self._worker = threading.Thread(target=self._run, name="retention", daemon=True)
+        self._worker.start()
+        logger.info(f"✅ Retention job running every {self.interval:g}s")
+
+    def stop(self):
+        self._stop_event.set()
+        if self._worker is not None:
+            self._worker.join(5)
+            self._worker = None
+
+    def run(self, dry_run: bool = False) -> Dict[str, int]:
+        """Apply every policy once; returns the number of rows archived (or, in a dry run,
+        that would be archived) per policy"""
+        now = datetime.now(pytz.UTC)
+        results = {}
+        db = SessionLocal()
+        try:
+            for policy in self.policies:
+                if dry_run:
+                    results[str(policy)] = db.query(policy.model).filter(*policy.conditions(now)).count()
+                    continue
+                moved = 0
+                while not self._stop_event.is_set():
+                    batch = self._archive_batch(db, policy, now)
+                    moved += batch
+                    if batch < self.batch_size:
+                        break
+                results[str(policy)] = moved
+                if moved:
+                    logger.info(f"🗄️ Archived {moved} {policy}")
+        finally:
+            db.close()
+        return results
+
+    def _archive_batch(self, db, policy: RetentionPolicy, now: datetime) -> int:
+        try:
+            if policy.table == "alerts":
+                return self._archive_alerts(db, policy, now)
+            return self._archive_notifications(db, policy, now)
+        except Exception:
+            db.rollback()
+            raise
+
+    def _archive_alerts(self, db, policy: RetentionPolicy, now: datetime) -> int:
+        alerts = db.query(Alert).filter(*policy.conditions(now)).order_by(Alert.id).limit(self.batch_size).all()
+        if not alerts:
+            return 0
+
+        still_unread = sum(1 for alert in alerts if unread_counters.is_unread(alert))
+        db.execute(insert(AlertArchive), [
+            {
+                "original_id": alert.id,
+                "type": alert.type.value,
+                "severity": alert.severity.value,
+                "message": alert.message,
+                "chemical_id": alert.chemical_id,
+                "user_id": alert.user_id,
+                "timestamp": alert.timestamp,
+                "is_read": alert.is_read,
+                "is_dismissed": alert.is_dismissed,
+                "resolved_at": alert.resolved_at,
+                "occurrence_count": alert.occurrence_count,
+                "last_seen_at": alert.last_seen_at
+            }
+            for alert in alerts
+        ])
+        db.execute(delete(Alert).where(Alert.id.in_([alert.id for alert in alerts])), execution_options={"synchronize_session": False})
+        db.commit()
+
+        unread_counters.add_alert(-still_unread)
+        return len(alerts)
+
+    def _archive_notifications(self, db, policy: RetentionPolicy, now: datetime) -> int:
+        notifications = db.query(Notification).options(selectinload(Notification.recipient_rows)).filter(
+            *policy.conditions(now)
+        ).order_by(Notification.id).limit(self.batch_size).all()
+        if not notifications:
+            return 0
+
+        still_unread = Counter()
+        archived = []
+        for notification in notifications:
+            if not notification.is_dismissed:
+                still_unread.update(row.counter_key for row in notification.recipient_rows if not row.is_read)
+            archived.append({
+                "original_id": notification.id,
+                "type": notification.type,
+                "severity": notification.severity,
+                "message": notification.message,
+                "category": notification.category.value if notification.category else None,
+                "priority": notification.priority.value if notification.priority else None,
+                "status": notification.status.value if notification.status else None,
+                "chemical_id": notification.chemical_id,
+                "user_id": notification.user_id,
+                "created_by": notification.created_by,
+                "timestamp": notification.timestamp,
+                "is_read": notification.is_read,
+                "is_dismissed": notification.is_dismissed,
+                "delete_comment": notification.delete_comment,
+                "recipients": json.dumps([
+                    {"role": row.role, "user_uid": row.user_uid, "is_read": row.is_read, "read_at": row.read_at}
+                    for row in notification.recipient_rows
+                ], default=str)
+            })
+
+        ids = [notification.id for notification in notifications]
+        db.execute(insert(NotificationArchive), archived)
+        db.execute(delete(NotificationRecipient).where(NotificationRecipient.notification_id.in_(ids)), execution_options={"synchronize_session": False})
+        db.execute(delete(Notification).where(Notification.id.in_(ids)), execution_options={"synchronize_session": False})
+        db.commit()
+
+        for key, count in still_unread.items():
+            unread_counters.add_notification([key], -count)
+        return len(notifications)
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.run()
+            except Exception as e:
+                logger.error(f"❌ Retention run failed: {e}")
+
+# Shared job started with the API (when RETENTION_INTERVAL is set)
+retention_job = RetentionJob()
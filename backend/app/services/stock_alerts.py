@@ -0,0 +1,56 @@
+import os
+import threading
+import logging
+from typing import Optional
+from app.database import SessionLocal
+from app.crud.alerts import sweep_stock_alerts
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Seconds between full-inventory sweeps; 0 disables the sweep
+STOCK_ALERT_SWEEP_INTERVAL = float(os.getenv("STOCK_ALERT_SWEEP_INTERVAL", 300))
+
+class StockAlertSweeper:
+    """Periodically runs the set-based stock sweep (see crud.alerts.sweep_stock_alerts).
+
+    Quantity and threshold edits are evaluated as they happen by the chemical inventory
+    CRUD; the sweep catches everything that bypasses it (bulk imports, direct database
+    edits, failed evaluations) and runs once at startup.
+    """
+
+    def __init__(self, interval: float = STOCK_ALERT_SWEEP_INTERVAL):
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.interval <= 0 or (self._worker is not None and self._worker.is_alive()):
+            return
+        self._stop_event.clear()
+        self._worker = threading.Thread(target=self._run, name="stock-alert-sweep", daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._worker is not None:
+            self._worker.join(5)
+            self._worker = None
+
+    def sweep(self):
+        db = SessionLocal()
+        try:
+            sweep_stock_alerts(db)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ Stock alert sweep failed: {e}")
+        finally:
+            db.close()
+
+    def _run(self):
+        self.sweep()
+        while not self._stop_event.wait(self.interval):
+            self.sweep()
+
+# Shared sweeper started with the API
+stock_alert_sweeper = StockAlertSweeper()
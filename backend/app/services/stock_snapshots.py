@@ -0,0 +1,53 @@
+import os
+import threading
+import logging
+from typing import Optional
+from app.database import SessionLocal
+from app.crud.stock_movements import take_balance_snapshots
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Seconds between stock balance snapshots; 0 disables them
+STOCK_SNAPSHOT_INTERVAL = float(os.getenv("STOCK_SNAPSHOT_INTERVAL", 3600))
+
+class StockSnapshotter:
+    """Periodically snapshots chemical balances (see crud.stock_movements.take_balance_snapshots),
+    which bounds how many ledger rows a point-in-time balance has to sum"""
+
+    def __init__(self, interval: float = STOCK_SNAPSHOT_INTERVAL):
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.interval <= 0 or (self._worker is not None and self._worker.is_alive()):
+            return
+        self._stop_event.clear()
+        self._worker = threading.Thread(target=self._run, name="stock-snapshots", daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._worker is not None:
+            self._worker.join(5)
+            self._worker = None
+
+    def snapshot(self):
+        db = SessionLocal()
+        try:
+            taken = take_balance_snapshots(db)
+            if taken:
+                logger.info(f"📸 Took {taken} stock balance snapshots")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ Stock balance snapshot failed: {e}")
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.snapshot()
+
+# Shared snapshotter started with the API
+stock_snapshotter = StockSnapshotter()
@@ -0,0 +1,63 @@
+import os
+import time
+import secrets
+import threading
+from typing import Dict, Optional, Tuple
+from app.services.redis_client import get_redis_client
+
+# Long enough for the client to open the stream right after asking for the ticket
+STREAM_TICKET_TTL = int(os.getenv("STREAM_TICKET_TTL", 30))
+STREAM_TICKET_KEY_PREFIX = "stream_ticket:"
+STREAM_TICKET_MAX_PENDING = 10000
+
+class StreamTicketStore:
+    """Short-lived, single-use tickets that authenticate a /notifications/stream request.
+
+    EventSource cannot send an Authorization header, so the stream URL has to carry
+    the credential, and URLs end up in access logs. A ticket is issued to an already
+    authenticated user by POST /notifications/stream/ticket and is worthless once it
+    has been redeemed or has expired, so a logged URL gives nothing away.
+
+    Tickets live in-process, or in Redis when REDIS_HOST is set; use Redis when running
+    more than one worker, since the stream may land on a different worker than the POST.
+    """
+
+    def __init__(self, ttl: int = STREAM_TICKET_TTL, redis_client=None):
+        self.ttl = ttl
+        self.redis = redis_client
+        self._tickets: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def issue(self, uid: str) -> str:
+        ticket = secrets.token_urlsafe(32)
+        if self.redis is not None:
+            self.redis.set(STREAM_TICKET_KEY_PREFIX + ticket, uid, ex=self.ttl)
+            return ticket
+        with self._lock:
+            if len(self._tickets) >= STREAM_TICKET_MAX_PENDING:
+                self._evict_expired()
+            self._tickets[ticket] = (uid, time.monotonic() + self.ttl)
+        return ticket
+
+    def redeem(self, ticket: str) -> Optional[str]:
+        """Return the uid the ticket was issued to and invalidate it, or None if unknown or expired"""
+        if self.redis is not None:
+            pipe = self.redis.pipeline()
+            pipe.get(STREAM_TICKET_KEY_PREFIX + ticket)
+            pipe.delete(STREAM_TICKET_KEY_PREFIX + ticket)
+            uid, _ = pipe.execute()
+            return uid
+        with self._lock:
+            entry = self._tickets.pop(ticket, None)
+        if entry is None:
+            return None
+        uid, expires_at = entry
+        return uid if expires_at > time.monotonic() else None
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        for ticket in [ticket for ticket, (_, expires_at) in self._tickets.items() if expires_at <= now]:
+            del self._tickets[ticket]
+
+# Shared store used by the notifications router
+stream_tickets = StreamTicketStore(redis_client=get_redis_client())
@@ -0,0 +1,114 @@
+import threading
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable
+from app.database import SessionLocal
+from sqlalchemy import func
+from app.models.notifications import Notification, NotificationRecipient
+from app.models.alerts import Alert
+from app.services.redis_client import get_redis_client
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+NOTIFICATIONS_KEY = "unread:notifications"  # Hash of role (or "user:<uid>") -> count
+ALERTS_KEY = "unread:alerts"
+
+class UnreadCounters:
+    """Per-recipient counts of unread notifications and a global count of unread alerts.
+
+    Notification counts are keyed by role, or by "user:<uid>" for notifications sent
+    to a single user (see NotificationRecipient.counter_key).
+
+    A notification or alert counts while it is neither read nor dismissed. The CRUD
+    layer adjusts the counts whenever a row is created, read, dismissed or deleted, so
+    the bell only has to read a number. Counts are rebuilt from the database on startup.
+
+    Counts live in-process, or in Redis when REDIS_HOST is set; use Redis when running
+    more than one worker, otherwise each worker only sees its own changes.
+    """
+
+    def __init__(self, redis_client=None):
+        self.redis = redis_client
+        self._notifications: Dict[str, int] = defaultdict(int)
+        self._alerts = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_unread(row) -> bool:
+        return not row.is_read and not row.is_dismissed
+
+    def notification_count(self, role: str) -> int:
+        if self.redis is not None:
+            return int(self.redis.hget(NOTIFICATIONS_KEY, role) or 0)
+        with self._lock:
+            return max(self._notifications.get(role, 0), 0)
+
+    def alert_count(self) -> int:
+        if self.redis is not None:
+            return int(self.redis.get(ALERTS_KEY) or 0)
+        with self._lock:
+            return max(self._alerts, 0)
+
+    def add_notification(self, roles: Iterable[str], delta: int):
+        roles = set(roles)
+        if not roles or not delta:
+            return
+        if self.redis is not None:
+            pipe = self.redis.pipeline()
+            for role in roles:
+                pipe.hincrby(NOTIFICATIONS_KEY, role, delta)
+            pipe.execute()
+            return
+        with self._lock:
+            for role in roles:
+                self._notifications[role] += delta
+
+    def add_alert(self, delta: int):
+        if not delta:
+            return
+        if self.redis is not None:
+            self.redis.incrby(ALERTS_KEY, delta)
+            return
+        with self._lock:
+            self._alerts += delta
+
+    def rebuild(self, db=None):
+        """Recount unread notifications and alerts from the database"""
+        own_session = db is None
+        db = db or SessionLocal()
+        try:
+            unread = (
+                db.query(NotificationRecipient.role, NotificationRecipient.user_uid, func.count())
+                .join(Notification, Notification.id == NotificationRecipient.notification_id)
+                .filter(NotificationRecipient.is_read == False, Notification.is_dismissed == False)
+                .group_by(NotificationRecipient.role, NotificationRecipient.user_uid)
+                .all()
+            )
+            notifications: Dict[str, int] = defaultdict(int)
+            for role, user_uid, count in unread:
+                notifications[role if role is not None else f"user:{user_uid}"] += count
+
+            alerts = db.query(Alert).filter(
+                Alert.is_read == False,
+                Alert.is_dismissed == False
+            ).count()
+
+            if self.redis is not None:
+                pipe = self.redis.pipeline()
+                pipe.delete(NOTIFICATIONS_KEY)
+                if notifications:
+                    pipe.hset(NOTIFICATIONS_KEY, mapping=dict(notifications))
+                pipe.set(ALERTS_KEY, alerts)
+                pipe.execute()
+            else:
+                with self._lock:
+                    self._notifications = notifications
+                    self._alerts = alerts
+            logger.info(f"✅ Unread counters rebuilt ({sum(notifications.values())} notification deliveries, {alerts} alerts)")
+        finally:
+            if own_session:
+                db.close()
+
+# Shared counters used by the notifications/alerts CRUD and routers
+unread_counters = UnreadCounters(redis_client=get_redis_client())
@@ -0,0 +1,79 @@
+import os
+import time
+import threading
+from typing import Dict, Optional, Tuple
+from app.models.user import User
+
+# Short enough that changes made by another worker process show up quickly
+USER_PRINCIPAL_CACHE_TTL = float(os.getenv("USER_PRINCIPAL_CACHE_TTL", 30))
+USER_PRINCIPAL_CACHE_SIZE = int(os.getenv("USER_PRINCIPAL_CACHE_SIZE", 10000))
+
+class UserPrincipal:
+    """Read-only snapshot of a user row, returned by get_current_user.
+
+    Exposes the same attributes as the User model's columns, so handlers and
+    from_attributes response models can use it in place of the ORM instance, but it is
+    not bound to any session and can be shared between requests.
+    """
+
+    _columns = tuple(column.name for column in User.__table__.columns)
+
+    def __init__(self, user: User):
+        for name in self._columns:
+            object.__setattr__(self, name, getattr(user, name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("UserPrincipal is read-only")
+
+    def __repr__(self) -> str:
+        return f"<UserPrincipal id={self.id} uid={self.uid} role={self.role}>"
+
+class UserPrincipalCache:
+    """Cross-request cache of uid -> UserPrincipal with a short TTL.
+
+    Entries are dropped explicitly whenever a user is approved, modified or deleted
+    (see app.crud.user), and otherwise expire after ttl seconds.
+    """
+
+    def __init__(self, ttl: float = USER_PRINCIPAL_CACHE_TTL, max_size: int = USER_PRINCIPAL_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: Dict[str, Tuple[UserPrincipal, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, uid: str) -> Optional[UserPrincipal]:
+        with self._lock:
+            entry = self._entries.get(uid)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[uid]
+                return None
+            return principal
+
+    def set(self, user: User) -> UserPrincipal:
+        principal = UserPrincipal(user)
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                self._evict_expired()
+            if len(self._entries) >= self.max_size:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[user.uid] = (principal, time.monotonic() + self.ttl)
+        return principal
+
+    def invalidate(self, uid: Optional[str] = None):
+        """Drop one user's entry, or every entry when uid is None"""
+        with self._lock:
+            if uid is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(uid, None)
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        for uid in [uid for uid, (_, expires_at) in self._entries.items() if expires_at <= now]:
+            del self._entries[uid]
+
+# Shared cache used by get_current_user
+user_principal_cache = UserPrincipalCache()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the composite indexes used by cursor pagination on GET /chemicals.
+"""
+import sys
+import os
+from sqlalchemy import text
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+
+def add_chemical_pagination_indexes():
+    print("🔧 Adding pagination indexes to chemical_inventory table...")
+    db = SessionLocal()
+    try:
+        db.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_chemical_inventory_last_updated_id
+            ON chemical_inventory (last_updated, id)
+        """))
+        db.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_chemical_inventory_name_id
+            ON chemical_inventory (name, id)
+        """))
+        db.commit()
+        print("✅ Pagination indexes added successfully")
+    except Exception as e:
+        print(f"❌ Error adding pagination indexes: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    add_chemical_pagination_indexes()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the partial indexes used by the paginated /unread and /active
+notification and alert feeds.
+"""
+import sys
+import os
+from sqlalchemy import text
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine
+
+# (index name, table, columns, predicate column)
+FEED_INDEXES = [
+    ("ix_notifications_unread_id", "notifications", "id", "is_read"),
+    ("ix_notifications_active_id", "notifications", "id", "is_dismissed"),
+    ("ix_notification_recipients_unread_role", "notification_recipients", "role, notification_id", "is_read"),
+    ("ix_notification_recipients_unread_user_uid", "notification_recipients", "user_uid, notification_id", "is_read"),
+    ("ix_alerts_unread_id", "alerts", "id", "is_read"),
+    ("ix_alerts_active_id", "alerts", "id", "is_dismissed"),
+]
+
+def add_feed_indexes():
+    print("🔧 Adding partial indexes for notification and alert feeds...")
+    false = "false" if engine.dialect.name == "postgresql" else "0"
+    db = SessionLocal()
+    try:
+        for name, table, columns, flag in FEED_INDEXES:
+            db.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns}) WHERE {flag} = {false}"))
+            print(f"   ✅ {name}")
+        db.commit()
+        print("✅ Feed indexes added successfully")
+    except Exception as e:
+        print(f"❌ Error adding feed indexes: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    add_feed_indexes()
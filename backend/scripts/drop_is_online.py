@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Migration script to drop the is_online column from the users table.
+
+Online status now lives in user_sessions (an open session means online) and in the
+presence store; nothing writes users.is_online any more, so the column only goes stale.
+Replaces the old migrate_is_online.py, which added it.
+"""
+import sys
+import os
+from sqlalchemy import text
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+
+def drop_is_online():
+    print("🔧 Dropping is_online column from users table...")
+    db = SessionLocal()
+    try:
+        # Check if column exists
+        result = db.execute(text("""
+            SELECT column_name 
+            FROM information_schema.columns 
+            WHERE table_name = 'users' AND column_name = 'is_online'
+        """))
+        if not result.fetchone():
+            print("✅ is_online column already dropped")
+            return
+        
+        db.execute(text("ALTER TABLE users DROP COLUMN is_online"))
+        db.commit()
+        print("✅ is_online column dropped")
+    except Exception as e:
+        print(f"❌ Error dropping is_online column: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    drop_is_online()
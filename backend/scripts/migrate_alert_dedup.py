@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Migration script for alert deduplication.
+
+Adds occurrence_count and last_seen_at to alerts, resolves duplicate open alerts (keeping
+the newest per type and chemical, with the duplicates folded into its occurrence count),
+and creates the unique partial index that create_alert upserts against.
+Run scripts/migrate_alert_resolution.py first.
+"""
+import sys
+import os
+from sqlalchemy import text
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+
+def migrate_alert_dedup():
+    print("🔧 Adding alert deduplication columns and index...")
+    db = SessionLocal()
+    try:
+        for column, definition in (
+            ("occurrence_count", "INTEGER NOT NULL DEFAULT 1"),
+            ("last_seen_at", "TIMESTAMP WITH TIME ZONE DEFAULT now()")
+        ):
+            # Check if column already exists
+            result = db.execute(text("""
+                SELECT column_name 
+                FROM information_schema.columns 
+                WHERE table_name = 'alerts' AND column_name = :column
+            """), {"column": column})
+            if result.fetchone():
+                print(f"✅ {column} column already exists")
+                continue
+            db.execute(text(f"ALTER TABLE alerts ADD COLUMN {column} {definition}"))
+            if column == "last_seen_at":
+                # Existing alerts were last seen when they were raised
+                db.execute(text("UPDATE alerts SET last_seen_at = timestamp"))
+            print(f"✅ {column} column added")
+
+        # Fold older open duplicates into the newest open alert of each (type, chemical_id)
+        db.execute(text("""
+            WITH ranked AS (
+                SELECT id, type, chemical_id,
+                       ROW_NUMBER() OVER (PARTITION BY type, chemical_id ORDER BY timestamp DESC, id DESC) AS position,
+                       COUNT(*) OVER (PARTITION BY type, chemical_id) AS duplicates
+                FROM alerts
+                WHERE resolved_at IS NULL AND chemical_id IS NOT NULL
+            )
+            UPDATE alerts SET occurrence_count = ranked.duplicates
+            FROM ranked
+            WHERE alerts.id = ranked.id AND ranked.position = 1 AND ranked.duplicates > 1
+        """))
+        result = db.execute(text("""
+            UPDATE alerts SET resolved_at = now(), is_dismissed = TRUE
+            WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (PARTITION BY type, chemical_id ORDER BY timestamp DESC, id DESC) AS position
+                    FROM alerts
+                    WHERE resolved_at IS NULL AND chemical_id IS NOT NULL
+                ) ranked
+                WHERE position > 1
+            )
+        """))
+        print(f"📊 Resolved {result.rowcount} duplicate open alerts")
+
+        db.execute(text("""
+            CREATE UNIQUE INDEX IF NOT EXISTS uq_alerts_open_type_chemical
+            ON alerts (type, chemical_id)
+            WHERE resolved_at IS NULL
+        """))
+        db.commit()
+        print("✅ Alert deduplication migration completed")
+    except Exception as e:
+        print(f"❌ Error migrating alerts: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    migrate_alert_dedup()
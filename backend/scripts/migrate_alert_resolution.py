@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the resolved_at column to the alerts table.
+
+Stock alerts are resolved (rather than re-raised) by the stock-threshold engine once the
+chemical recovers; open alerts are the ones with resolved_at NULL.
+"""
+import sys
+import os
+from sqlalchemy import text
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+
+def migrate_alert_resolution():
+    print("🔧 Adding resolved_at column to alerts table...")
+    db = SessionLocal()
+    try:
+        # Check if column already exists
+        result = db.execute(text("""
+            SELECT column_name 
+            FROM information_schema.columns 
+            WHERE table_name = 'alerts' AND column_name = 'resolved_at'
+        """))
+        if result.fetchone():
+            print("✅ resolved_at column already exists")
+            return
+        db.execute(text("""
+            ALTER TABLE alerts 
+            ADD COLUMN resolved_at TIMESTAMP WITH TIME ZONE
+        """))
+        # Alerts dismissed before this change are treated as resolved
+        db.execute(text("""
+            UPDATE alerts SET resolved_at = timestamp
+            WHERE is_dismissed = TRUE
+        """))
+        db.commit()
+        print("✅ resolved_at column added successfully")
+    except Exception as e:
+        print(f"❌ Error adding resolved_at column: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    migrate_alert_resolution()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Migration script to give notifications_archive and alerts_archive their own primary key.
+
+The archive tables used to reuse the hot table's id as their primary key. Ids of deleted
+rows can be handed out again, so a later retention run could collide with an archived
+row. The old id column is renamed to original_id (kept, indexed) and a new serial id
+becomes the primary key. Tables that do not exist yet are created in the new shape.
+Safe to run more than once.
+"""
+import sys
+import os
+from sqlalchemy import inspect, text
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine
+from app.models import NotificationArchive, AlertArchive
+
+def migrate_archive_table(db, table: str):
+    result = db.execute(text("""
+        SELECT column_name 
+        FROM information_schema.columns 
+        WHERE table_name = :table AND column_name = 'original_id'
+    """), {"table": table})
+    if result.fetchone():
+        print(f"✅ {table} already has original_id")
+        return
+    
+    primary_key = db.execute(text("""
+        SELECT constraint_name
+        FROM information_schema.table_constraints
+        WHERE table_name = :table AND constraint_type = 'PRIMARY KEY'
+    """), {"table": table}).scalar()
+    if primary_key:
+        db.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{primary_key}"'))
+    db.execute(text(f"ALTER TABLE {table} RENAME COLUMN id TO original_id"))
+    db.execute(text(f"ALTER TABLE {table} ADD COLUMN id SERIAL PRIMARY KEY"))
+    db.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_original_id ON {table} (original_id)"))
+    db.commit()
+    print(f"✅ {table} now keyed by its own id, with original_id")
+
+def migrate_archive_ids():
+    print("🔧 Migrating archive table keys...")
+    if engine.dialect.name != "postgresql":
+        print("❌ This migration only supports PostgreSQL; recreate the archive tables instead")
+        return
+    
+    db = SessionLocal()
+    try:
+        for model in (NotificationArchive, AlertArchive):
+            if not inspect(engine).has_table(model.__tablename__):
+                model.__table__.create(bind=engine)
+                print(f"✅ {model.__tablename__} created")
+                continue
+            migrate_archive_table(db, model.__tablename__)
+    except Exception as e:
+        print(f"❌ Error migrating archive tables: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    migrate_archive_ids()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Migration script to move the timestamped note history out of chemical_inventory.notes
+into the append-only chemical_notes table.
+
+Lines written by the old add-note endpoint look like "[YYYY-MM-DD HH:MM:SS] Name: note".
+Each becomes a chemical_notes row (continuation lines are kept with the note they follow).
+Any free text before the first timestamped line stays in chemical_inventory.notes.
+
+On PostgreSQL, an author_uid foreign key created without ON DELETE SET NULL is
+recreated with it, so note authors can still be deleted.
+"""
+import sys
+import os
+import re
+from datetime import datetime
+from sqlalchemy import text
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine
+from app.models import ChemicalInventory, ChemicalNote, User
+
+NOTE_LINE = re.compile(r"^\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\] (.*)$")
+
+def split_notes(notes: str):
+    """Split a notes blob into (free_text, [(created_at, body), ...])"""
+    free_text = []
+    entries = []
+    for line in notes.split("\n"):
+        match = NOTE_LINE.match(line)
+        if match:
+            entries.append([datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S"), match.group(2)])
+        elif entries:
+            entries[-1][1] += "\n" + line
+        else:
+            free_text.append(line)
+    return "\n".join(free_text).strip() or None, entries
+
+def set_author_fk_null(db):
+    """Recreate chemical_notes.author_uid -> users.uid as ON DELETE SET NULL (PostgreSQL)"""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    result = db.execute(text("""
+        SELECT tc.constraint_name, rc.delete_rule
+        FROM information_schema.table_constraints tc
+        JOIN information_schema.key_column_usage kcu ON kcu.constraint_name = tc.constraint_name
+        JOIN information_schema.referential_constraints rc ON rc.constraint_name = tc.constraint_name
+        WHERE tc.table_name = 'chemical_notes' AND tc.constraint_type = 'FOREIGN KEY' AND kcu.column_name = 'author_uid'
+    """)).fetchone()
+    if result is None or result.delete_rule == "SET NULL":
+        print("✅ chemical_notes.author_uid foreign key already up to date")
+        return
+    db.execute(text(f'ALTER TABLE chemical_notes DROP CONSTRAINT "{result.constraint_name}"'))
+    db.execute(text(f"""
+        ALTER TABLE chemical_notes ADD CONSTRAINT "{result.constraint_name}"
+        FOREIGN KEY (author_uid) REFERENCES users (uid) ON DELETE SET NULL
+    """))
+    db.commit()
+    print("✅ chemical_notes.author_uid foreign key now ON DELETE SET NULL")
+
+def migrate_chemical_notes():
+    print("🔧 Moving chemical note history into chemical_notes table...")
+    ChemicalNote.__table__.create(bind=engine, checkfirst=True)
+    
+    db = SessionLocal()
+    try:
+        set_author_fk_null(db)
+        
+        # Resolve "First Last: " prefixes back to authors where the name is unambiguous
+        authors = {}
+        for user in db.query(User).all():
+            name = f"{user.first_name} {user.last_name or ''}".strip()
+            authors[name] = None if name in authors else user.uid
+        
+        migrated_chemicals = 0
+        migrated_notes = 0
+        for chemical in db.query(ChemicalInventory).filter(ChemicalInventory.notes.isnot(None)).all():
+            free_text, entries = split_notes(chemical.notes)
+            if not entries:
+                continue
+            
+            for created_at, body in entries:
+                author_uid = None
+                name, separator, remainder = body.partition(": ")
+                if separator and authors.get(name):
+                    author_uid = authors[name]
+                    body = remainder
+                db.add(ChemicalNote(
+                    chemical_id=chemical.id,
+                    author_uid=author_uid,
+                    created_at=created_at,
+                    body=body
+                ))
+            
+            chemical.notes = free_text
+            migrated_chemicals += 1
+            migrated_notes += len(entries)
+        
+        db.commit()
+        print(f"✅ Migrated {migrated_notes} notes from {migrated_chemicals} chemicals")
+    except Exception as e:
+        print(f"❌ Error migrating chemical notes: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    migrate_chemical_notes()
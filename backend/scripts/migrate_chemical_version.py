@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """
-Migration script to add is_online boolean column to users table.
+Migration script to add the version column used by POST /chemicals/{id}/adjust
+to chemical_inventory.
 """
 import sys
 import os
@@ -11,32 +12,32 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.database import SessionLocal
 
-def migrate_is_online():
-    print("🔧 Adding is_online column to users table...")
+def migrate_chemical_version():
+    print("🔧 Adding version column to chemical_inventory table...")
     db = SessionLocal()
     try:
         # Check if column already exists
         result = db.execute(text("""
             SELECT column_name 
             FROM information_schema.columns 
-            WHERE table_name = 'users' AND column_name = 'is_online'
+            WHERE table_name = 'chemical_inventory' AND column_name = 'version'
         """))
         if result.fetchone():
-            print("✅ is_online column already exists")
+            print("✅ version column already exists")
             return
-        # Add the column
+        
         db.execute(text("""
-            ALTER TABLE users 
-            ADD COLUMN is_online BOOLEAN DEFAULT FALSE
+            ALTER TABLE chemical_inventory 
+            ADD COLUMN version INTEGER NOT NULL DEFAULT 1
         """))
         db.commit()
-        print("✅ is_online column added successfully")
+        print("✅ version column added")
     except Exception as e:
-        print(f"❌ Error adding is_online column: {e}")
+        print(f"❌ Error adding version column: {e}")
         db.rollback()
         raise
     finally:
         db.close()
 
 if __name__ == "__main__":
-    migrate_is_online() 
+    migrate_chemical_version()
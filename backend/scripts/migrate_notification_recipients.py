@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Migration script to backfill the notification_recipients table from the JSON-encoded
+notifications.recipients column.
+
+Each role in the JSON list becomes one (notification_id, role) row carrying the
+notification's is_read and timestamp. Notifications that already have recipient rows
+are skipped, so the script can be re-run safely.
+"""
+import sys
+import os
+import json
+from sqlalchemy import insert
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine
+from app.models import Notification, NotificationRecipient
+
+BATCH_SIZE = 1000
+
+def migrate_notification_recipients():
+    print("🔧 Backfilling notification_recipients from notifications.recipients...")
+    NotificationRecipient.__table__.create(bind=engine, checkfirst=True)
+    
+    db = SessionLocal()
+    try:
+        has_rows = db.query(NotificationRecipient.notification_id).filter(
+            NotificationRecipient.notification_id == Notification.id
+        ).exists()
+        pending = db.query(
+            Notification.id, Notification.recipients, Notification.is_read, Notification.timestamp
+        ).filter(Notification.recipients.isnot(None), ~has_rows).order_by(Notification.id)
+        
+        migrated_notifications = 0
+        rows = []
+        for notification_id, recipients, is_read, timestamp in pending.yield_per(BATCH_SIZE):
+            try:
+                roles = json.loads(recipients)
+            except ValueError:
+                print(f"⚠️ Skipping notification {notification_id}: recipients is not valid JSON")
+                continue
+            for role in dict.fromkeys(roles or []):
+                rows.append({
+                    "notification_id": notification_id,
+                    "role": role,
+                    "is_read": bool(is_read),
+                    "timestamp": timestamp
+                })
+            migrated_notifications += 1
+        
+        for start in range(0, len(rows), BATCH_SIZE):
+            db.execute(insert(NotificationRecipient), rows[start:start + BATCH_SIZE])
+        db.commit()
+        print(f"✅ Added {len(rows)} recipient rows for {migrated_notifications} notifications")
+    except Exception as e:
+        print(f"❌ Error backfilling notification recipients: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    migrate_notification_recipients()
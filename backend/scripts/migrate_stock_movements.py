@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Migration script to create the stock_movements ledger and stock_balance_snapshots tables.
+
+Every chemical whose quantity differs from the sum of its ledger (all of them, on the
+first run) gets an "opening" movement for the difference, so the ledger balances with
+chemical_inventory.quantity. A first set of balance snapshots is then taken.
+On PostgreSQL, a user_uid foreign key created without ON DELETE SET NULL is recreated
+with it, so users who changed stock can still be deleted.
+Safe to run more than once.
+"""
+import sys
+import os
+from sqlalchemy import func, insert, text
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, engine
+from app.models import ChemicalInventory, StockMovement, StockBalanceSnapshot, MovementReason
+from app.crud.stock_movements import take_balance_snapshots
+
+def set_user_fk_null(db):
+    """Recreate stock_movements.user_uid -> users.uid as ON DELETE SET NULL (PostgreSQL)"""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    result = db.execute(text("""
+        SELECT tc.constraint_name, rc.delete_rule
+        FROM information_schema.table_constraints tc
+        JOIN information_schema.key_column_usage kcu ON kcu.constraint_name = tc.constraint_name
+        JOIN information_schema.referential_constraints rc ON rc.constraint_name = tc.constraint_name
+        WHERE tc.table_name = 'stock_movements' AND tc.constraint_type = 'FOREIGN KEY' AND kcu.column_name = 'user_uid'
+    """)).fetchone()
+    if result is None or result.delete_rule == "SET NULL":
+        print("✅ stock_movements.user_uid foreign key already up to date")
+        return
+    db.execute(text(f'ALTER TABLE stock_movements DROP CONSTRAINT "{result.constraint_name}"'))
+    db.execute(text(f"""
+        ALTER TABLE stock_movements ADD CONSTRAINT "{result.constraint_name}"
+        FOREIGN KEY (user_uid) REFERENCES users (uid) ON DELETE SET NULL
+    """))
+    db.commit()
+    print("✅ stock_movements.user_uid foreign key now ON DELETE SET NULL")
+
+def migrate_stock_movements():
+    print("🔧 Creating stock movement ledger...")
+    StockMovement.__table__.create(bind=engine, checkfirst=True)
+    StockBalanceSnapshot.__table__.create(bind=engine, checkfirst=True)
+    
+    db = SessionLocal()
+    try:
+        set_user_fk_null(db)
+        
+        ledger = db.query(
+            StockMovement.chemical_id,
+            func.sum(StockMovement.delta).label("balance")
+        ).group_by(StockMovement.chemical_id).subquery()
+        
+        unbalanced = db.query(
+            ChemicalInventory.id,
+            ChemicalInventory.quantity - func.coalesce(ledger.c.balance, 0.0)
+        ).outerjoin(ledger, ledger.c.chemical_id == ChemicalInventory.id).filter(
+            ChemicalInventory.quantity != func.coalesce(ledger.c.balance, 0.0)
+        ).all()
+        
+        if unbalanced:
+            db.execute(insert(StockMovement), [
+                {
+                    "chemical_id": chemical_id,
+                    "delta": delta,
+                    "reason": MovementReason.OPENING.value,
+                    "reference": "ledger backfill"
+                }
+                for chemical_id, delta in unbalanced
+            ])
+            db.commit()
+        print(f"📊 Opening movements written for {len(unbalanced)} chemicals")
+        
+        taken = take_balance_snapshots(db, settle_seconds=0)
+        print(f"📸 Took {taken} stock balance snapshots")
+        print("✅ Stock movement ledger migration completed")
+    except Exception as e:
+        print(f"❌ Error creating stock movement ledger: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    migrate_stock_movements()
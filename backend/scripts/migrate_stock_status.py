@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the stock_status column (and its index) to chemical_inventory
+and fill it from quantity and alert_threshold.
+"""
+import sys
+import os
+from sqlalchemy import text
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+
+def migrate_stock_status():
+    print("🔧 Adding stock_status column to chemical_inventory table...")
+    db = SessionLocal()
+    try:
+        # Check if column already exists
+        result = db.execute(text("""
+            SELECT column_name 
+            FROM information_schema.columns 
+            WHERE table_name = 'chemical_inventory' AND column_name = 'stock_status'
+        """))
+        if result.fetchone():
+            print("✅ stock_status column already exists")
+        else:
+            db.execute(text("""
+                ALTER TABLE chemical_inventory 
+                ADD COLUMN stock_status VARCHAR NOT NULL DEFAULT 'in_stock'
+            """))
+            print("✅ stock_status column added")
+
+        # Same rules as stock_status_for; last_updated is deliberately left untouched
+        result = db.execute(text("""
+            UPDATE chemical_inventory SET stock_status = CASE
+                WHEN quantity <= 0 THEN 'out_of_stock'
+                WHEN alert_threshold IS NOT NULL AND quantity <= alert_threshold THEN 'low'
+                ELSE 'in_stock'
+            END
+        """))
+        print(f"📊 Classified {result.rowcount} chemicals")
+
+        db.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_chemical_inventory_stock_status_id
+            ON chemical_inventory (stock_status, id)
+        """))
+        db.commit()
+        print("✅ stock_status migration completed")
+    except Exception as e:
+        print(f"❌ Error adding stock_status column: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    migrate_stock_status()
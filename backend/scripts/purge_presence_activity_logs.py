@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Migration script to remove user_online/user_offline rows from activity_logs.
+
+Presence is now recorded in the user_sessions table, so these rows are only noise in
+/admin/logs. Rows are deleted in batches to keep each transaction short.
+Pass --dry-run to only count them.
+"""
+import sys
+import os
+from sqlalchemy import text
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+
+BATCH_SIZE = 5000
+
+def purge_presence_activity_logs(dry_run: bool = False):
+    print("🔧 Removing presence rows from activity_logs...")
+    db = SessionLocal()
+    try:
+        count = db.execute(text("""
+            SELECT COUNT(*) FROM activity_logs
+            WHERE action IN ('user_online', 'user_offline')
+        """)).scalar()
+        print(f"📊 Found {count} presence rows")
+        if dry_run or not count:
+            return
+
+        deleted = 0
+        while True:
+            result = db.execute(text("""
+                DELETE FROM activity_logs
+                WHERE id IN (
+                    SELECT id FROM activity_logs
+                    WHERE action IN ('user_online', 'user_offline')
+                    LIMIT :batch_size
+                )
+            """), {"batch_size": BATCH_SIZE})
+            db.commit()
+            if result.rowcount == 0:
+                break
+            deleted += result.rowcount
+            print(f"   ...deleted {deleted}/{count}")
+        print(f"✅ Removed {deleted} presence rows from activity_logs")
+    except Exception as e:
+        print(f"❌ Error removing presence rows: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    purge_presence_activity_logs(dry_run="--dry-run" in sys.argv)
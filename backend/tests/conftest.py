@@ -0,0 +1,24 @@
+import os
+import sys
+import tempfile
+import pytest
+
+# Tests run against a throwaway SQLite database; set before app.database is imported
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Base, SessionLocal, engine
+import app.models  # noqa: F401  (registers every table on Base)
+
+engine.echo = False
+
+@pytest.fixture
+def db():
+    """A session on freshly created tables, dropped again after the test"""
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy import event
+from app.crud import account_transactions as crud_account
+from app.crud.unit_of_work import UnitOfWork
+from app.models import AccountTransaction, ActivityLog
+from app.schema.account_transactions import AccountTransactionCreate, AccountTransactionUpdate
+
+def purchase():
+    return AccountTransactionCreate(
+        chemical_id=1, transaction_type="purchase", quantity=5, unit="kg", amount=250
+    )
+
+def test_audit_row_commits_with_the_transaction(db):
+    commits = []
+    event.listen(db, "after_commit", lambda session: commits.append(session))
+
+    transaction = crud_account.create_account_transaction(db, purchase(), "uid-1", user_id=7)
+
+    assert len(commits) == 1
+    log = db.query(ActivityLog).filter(ActivityLog.action == "create_transaction").one()
+    assert log.user_id == 7
+    assert f"Transaction ID: {transaction.id}" in log.note
+
+def test_failed_audit_row_rolls_back_the_transaction(db, monkeypatch):
+    def broken_log(self, **kwargs):
+        raise RuntimeError("audit write failed")
+    monkeypatch.setattr(UnitOfWork, "log", broken_log)
+
+    with pytest.raises(RuntimeError):
+        crud_account.create_account_transaction(db, purchase(), "uid-1", user_id=7)
+
+    assert db.query(AccountTransaction).count() == 0
+
+def test_approval_is_logged_under_its_own_action(db):
+    transaction = crud_account.create_account_transaction(db, purchase(), "uid-1", user_id=7)
+
+    crud_account.update_account_transaction(
+        db, transaction.id, AccountTransactionUpdate(status="completed"), user_id=7,
+        action="approve_transaction", description=f"Approved transaction {transaction.id}"
+    )
+
+    log = db.query(ActivityLog).filter(ActivityLog.action == "approve_transaction").one()
+    assert (log.old_value, log.new_value) == ("Status: pending", "Status: completed")
+    assert transaction.status == "completed"
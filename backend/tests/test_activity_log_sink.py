@@ -0,0 +1,33 @@
+from app.services.activity_log_sink import ActivityLogSink
+from app.models import ActivityLog
+
+def entry(action, **overrides):
+    row = {
+        "user_id": None,
+        "user_uid": None,
+        "action": action,
+        "description": f"{action} happened",
+        "table_modified": None,
+        "field_modified": None,
+        "old_value": None,
+        "new_value": None,
+        "note": None,
+        "timestamp": None
+    }
+    row.update(overrides)
+    return row
+
+def test_bad_row_does_not_lose_the_rest_of_the_batch(db):
+    sink = ActivityLogSink(synchronous=True)
+    sink._write([
+        entry("first"),
+        entry("broken", timestamp="not a timestamp"),
+        entry("last")
+    ])
+
+    assert [action for (action,) in db.query(ActivityLog.action).order_by(ActivityLog.id)] == ["first", "last"]
+
+def test_sync_record_is_readable_immediately(db):
+    ActivityLogSink().record(action="create_transaction", description="Created", sync=True)
+
+    assert db.query(ActivityLog).filter(ActivityLog.action == "create_transaction").count() == 1
@@ -0,0 +1,25 @@
+import pytest
+from app.crud import alerts as crud_alerts
+from app.crud.alerts import create_alert, _low_stock_alert
+from app.models import Alert, ChemicalInventory
+
+@pytest.fixture(params=["on_conflict", "row_by_row"])
+def upsert_path(request, monkeypatch):
+    if request.param == "row_by_row":
+        # As on a database without ON CONFLICT support
+        monkeypatch.setattr(crud_alerts, "UPSERT_DIALECTS", {})
+    return request.param
+
+def test_repeated_alert_is_coalesced(db, upsert_path):
+    chemical = ChemicalInventory(name="Acetone", quantity=2, unit="L", alert_threshold=5)
+    db.add(chemical)
+    db.commit()
+
+    first = create_alert(db, _low_stock_alert(chemical.id, chemical.name, 2, "L", 5))
+    second = create_alert(db, _low_stock_alert(chemical.id, chemical.name, 1, "L", 5))
+
+    assert second.id == first.id
+    assert db.query(Alert).count() == 1
+    db.refresh(second)
+    assert second.occurrence_count == 2
+    assert "has only 1 L" in second.message
@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from app.crud.alerts import bulk_update_alerts, create_alert
+from app.crud.notifications import bulk_update_notifications, create_notification, mark_notification_read
+from app.models import Alert, NotificationRecipient
+from app.routers import notifications as notifications_router
+from app.schema.alerts import AlertCreate, AlertFilter, BulkAction
+from app.schema.notifications import NotificationBulkRequest, NotificationCreate, NotificationFilter
+from app.services.unread_counters import unread_counters
+
+def send(db, message, recipients):
+    return create_notification(db, NotificationCreate(type="info", severity="info", message=message, recipients=recipients))
+
+def recipient_read(db, notification_id, role):
+    return db.query(NotificationRecipient.is_read).filter(
+        NotificationRecipient.notification_id == notification_id, NotificationRecipient.role == role
+    ).scalar()
+
+@pytest.fixture
+def shared(db):
+    """Two notifications for lab_staff and account; lab_staff has read the first one"""
+    first = send(db, "first", ["lab_staff", "account"])
+    second = send(db, "second", ["lab_staff", "account"])
+    mark_notification_read(db, first.id, user_role="lab_staff")
+    unread_counters.rebuild(db)
+    return first, second
+
+def test_filter_on_is_read_uses_the_callers_read_state(db, shared):
+    first, second = shared
+
+    # Only lab_staff has read "first"; it is still unread overall
+    ids = bulk_update_notifications(
+        db, BulkAction.UNREAD, filters=NotificationFilter(is_read=True), user_role="lab_staff", user_uid="lab-1"
+    )
+
+    assert ids == [first.id]
+    assert recipient_read(db, first.id, "lab_staff") is False
+    assert unread_counters.notification_count("lab_staff") == 2
+    assert unread_counters.notification_count("account") == 2
+
+def test_mark_all_read_leaves_other_recipients_unread(db, shared):
+    first, second = shared
+
+    ids = bulk_update_notifications(
+        db, BulkAction.READ, filters=NotificationFilter(is_read=False), user_role="account", user_uid="acc-1"
+    )
+
+    assert ids == [first.id, second.id]
+    assert recipient_read(db, second.id, "lab_staff") is False
+    assert unread_counters.notification_count("account") == 0
+    assert unread_counters.notification_count("lab_staff") == 1
+
+def test_bulk_dismiss_by_ids_drops_every_recipients_count(db, shared):
+    first, second = shared
+
+    ids = bulk_update_notifications(db, BulkAction.DISMISS, ids=[second.id])
+
+    assert ids == [second.id]
+    assert unread_counters.notification_count("lab_staff") == 0
+    assert unread_counters.notification_count("account") == 1
+
+def test_bulk_alert_actions_by_filter_and_ids(db):
+    alerts = [
+        create_alert(db, AlertCreate(type="expiry", severity=severity, message=f"alert {i}", chemical_id=i))
+        for i, severity in enumerate(["warning", "warning", "critical"], start=1)
+    ]
+    unread_counters.rebuild(db)
+
+    read = bulk_update_alerts(db, BulkAction.READ, filters=AlertFilter(severity="warning"))
+    assert sorted(read) == [alerts[0].id, alerts[1].id]
+    assert unread_counters.alert_count() == 1
+
+    # Already read: nothing changes the second time
+    assert bulk_update_alerts(db, BulkAction.READ, ids=[alerts[0].id]) == []
+
+    dismissed = bulk_update_alerts(db, BulkAction.DISMISS, ids=[alerts[1].id, alerts[2].id])
+    assert sorted(dismissed) == [alerts[1].id, alerts[2].id]
+    assert unread_counters.alert_count() == 0
+    assert db.query(Alert).filter(Alert.is_dismissed == False).count() == 1
+
+def test_bulk_endpoint_scopes_non_admins_to_their_inbox(db, shared):
+    first, second = shared
+    other = send(db, "finance only", ["account"])
+    lab_user = SimpleNamespace(role="lab_staff", uid="lab-1")
+
+    response = notifications_router.bulk_update_notifications(
+        NotificationBulkRequest(action=BulkAction.DISMISS, filter=NotificationFilter()), current_user=lab_user, db=db
+    )
+
+    assert (response["updated"], response["ids"]) == (2, [first.id, second.id])
+    db.refresh(other)
+    assert other.is_dismissed is False
+
+def test_bulk_endpoint_requires_ids_or_filter(db):
+    with pytest.raises(HTTPException) as error:
+        notifications_router.bulk_update_notifications(
+            NotificationBulkRequest(action=BulkAction.READ), current_user=SimpleNamespace(role="admin", uid="admin-1"), db=db
+        )
+    assert error.value.status_code == 400
@@ -0,0 +1,42 @@
+import pytest
+from app.crud import chemical_inventory as crud_chemical_inventory
+from app.crud.chemical_inventory import create_chemical_inventory, delete_chemical_inventory
+from app.models import Alert, ChemicalInventory
+from app.models.user import UserRole
+from app.schema.chemical_inventory import ChemicalInventoryCreate
+from app.services.unread_counters import unread_counters
+
+@pytest.fixture
+def low_chemical(db):
+    # Raises an open, unread low-stock alert
+    return create_chemical_inventory(
+        db, ChemicalInventoryCreate(name="Acetone", quantity=2, unit="L", alert_threshold=5),
+        user_uid="admin", user_role=UserRole.ADMIN
+    )
+
+def test_delete_resolves_and_unlinks_alerts_in_one_commit(db, low_chemical):
+    unread_before = unread_counters.alert_count()
+
+    assert delete_chemical_inventory(db, low_chemical.id, user_uid="admin", user_role=UserRole.ADMIN)
+
+    alert = db.query(Alert).one()
+    assert (alert.chemical_id, alert.resolved_at is not None, alert.is_dismissed) == (None, True, True)
+    assert unread_counters.alert_count() == unread_before - 1
+
+def test_failed_delete_leaves_alerts_open_and_counted(db, low_chemical, monkeypatch):
+    unread_before = unread_counters.alert_count()
+    def broken_movement(*args, **kwargs):
+        raise RuntimeError("ledger write failed")
+    monkeypatch.setattr(crud_chemical_inventory, "record_movement", broken_movement)
+
+    with pytest.raises(RuntimeError):
+        delete_chemical_inventory(db, low_chemical.id, user_uid="admin", user_role=UserRole.ADMIN)
+
+    alert = db.query(Alert).one()
+    assert (alert.chemical_id, alert.resolved_at) == (low_chemical.id, None)
+    assert db.query(ChemicalInventory).count() == 1
+    assert unread_counters.alert_count() == unread_before
+
+    # The dropped counter adjustment does not fire on the session's next commit either
+    db.commit()
+    assert unread_counters.alert_count() == unread_before
@@ -0,0 +1,71 @@
+import io
+import pytest
+from openpyxl import Workbook
+from app.crud.chemical_inventory import import_chemical_inventory
+from app.models import ActivityLog, ChemicalInventory, StockMovement
+from app.models.user import UserRole
+from app.services.chemical_import import ImportFileError, iter_import_rows
+
+HEADER = ["Name", "Quantity", "Unit", "Alert Threshold"]
+
+def csv_file(rows, header=HEADER):
+    lines = [",".join(header)] + [",".join(str(value) for value in row) for row in rows]
+    return io.BytesIO("\n".join(lines).encode("utf-8"))
+
+def xlsx_file(rows, header=HEADER):
+    workbook = Workbook()
+    workbook.active.append(header)
+    for row in rows:
+        workbook.active.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+def run_import(db, file, file_format, batch_size=500):
+    return import_chemical_inventory(
+        db, iter_import_rows(file, file_format), user_uid="importer",
+        user_role=UserRole.ADMIN, source=f"sheet.{file_format}", batch_size=batch_size
+    )
+
+@pytest.mark.parametrize("make_file, file_format", [(csv_file, "csv"), (xlsx_file, "xlsx")])
+def test_valid_rows_are_imported(db, make_file, file_format):
+    result = run_import(db, make_file([["Acetone", 4, "L", 10], ["Ethanol", 20, "L", ""]]), file_format)
+
+    assert (result["total_rows"], result["imported"], result["failed"], result["file_error"]) == (2, 2, 0, None)
+    acetone = db.query(ChemicalInventory).filter(ChemicalInventory.name == "Acetone").one()
+    assert (acetone.quantity, acetone.alert_threshold, acetone.stock_status) == (4, 10, "low")
+    assert db.query(StockMovement).count() == 2
+
+def test_invalid_rows_are_reported_by_spreadsheet_row(db):
+    rows = [["Acetone", 4, "L", ""], ["", "", "", ""], ["Broken", "lots", "L", ""], ["Ethanol", 20, "L", ""]]
+    result = run_import(db, csv_file(rows), "csv")
+
+    # The blank line is skipped, not counted; "Broken" sits on row 4 below the header
+    assert (result["total_rows"], result["imported"], result["failed"]) == (3, 2, 1)
+    assert result["errors"][0]["row"] == 4
+    assert result["errors"][0]["errors"][0].startswith("quantity:")
+
+@pytest.mark.parametrize("row_count, batch_size, batches", [(4, 2, 2), (5, 2, 3), (3, 500, 1)])
+def test_rows_are_committed_in_batches(db, row_count, batch_size, batches):
+    rows = [[f"Chemical {i}", i, "kg", ""] for i in range(row_count)]
+    result = run_import(db, csv_file(rows), "csv", batch_size=batch_size)
+
+    assert result["imported"] == row_count
+    assert db.query(ChemicalInventory).count() == row_count
+    assert db.query(ActivityLog).filter(ActivityLog.action == "import_chemical_inventory").count() == batches
+
+def test_unreadable_file_is_rejected_before_importing(db):
+    with pytest.raises(ImportFileError):
+        iter_import_rows(io.BytesIO(b"this is not a zip archive"), "xlsx")
+    with pytest.raises(ImportFileError):
+        iter_import_rows(io.BytesIO(b"Name,Quantity,Unit\n\xff\xfe,1,kg\n"), "csv")
+
+def test_file_broken_partway_keeps_the_rows_read_so_far(db):
+    # Well past the text decoder's first chunk, so the bad byte is hit mid-import
+    good = csv_file([[f"Chemical {i}", 1, "kg", ""] for i in range(1000)]).getvalue()
+    result = run_import(db, io.BytesIO(good + b"\nBad \xff,1,kg,\n"), "csv", batch_size=100)
+
+    assert result["file_error"].startswith("Could not read the file past row")
+    assert 0 < result["imported"] <= 1000
+    assert db.query(ChemicalInventory).count() == result["imported"]
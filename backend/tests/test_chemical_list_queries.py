@@ -0,0 +1,57 @@
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event, insert
+from app.database import engine
+from app.crud.chemical_inventory import get_chemical_inventory_with_user_info, get_chemical_inventory_page_with_user_info
+from app.models import ChemicalInventory, ChemicalNote, User, UserRole
+
+CHEMICAL_COUNT = 1000
+
+@contextmanager
+def count_statements():
+    statements = []
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+@pytest.fixture
+def inventory(db):
+    # Every chemical updated by its own user and carrying notes, so any per-row lazy
+    # load of the user or the note history would show up as extra statements
+    db.execute(insert(User), [
+        {"uid": f"user-{i}", "email": f"user{i}@example.com", "first_name": f"User{i}", "role": UserRole.LAB_STAFF, "is_approved": True}
+        for i in range(CHEMICAL_COUNT)
+    ])
+    db.execute(insert(ChemicalInventory), [
+        {"name": f"Chemical {i}", "quantity": i, "unit": "L", "updated_by": f"user-{i}"}
+        for i in range(CHEMICAL_COUNT)
+    ])
+    db.execute(insert(ChemicalNote), [
+        {"chemical_id": chemical_id, "author_uid": f"user-{chemical_id % CHEMICAL_COUNT}", "body": f"Note {n}"}
+        for chemical_id in range(1, CHEMICAL_COUNT + 1) for n in range(2)
+    ])
+    db.commit()
+
+def statements_for(db, fetch):
+    db.expire_all()
+    with count_statements() as statements:
+        chemicals = fetch()
+    return len(statements), chemicals
+
+@pytest.mark.parametrize("fetch_page", [
+    lambda db, limit: get_chemical_inventory_with_user_info(db, limit=limit),
+    lambda db, limit: get_chemical_inventory_page_with_user_info(db, limit=limit)[0],
+], ids=["offset", "cursor"])
+def test_statement_count_does_not_grow_with_page_size(db, inventory, fetch_page):
+    counts = {}
+    for limit in (10, 100, CHEMICAL_COUNT):
+        counts[limit], chemicals = statements_for(db, lambda: fetch_page(db, limit))
+        assert len(chemicals) == limit
+        assert all(chemical["updated_by_user"] and chemical["latest_note"] for chemical in chemicals)
+    
+    assert counts[CHEMICAL_COUNT] == counts[10]
+    assert counts[CHEMICAL_COUNT] == 1
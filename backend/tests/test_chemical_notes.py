@@ -0,0 +1,70 @@
+import pytest
+from types import SimpleNamespace
+from fastapi import HTTPException, Response
+from app.crud.chemical_inventory import (
+    add_note_to_chemical_inventory, create_chemical_inventory, get_chemical_inventory_by_id_with_user_info, get_chemical_notes
+)
+from app.models import ActivityLog, User
+from app.models.user import UserRole
+from app.routers import chemical_inventory as chemical_router
+from app.schema.chemical_inventory import ChemicalInventoryAddNote, ChemicalInventoryCreate
+
+@pytest.fixture
+def acetone(db):
+    db.add(User(uid="lab-1", email="lab@example.com", first_name="Ada", last_name="Lovelace", role=UserRole.LAB_STAFF, is_approved=True))
+    db.commit()
+    return create_chemical_inventory(
+        db, ChemicalInventoryCreate(name="Acetone", quantity=10, unit="L"), user_uid="lab-1", user_role=UserRole.LAB_STAFF
+    )
+
+def add_note(db, chemical_id, body):
+    return add_note_to_chemical_inventory(
+        db, chemical_id, ChemicalInventoryAddNote(note=body), user_uid="lab-1", user_role=UserRole.LAB_STAFF,
+        author_name="Ada Lovelace"
+    )
+
+def test_adding_a_note_appends_a_row_and_logs_it(db, acetone):
+    note = add_note(db, acetone.id, "Opened a new bottle")
+
+    assert (note["body"], note["author_uid"], note["author_name"]) == ("Opened a new bottle", "lab-1", "Ada Lovelace")
+    log = db.query(ActivityLog).filter(ActivityLog.action == "add_note_chemical_inventory").one()
+    assert (log.table_modified, log.new_value) == ("chemical_notes", "Opened a new bottle")
+
+def test_adding_a_note_to_a_missing_chemical_returns_none(db):
+    assert add_note(db, 999, "Nobody home") is None
+
+def test_notes_page_newest_first_with_author_names(db, acetone):
+    for index in range(5):
+        add_note(db, acetone.id, f"note {index}")
+
+    first_page, cursor = get_chemical_notes(db, acetone.id, limit=2)
+    second_page, cursor = get_chemical_notes(db, acetone.id, limit=2, cursor=cursor)
+    last_page, cursor = get_chemical_notes(db, acetone.id, limit=2, cursor=cursor)
+
+    bodies = [note["body"] for note in first_page + second_page + last_page]
+    assert bodies == ["note 4", "note 3", "note 2", "note 1", "note 0"]
+    assert cursor is None
+    assert {note["author_name"] for note in first_page} == {"Ada Lovelace"}
+
+def test_chemical_rows_carry_the_note_count_and_latest_note(db, acetone):
+    add_note(db, acetone.id, "first")
+    add_note(db, acetone.id, "second")
+
+    chemical = get_chemical_inventory_by_id_with_user_info(db, acetone.id)
+
+    assert chemical["note_count"] == 2
+    assert chemical["latest_note"]["body"] == "second"
+
+def test_notes_route_sets_the_next_cursor_header_and_rejects_bad_cursors(db, acetone):
+    user = SimpleNamespace(uid="lab-1", role=UserRole.LAB_STAFF, is_approved=True)
+    for index in range(3):
+        add_note(db, acetone.id, f"note {index}")
+
+    response = Response()
+    notes = chemical_router.get_chemical_notes(acetone.id, response, limit=2, cursor=None, db=db, current_user=user)
+
+    assert len(notes) == 2
+    assert "X-Next-Cursor" in response.headers
+    with pytest.raises(HTTPException) as error:
+        chemical_router.get_chemical_notes(acetone.id, Response(), limit=2, cursor="not-a-cursor", db=db, current_user=user)
+    assert error.value.status_code == 400
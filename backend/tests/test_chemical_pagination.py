@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+import pytest
+from app.crud.chemical_inventory import get_chemical_inventory_page_with_user_info
+from app.models import ChemicalInventory
+
+def walk_pages(db, order_by, limit):
+    """Follow next-page cursors to the end; returns the ids in the order served"""
+    ids = []
+    cursor = None
+    for _ in range(100):
+        page, cursor = get_chemical_inventory_page_with_user_info(db, limit=limit, cursor=cursor, order_by=order_by)
+        ids.extend(chemical["id"] for chemical in page)
+        if cursor is None:
+            return ids
+    pytest.fail("pagination did not terminate")
+
+@pytest.fixture
+def chemicals(db):
+    # Most rows share one CURRENT_TIMESTAMP second (stored without fractional seconds);
+    # two are written with bound datetimes (stored with them) around that second
+    db.add_all(ChemicalInventory(name=f"Chemical {i % 4}", quantity=1, unit="L") for i in range(11))
+    db.commit()
+    stored = db.query(ChemicalInventory.last_updated).first()[0]
+    db.add_all([
+        ChemicalInventory(name="Later", quantity=1, unit="L", last_updated=stored + timedelta(microseconds=500)),
+        ChemicalInventory(name="Earlier", quantity=1, unit="L", last_updated=stored - timedelta(seconds=1, microseconds=-250)),
+    ])
+    db.commit()
+    return [chemical_id for (chemical_id,) in db.query(ChemicalInventory.id)]
+
+@pytest.mark.parametrize("order_by", ["last_updated", "name"])
+@pytest.mark.parametrize("limit", [1, 2, 5])
+def test_pages_cover_every_chemical_once(db, chemicals, order_by, limit):
+    ids = walk_pages(db, order_by, limit)
+    assert sorted(ids) == sorted(chemicals)
+
+def test_last_updated_pages_are_newest_first(db, chemicals):
+    ids = walk_pages(db, "last_updated", 3)
+    single_page, _ = get_chemical_inventory_page_with_user_info(db, limit=len(chemicals), order_by="last_updated")
+    assert ids == [chemical["id"] for chemical in single_page]
+    assert db.get(ChemicalInventory, ids[0]).name == "Later"
+    assert db.get(ChemicalInventory, ids[-1]).name == "Earlier"
@@ -0,0 +1,59 @@
+import pytest
+from pydantic import ValidationError
+from app.crud.chemical_inventory import (
+    StaleVersionError, adjust_chemical_quantity, create_chemical_inventory, update_chemical_inventory
+)
+from app.models import ChemicalInventory, StockMovement
+from app.models.user import UserRole
+from app.schema.chemical_inventory import ChemicalInventoryCreate, ChemicalInventoryUpdate, ChemicalQuantityAdjust
+
+@pytest.fixture
+def acetone(db):
+    return create_chemical_inventory(
+        db, ChemicalInventoryCreate(name="Acetone", quantity=10, unit="L", alert_threshold=5),
+        user_uid="lab-1", user_role=UserRole.LAB_STAFF
+    )
+
+def ledger_sum(db, chemical_id):
+    return sum(delta for (delta,) in db.query(StockMovement.delta).filter(StockMovement.chemical_id == chemical_id))
+
+@pytest.mark.parametrize("field", ["quantity", "name", "unit"])
+def test_patch_rejects_null_for_required_fields(field):
+    with pytest.raises(ValidationError, match="cannot be null"):
+        ChemicalInventoryUpdate(**{field: None})
+
+def test_patch_may_still_clear_optional_fields():
+    assert ChemicalInventoryUpdate(notes=None).model_dump(exclude_unset=True) == {"notes": None}
+
+def test_adjust_applies_the_delta_and_bumps_the_version(db, acetone):
+    adjusted = adjust_chemical_quantity(
+        db, acetone.id, ChemicalQuantityAdjust(delta=-7, reference="batch 42"), user_uid="lab-1", user_role=UserRole.LAB_STAFF
+    )
+
+    assert (adjusted.quantity, adjusted.version, adjusted.stock_status) == (3, 2, "low")
+    movement = db.query(StockMovement).order_by(StockMovement.id.desc()).first()
+    assert (movement.delta, movement.reason, movement.reference) == (-7, "adjustment", "batch 42")
+    assert ledger_sum(db, acetone.id) == adjusted.quantity
+
+def test_adjust_cannot_go_below_zero(db, acetone):
+    with pytest.raises(ValueError, match="below zero"):
+        adjust_chemical_quantity(db, acetone.id, ChemicalQuantityAdjust(delta=-11), user_uid="lab-1", user_role=UserRole.LAB_STAFF)
+
+    assert db.get(ChemicalInventory, acetone.id).quantity == 10
+
+def test_adjust_and_patch_reject_a_stale_version(db, acetone):
+    adjust_chemical_quantity(db, acetone.id, ChemicalQuantityAdjust(delta=5, version=1), user_uid="lab-1", user_role=UserRole.LAB_STAFF)
+
+    with pytest.raises(StaleVersionError):
+        adjust_chemical_quantity(db, acetone.id, ChemicalQuantityAdjust(delta=5, version=1), user_uid="lab-1", user_role=UserRole.LAB_STAFF)
+    with pytest.raises(StaleVersionError):
+        update_chemical_inventory(db, acetone.id, ChemicalInventoryUpdate(quantity=1, version=1), user_uid="lab-1", user_role=UserRole.LAB_STAFF)
+
+    db.expire_all()
+    assert db.get(ChemicalInventory, acetone.id).quantity == 15
+
+def test_patch_quantity_records_the_difference_in_the_ledger(db, acetone):
+    updated = update_chemical_inventory(db, acetone.id, ChemicalInventoryUpdate(quantity=4), user_uid="lab-1", user_role=UserRole.LAB_STAFF)
+
+    assert (updated.quantity, updated.version, updated.stock_status) == (4, 2, "low")
+    assert ledger_sum(db, acetone.id) == 4
@@ -0,0 +1,74 @@
+import pytest
+from sqlalchemy import text
+from app.crud.chemical_inventory import (
+    create_chemical_inventory, delete_chemical_inventory, search_chemical_inventory, setup_chemical_search,
+    update_chemical_inventory
+)
+from app.database import engine
+from app.models.user import UserRole
+from app.schema.chemical_inventory import ChemicalInventoryCreate, ChemicalInventoryUpdate
+
+@pytest.fixture
+def search_db(db):
+    setup_chemical_search(engine)
+    yield db
+    # drop_all removes the triggers with the table but leaves the FTS table behind
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS chemical_inventory_fts"))
+
+def add_chemical(db, name, **fields):
+    return create_chemical_inventory(
+        db, ChemicalInventoryCreate(name=name, quantity=1, unit="L", **fields),
+        user_uid="lab-1", user_role=UserRole.LAB_STAFF
+    )
+
+def names(results):
+    return [chemical["name"] for chemical in results]
+
+def test_search_matches_prefixes_across_the_indexed_columns(search_db):
+    add_chemical(search_db, "Acetone", supplier="Merck")
+    add_chemical(search_db, "Ethanol", location="Cabinet A")
+    add_chemical(search_db, "Methanol", formulation="Merck grade")
+
+    assert names(search_chemical_inventory(search_db, "acet")) == ["Acetone"]
+    assert names(search_chemical_inventory(search_db, "cabinet")) == ["Ethanol"]
+    assert sorted(names(search_chemical_inventory(search_db, "merck"))) == ["Acetone", "Methanol"]
+    assert search_chemical_inventory(search_db, "toluene") == []
+
+def test_search_results_are_ranked_and_shaped_like_list_rows(search_db):
+    add_chemical(search_db, "Sodium chloride")
+    add_chemical(search_db, "Sodium hydroxide", supplier="Sodium Supplies")
+
+    results = search_chemical_inventory(search_db, "sodium")
+
+    assert names(results) == ["Sodium hydroxide", "Sodium chloride"]
+    assert results[0]["rank"] > results[1]["rank"]
+    assert (results[0]["updated_by_user"], results[0]["note_count"]) == (None, 0)
+
+def test_search_index_follows_updates_and_deletes(search_db):
+    chemical = add_chemical(search_db, "Acetone")
+    update_chemical_inventory(search_db, chemical.id, ChemicalInventoryUpdate(name="Benzene"), user_uid="admin-1", user_role=UserRole.ADMIN)
+
+    assert search_chemical_inventory(search_db, "acetone") == []
+    assert names(search_chemical_inventory(search_db, "benz")) == ["Benzene"]
+
+    delete_chemical_inventory(search_db, chemical.id, user_uid="admin-1", user_role=UserRole.ADMIN)
+    assert search_chemical_inventory(search_db, "benz") == []
+
+def test_search_indexes_rows_created_before_setup(db):
+    add_chemical(db, "Acetone")
+    setup_chemical_search(engine)
+    try:
+        assert names(search_chemical_inventory(db, "acetone")) == ["Acetone"]
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS chemical_inventory_fts"))
+
+def test_search_quotes_fts_syntax_and_pages(search_db):
+    for index in range(3):
+        add_chemical(search_db, f"Buffer {index}")
+
+    assert search_chemical_inventory(search_db, 'buffer" OR "x') == []
+    assert search_chemical_inventory(search_db, "   ") == []
+    assert len(search_chemical_inventory(search_db, "buffer", limit=2)) == 2
+    assert len(search_chemical_inventory(search_db, "buffer", skip=2, limit=2)) == 1
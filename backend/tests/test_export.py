@@ -0,0 +1,62 @@
+import asyncio
+import csv
+import io
+import json
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from app.models import ChemicalInventory
+from app.models.user import UserRole
+from app.routers import export as export_router
+
+ADMIN = SimpleNamespace(uid="admin-1", role=UserRole.ADMIN, is_approved=True)
+
+def export(resource, file_format="csv", user=ADMIN):
+    response = export_router.export_resource(
+        resource, format=file_format, chemical_id=None, user_id=None, action=None,
+        start_date=None, end_date=None, current_user=user
+    )
+
+    async def read():
+        return [chunk async for chunk in response.body_iterator]
+
+    return response, asyncio.run(read())
+
+@pytest.fixture
+def chemicals(db, monkeypatch):
+    # Small cursor batches, so a handful of rows spans several of them
+    monkeypatch.setattr(export_router, "EXPORT_BATCH_SIZE", 3)
+    db.add_all(ChemicalInventory(name=f"Chemical {i}", quantity=i, unit="kg") for i in range(10))
+    db.commit()
+
+def test_csv_export_spans_batches(chemicals):
+    response, chunks = export("chemicals")
+
+    # Header, then one chunk per cursor batch
+    assert len(chunks) == 1 + 4
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+    assert rows[0] == [
+        "id", "name", "quantity", "unit", "formulation", "notes", "alert_threshold",
+        "supplier", "location", "last_updated", "updated_by", "updated_by_email"
+    ]
+    assert [row[1] for row in rows[1:]] == [f"Chemical {i}" for i in range(10)]
+    assert response.media_type == "text/csv"
+    assert response.headers["content-disposition"].startswith('attachment; filename="chemicals-')
+
+def test_ndjson_export_has_one_object_per_row(chemicals):
+    response, chunks = export("chemicals", "ndjson")
+
+    rows = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert len(rows) == 10
+    assert rows[-1]["name"] == "Chemical 9" and rows[-1]["quantity"] == 9
+
+def test_logs_export_is_admin_only(db):
+    lab_user = SimpleNamespace(uid="lab-1", role=UserRole.LAB_STAFF, is_approved=True)
+    with pytest.raises(HTTPException) as error:
+        export("logs", user=lab_user)
+    assert error.value.status_code == 403
+
+def test_unknown_resource_is_404(db):
+    with pytest.raises(HTTPException) as error:
+        export("users")
+    assert error.value.status_code == 404
@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import insert
+from app.crud import notifications as crud_notifications
+from app.crud.alerts import get_active_alerts_page, get_unread_alerts_page
+from app.crud.notifications import (
+    create_notification, dismiss_notification, get_active_notifications_page, get_unread_notifications_page,
+    mark_notification_read
+)
+from app.models import Alert
+from app.routers import notifications as notifications_router
+from app.schema.notifications import NotificationCreate
+
+def send(db, message, recipients):
+    return create_notification(db, NotificationCreate(type="info", severity="info", message=message, recipients=recipients))
+
+def all_pages(fetch, limit):
+    items, cursor, pages = [], None, 0
+    while True:
+        page, cursor = fetch(limit=limit, cursor=cursor)
+        items.extend(page)
+        pages += 1
+        if cursor is None:
+            return items, pages
+
+@pytest.fixture
+def inbox(db):
+    """Seven lab_staff notifications (the 2nd read, the 4th dismissed) and two for account"""
+    sent = [send(db, f"lab {i}", ["lab_staff"]) for i in range(7)]
+    sent += [send(db, f"account {i}", ["account"]) for i in range(2)]
+    mark_notification_read(db, sent[1].id, user_role="lab_staff")
+    dismiss_notification(db, sent[3].id)
+    return sent
+
+def test_unread_pages_walk_the_roles_inbox_newest_first(db, inbox):
+    items, pages = all_pages(lambda **page: get_unread_notifications_page(db, "lab_staff", "lab-1", **page), limit=2)
+
+    assert [item.message for item in items] == ["lab 6", "lab 5", "lab 4", "lab 3", "lab 2", "lab 0"]
+    assert pages == 3
+
+def test_active_pages_skip_dismissed_notifications(db, inbox):
+    items, _ = all_pages(lambda **page: get_active_notifications_page(db, "lab_staff", "lab-1", **page), limit=4)
+
+    assert [item.message for item in items] == ["lab 6", "lab 5", "lab 4", "lab 2", "lab 1", "lab 0"]
+
+def test_pages_without_a_role_cover_every_notification(db, inbox):
+    items, _ = all_pages(lambda **page: get_active_notifications_page(db, **page), limit=3)
+
+    assert len(items) == 8
+
+def test_page_size_is_capped(db, inbox, monkeypatch):
+    monkeypatch.setattr(crud_notifications, "MAX_FEED_PAGE_SIZE", 3)
+
+    page, cursor = get_active_notifications_page(db, limit=100)
+
+    assert len(page) == 3
+    assert cursor is not None
+
+def test_unread_route_returns_the_cursor_header_and_rejects_bad_cursors(db, inbox):
+    user = SimpleNamespace(uid="lab-1", role="lab_staff")
+    response = Response()
+
+    page = notifications_router.get_unread_notifications(response, limit=5, cursor=None, current_user=user, db=db)
+
+    assert len(page) == 5
+    next_page = notifications_router.get_unread_notifications(
+        Response(), limit=5, cursor=response.headers["X-Next-Cursor"], current_user=user, db=db
+    )
+    assert [item["message"] for item in next_page] == ["lab 0"]
+    with pytest.raises(HTTPException) as error:
+        notifications_router.get_unread_notifications(Response(), limit=5, cursor="garbage", current_user=user, db=db)
+    assert error.value.status_code == 400
+
+def test_alert_pages(db):
+    db.execute(insert(Alert), [
+        {"type": "system", "severity": "info", "message": f"alert {i}", "is_read": i % 3 == 0, "is_dismissed": i % 4 == 0}
+        for i in range(10)
+    ])
+    db.commit()
+
+    unread, pages = all_pages(lambda **page: get_unread_alerts_page(db, **page), limit=3)
+    active, _ = all_pages(lambda **page: get_active_alerts_page(db, **page), limit=3)
+
+    assert [alert.message for alert in unread] == ["alert 8", "alert 7", "alert 5", "alert 4", "alert 2", "alert 1"]
+    assert pages == 2
+    assert [alert.message for alert in active] == ["alert 9", "alert 7", "alert 6", "alert 5", "alert 3", "alert 2", "alert 1"]
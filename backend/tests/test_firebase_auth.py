@@ -0,0 +1,36 @@
+import pytest
+from app import firebase_auth
+from app.firebase_auth import CertificateRefresher, get_admin_user_check_revoked, get_current_user_check_revoked
+from app.routers.account_transactions import router as account_router
+from app.routers.admin import router as admin_router
+
+def dependencies(route):
+    return {dependency.call for dependency in route.dependant.dependencies}
+
+def test_refresher_switches_off_when_firebase_admin_internals_move(monkeypatch):
+    def moved(app):
+        raise AttributeError("_get_client")
+    monkeypatch.setattr(firebase_auth.auth, "_get_client", moved)
+    refresher = CertificateRefresher()
+
+    assert refresher.refresh() is False
+    assert refresher._stop_event.is_set()
+
+@pytest.mark.parametrize("path, method", [
+    ("/account/transactions", "POST"),
+    ("/account/transactions/{transaction_id}", "DELETE"),
+    ("/account/transactions/{transaction_id}/approve", "PUT"),
+    ("/account/purchase-orders/{order_id}", "PUT"),
+])
+def test_money_moving_routes_reject_revoked_tokens(path, method):
+    route = next(route for route in account_router.routes if route.path == path and method in route.methods)
+    assert get_current_user_check_revoked in dependencies(route)
+
+@pytest.mark.parametrize("path, method", [
+    ("/approve/{user_id}", "POST"),
+    ("/user/{user_id}", "PATCH"),
+    ("/user/{user_id}", "DELETE"),
+])
+def test_user_management_routes_reject_revoked_tokens(path, method):
+    route = next(route for route in admin_router.routes if route.path == path and method in route.methods)
+    assert get_admin_user_check_revoked in dependencies(route)
@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+from app.crud.notifications import create_notification, delete_notification, mark_notification_read
+from app.models import Notification, NotificationRecipient, User
+from app.models.user import UserRole
+from app.routers.notifications import enrich_notification_response
+from app.schema.notifications import NotificationCreate
+
+def send(db, message, recipients=None, recipient_users=None):
+    return create_notification(db, NotificationCreate(
+        type="info", severity="info", message=message, recipients=recipients, recipient_users=recipient_users
+    ))
+
+def test_multi_recipient_notification_is_stored_once(db):
+    notification = send(db, "stocktake on Friday", ["lab_staff", "account", "lab_staff"], ["lab-1", "lab-1"])
+
+    assert db.query(Notification).count() == 1
+    rows = db.query(NotificationRecipient).filter(NotificationRecipient.notification_id == notification.id).all()
+    assert sorted(row.counter_key for row in rows) == ["account", "lab_staff", "user:lab-1"]
+
+def test_users_already_reached_through_a_role_get_no_extra_row(db):
+    db.add_all([
+        User(uid="lab-1", email="lab1@example.com", first_name="Lab", role=UserRole.LAB_STAFF),
+        User(uid="acc-1", email="acc1@example.com", first_name="Account", role=UserRole.ACCOUNT)
+    ])
+    db.commit()
+
+    notification = send(db, "hello", ["lab_staff"], ["lab-1", "acc-1"])
+
+    assert sorted(row.counter_key for row in notification.recipient_rows) == ["lab_staff", "user:acc-1"]
+
+def test_each_recipient_keeps_its_own_read_state(db):
+    notification = send(db, "hello", ["lab_staff", "account"])
+    lab_user = SimpleNamespace(uid="lab-1", role="lab_staff")
+    account_user = SimpleNamespace(uid="acc-1", role="account")
+
+    mark_notification_read(db, notification.id, user_role="lab_staff", user_uid="lab-1")
+
+    assert enrich_notification_response(notification, db, lab_user)["is_read"] is True
+    assert enrich_notification_response(notification, db, account_user)["is_read"] is False
+    assert notification.is_read is False
+
+    mark_notification_read(db, notification.id, user_role="account", user_uid="acc-1")
+    assert notification.is_read is True
+
+def test_response_lists_roles_and_users_from_the_recipient_rows(db):
+    notification = send(db, "hello", ["lab_staff"], ["acc-1"])
+
+    response = enrich_notification_response(notification, db)
+
+    assert (response["recipients"], response["recipient_users"]) == (["lab_staff"], ["acc-1"])
+
+def test_deleting_a_notification_removes_its_recipient_rows(db):
+    notification = send(db, "hello", ["lab_staff", "account"])
+
+    assert delete_notification(db, notification.id)
+    assert db.query(NotificationRecipient).count() == 0
@@ -0,0 +1,75 @@
+from contextlib import contextmanager
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import event, insert
+from app.crud.notifications import create_notification
+from app.database import engine
+from app.models import User, UserRole
+from app.routers import notifications as notifications_router
+from app.schema.notifications import NotificationCreate
+from app.services.user_principal_cache import user_principal_cache
+
+CREATOR_COUNT = 20
+ADMIN = SimpleNamespace(uid="admin-1", role="admin")
+
+@contextmanager
+def count_statements():
+    statements = []
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+@pytest.fixture
+def notifications(db):
+    # Every notification created by its own user, so a per-row creator lookup would show up
+    db.execute(insert(User), [
+        {"uid": f"user-{i}", "email": f"user{i}@example.com", "first_name": f"User{i}", "last_name": "Smith", "role": UserRole.LAB_STAFF}
+        for i in range(CREATOR_COUNT)
+    ])
+    db.commit()
+    for i in range(CREATOR_COUNT):
+        create_notification(
+            db, NotificationCreate(type="info", severity="info", message=f"message {i}", recipients=["lab_staff", "account"]),
+            created_by=f"user-{i}"
+        )
+    user_principal_cache.invalidate()
+    yield
+    user_principal_cache.invalidate()
+
+def list_notifications(db):
+    db.expire_all()
+    return notifications_router.get_notifications(
+        skip=0, limit=100, category=None, priority=None, status=None, severity=None, is_read=None, is_dismissed=None,
+        current_user=ADMIN, db=db
+    )
+
+def test_listing_resolves_creators_and_recipients_once_per_page(db, notifications):
+    with count_statements() as statements:
+        page = list_notifications(db)
+
+    # The page, its recipient rows, and one IN query for the creators
+    assert len(statements) == 3
+    assert len(page) == CREATOR_COUNT
+    assert {item["message"]: item["creator_name"] for item in page}["message 7"] == "User7 Smith"
+    assert all(sorted(item["recipients"]) == ["account", "lab_staff"] for item in page)
+
+def test_cached_creators_are_not_queried_again(db, notifications):
+    list_notifications(db)
+
+    with count_statements() as statements:
+        list_notifications(db)
+
+    assert len(statements) == 2
+
+def test_notifications_without_a_creator_need_no_user_query(db):
+    create_notification(db, NotificationCreate(type="info", severity="info", message="system", recipients=["lab_staff"]))
+
+    with count_statements() as statements:
+        page = list_notifications(db)
+
+    assert len(statements) == 2
+    assert page[0]["creator_name"] is None
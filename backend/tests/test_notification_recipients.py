@@ -0,0 +1,49 @@
+from sqlalchemy import inspect
+from app.crud.notifications import create_notification, get_notifications, mark_notification_read
+from app.database import engine
+from app.schema.notifications import NotificationCreate, NotificationFilter
+
+def send(db, message, recipients=None, recipient_users=None):
+    return create_notification(db, NotificationCreate(
+        type="info", severity="info", message=message, recipients=recipients, recipient_users=recipient_users
+    ))
+
+def messages(notifications):
+    return [notification.message for notification in notifications]
+
+def test_inbox_holds_only_the_roles_notifications(db):
+    send(db, "lab only", ["lab_staff"])
+    send(db, "account only", ["account"])
+    send(db, "both", ["lab_staff", "account"])
+
+    assert sorted(messages(get_notifications(db, user_role="lab_staff"))) == ["both", "lab only"]
+    assert sorted(messages(get_notifications(db, user_role="account"))) == ["account only", "both"]
+    assert len(get_notifications(db)) == 3
+
+def test_inbox_includes_the_users_own_notifications(db):
+    send(db, "for the role", ["lab_staff"])
+    send(db, "for lab-1", recipient_users=["lab-1"])
+    send(db, "for lab-2", recipient_users=["lab-2"])
+
+    assert sorted(messages(get_notifications(db, user_role="lab_staff", user_uid="lab-1"))) == ["for lab-1", "for the role"]
+    assert messages(get_notifications(db, user_role="lab_staff")) == ["for the role"]
+
+def test_role_names_do_not_match_as_substrings(db):
+    # The old JSON column was searched with LIKE, so "admin" matched "super_admin"
+    send(db, "for super admins", ["super_admin"])
+
+    assert get_notifications(db, user_role="admin") == []
+
+def test_is_read_filter_uses_the_roles_own_read_state(db):
+    first = send(db, "first", ["lab_staff", "account"])
+    send(db, "second", ["lab_staff", "account"])
+    mark_notification_read(db, first.id, user_role="lab_staff")
+
+    assert messages(get_notifications(db, user_role="lab_staff", filters=NotificationFilter(is_read=False))) == ["second"]
+    assert len(get_notifications(db, user_role="account", filters=NotificationFilter(is_read=False))) == 2
+
+def test_recipient_lookups_are_indexed(db):
+    indexes = {index["name"]: index["column_names"] for index in inspect(engine).get_indexes("notification_recipients")}
+
+    assert indexes["ix_notification_recipients_role_is_read_timestamp"] == ["role", "is_read", "timestamp"]
+    assert indexes["ix_notification_recipients_user_uid_is_read_timestamp"] == ["user_uid", "is_read", "timestamp"]
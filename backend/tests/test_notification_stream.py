@@ -0,0 +1,69 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.models import User
+from app.models.user import UserRole
+from app.routers.notifications import get_stream_user, stream_notifications
+from app.services.notification_hub import notification_hub
+from app.services.stream_tickets import StreamTicketStore, stream_tickets
+from app.services.user_principal_cache import user_principal_cache
+
+class FakeRequest:
+    """Just enough of a Request for the stream: no headers, never disconnects"""
+    headers = {}
+
+    async def is_disconnected(self):
+        return False
+
+@pytest.fixture
+def lab_user(db):
+    user_principal_cache.invalidate()
+    user = User(uid="lab-1", email="lab@example.com", first_name="Lab", role=UserRole.LAB_STAFF, is_approved=True)
+    db.add(user)
+    db.commit()
+    return user
+
+def test_ticket_is_single_use():
+    store = StreamTicketStore(ttl=30)
+    ticket = store.issue("lab-1")
+
+    assert store.redeem(ticket) == "lab-1"
+    assert store.redeem(ticket) is None
+    assert store.redeem("made-up") is None
+
+def test_expired_ticket_is_rejected():
+    store = StreamTicketStore(ttl=0)
+    assert store.redeem(store.issue("lab-1")) is None
+
+def test_stream_authenticates_by_ticket(lab_user):
+    ticket = stream_tickets.issue(lab_user.uid)
+
+    assert get_stream_user(FakeRequest(), ticket=ticket).uid == lab_user.uid
+    with pytest.raises(HTTPException) as replayed:
+        get_stream_user(FakeRequest(), ticket=ticket)
+    assert replayed.value.status_code == 401
+
+def test_stream_without_credentials_is_rejected(lab_user):
+    with pytest.raises(HTTPException) as missing:
+        get_stream_user(FakeRequest(), ticket=None)
+    assert missing.value.status_code == 401
+
+def test_stream_delivers_only_events_for_the_users_role(lab_user):
+    async def read_events():
+        principal = get_stream_user(FakeRequest(), ticket=stream_tickets.issue(lab_user.uid))
+        response = await stream_notifications(FakeRequest(), current_user=principal)
+        body = response.body_iterator
+        assert await body.__anext__() == "retry: 5000\n\n"
+
+        # The subscription is registered once the generator has started
+        notification_hub._dispatch({"event": "notification", "id": 1, "recipients": ["account"]})
+        notification_hub._dispatch({"event": "notification", "id": 2, "recipients": ["lab_staff"]})
+        notification_hub._dispatch({"event": "alert", "id": 3, "recipients": None})
+        chunks = [await asyncio.wait_for(body.__anext__(), timeout=5) for _ in range(2)]
+        await body.aclose()
+        return chunks
+
+    first, second = asyncio.run(read_events())
+
+    assert first.startswith("event: notification\n") and '"id": 2' in first
+    assert second.startswith("event: alert\n") and '"id": 3' in second
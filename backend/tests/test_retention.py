@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+import json
+import pytz
+from app.crud.alerts import create_alert
+from app.crud.notifications import create_notification
+from app.models import Alert, AlertArchive, Notification, NotificationArchive, NotificationRecipient
+from app.schema.alerts import AlertCreate
+from app.schema.notifications import NotificationCreate
+from app.services.retention import RetentionJob, RetentionPolicy
+from app.services.unread_counters import unread_counters
+
+LONG_AGO = datetime.now(pytz.UTC) - timedelta(days=400)
+
+def old_notification(db, message, dismissed=True):
+    notification = create_notification(db, NotificationCreate(type="info", severity="info", message=message, recipients=["lab_staff"]))
+    notification.timestamp = LONG_AGO
+    notification.is_dismissed = dismissed
+    db.commit()
+    return notification
+
+def archive(policy, batch_size=1000):
+    return RetentionJob(policies=[policy], interval=0, batch_size=batch_size).run()
+
+def test_expired_notifications_move_to_the_archive(db):
+    expired_id = old_notification(db, "expired").id
+    kept_id = old_notification(db, "not dismissed", dismissed=False).id
+
+    results = archive(RetentionPolicy("notifications", days=90, state="dismissed"))
+
+    assert list(results.values()) == [1]
+    assert [n.id for n in db.query(Notification)] == [kept_id]
+    assert db.query(NotificationRecipient).filter(NotificationRecipient.notification_id == expired_id).count() == 0
+    archived = db.query(NotificationArchive).one()
+    assert (archived.original_id, archived.message) == (expired_id, "expired")
+    assert json.loads(archived.recipients)[0]["role"] == "lab_staff"
+
+def test_reused_ids_do_not_collide_in_the_archive(db):
+    policy = RetentionPolicy("notifications", days=90, state="dismissed")
+    first_id = old_notification(db, "first").id
+    archive(policy)
+    # SQLite hands the id of the deleted row out again
+    assert old_notification(db, "second").id == first_id
+
+    archive(policy)
+
+    assert [(row.original_id, row.message) for row in db.query(NotificationArchive).order_by(NotificationArchive.id)] == [
+        (first_id, "first"), (first_id, "second")
+    ]
+
+def test_archiving_in_batches_adjusts_unread_counts(db):
+    for i in range(5):
+        old_notification(db, f"read-state {i}", dismissed=False)
+    unread_counters.rebuild(db)
+
+    results = archive(RetentionPolicy("notifications", days=90, state="any"), batch_size=2)
+
+    assert list(results.values()) == [5]
+    assert db.query(NotificationArchive).count() == 5
+    assert unread_counters.notification_count("lab_staff") == 0
+
+def test_open_stock_alerts_are_not_archived(db):
+    stock = create_alert(db, AlertCreate(type="low_stock", severity="warning", message="low", chemical_id=1))
+    expiry = create_alert(db, AlertCreate(type="expiry", severity="warning", message="expiring", chemical_id=1))
+    for alert in (stock, expiry):
+        alert.timestamp = LONG_AGO
+        alert.is_dismissed = True
+    db.commit()
+    stock_id, expiry_id = stock.id, expiry.id
+
+    archive(RetentionPolicy("alerts", days=90, state="dismissed"))
+
+    assert [alert.id for alert in db.query(Alert)] == [stock_id]
+    assert [row.original_id for row in db.query(AlertArchive)] == [expiry_id]
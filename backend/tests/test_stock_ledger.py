@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app.crud.chemical_inventory import create_chemical_inventory, delete_chemical_inventory
+from app.crud.stock_movements import (
+    get_balance_at, get_consumption_series, get_stock_movements, record_movement, take_balance_snapshots
+)
+from app.models import StockBalanceSnapshot, StockMovement, User
+from app.models.stock_movements import MovementReason
+from app.models.user import UserRole
+from app.schema.chemical_inventory import ChemicalInventoryCreate
+
+DAY = datetime(2026, 3, 1)
+
+def add_movements(db, chemical_id, deltas, start=DAY, step=timedelta(hours=6), reason=MovementReason.ADJUSTMENT):
+    db.execute(insert(StockMovement), [
+        {"chemical_id": chemical_id, "delta": delta, "reason": reason.value, "created_at": start + step * index}
+        for index, delta in enumerate(deltas)
+    ])
+    db.commit()
+
+def test_record_movement_skips_zero_deltas(db):
+    assert record_movement(db, 1, 0, MovementReason.UPDATE) is None
+    movement = record_movement(db, 1, -2.5, MovementReason.ADJUSTMENT, user_uid="lab-1", reference="batch 7")
+    db.commit()
+
+    assert db.query(StockMovement).one() is movement
+    assert (movement.reason, movement.reference) == ("adjustment", "batch 7")
+
+def test_create_and_delete_balance_the_ledger(db):
+    chemical = create_chemical_inventory(
+        db, ChemicalInventoryCreate(name="Acetone", quantity=8, unit="L"), user_uid="admin-1", user_role=UserRole.ADMIN
+    )
+    delete_chemical_inventory(db, chemical.id, user_uid="admin-1", user_role=UserRole.ADMIN)
+
+    reasons = [(reason, delta) for reason, delta in db.query(StockMovement.reason, StockMovement.delta).order_by(StockMovement.id)]
+    assert reasons == [("opening", 8), ("removal", -8)]
+
+def test_movements_page_newest_first_with_user_names(db):
+    db.add(User(uid="lab-1", email="lab@example.com", first_name="Ada", last_name="Lovelace", role=UserRole.LAB_STAFF))
+    db.commit()
+    for delta in (10, -1, -2, -3, -4):
+        record_movement(db, 1, delta, MovementReason.ADJUSTMENT, user_uid="lab-1")
+    db.commit()
+
+    first_page, cursor = get_stock_movements(db, 1, limit=3)
+    second_page, cursor = get_stock_movements(db, 1, limit=3, cursor=cursor)
+
+    assert [movement["delta"] for movement in first_page + second_page] == [-4, -3, -2, -1, 10]
+    assert cursor is None
+    assert first_page[0]["user_name"] == "Ada Lovelace"
+
+def test_balance_at_sums_the_movements_up_to_that_time(db):
+    add_movements(db, 1, [10, -3, -2, 5])
+    add_movements(db, 2, [100])
+
+    assert get_balance_at(db, 1, DAY - timedelta(seconds=1)) == 0
+    assert get_balance_at(db, 1, DAY + timedelta(hours=6)) == 7
+    assert get_balance_at(db, 1, DAY + timedelta(days=1)) == 10
+
+def test_snapshots_do_not_change_the_balance(db):
+    add_movements(db, 1, [10, -3, -2, 5, -4])
+    before = [get_balance_at(db, 1, DAY + timedelta(hours=hours)) for hours in range(0, 30, 3)]
+
+    assert take_balance_snapshots(db) == 1
+    add_movements(db, 1, [-1], start=DAY + timedelta(days=2))
+    assert take_balance_snapshots(db) == 1
+    assert take_balance_snapshots(db) == 0
+
+    assert [snapshot.balance for snapshot in db.query(StockBalanceSnapshot).order_by(StockBalanceSnapshot.id)] == [6, 5]
+    assert [get_balance_at(db, 1, DAY + timedelta(hours=hours)) for hours in range(0, 30, 3)] == before
+    assert get_balance_at(db, 1, DAY + timedelta(days=3)) == 5
+
+def test_snapshots_leave_recent_movements_to_settle(db):
+    record_movement(db, 1, 10, MovementReason.OPENING)
+    db.commit()
+
+    assert take_balance_snapshots(db, settle_seconds=3600) == 0
+
+def test_consumption_series_is_daily_and_ignores_removals(db):
+    add_movements(db, 1, [10, -3, -2, 5, -1, -4])
+    add_movements(db, 1, [-5], start=DAY + timedelta(days=1, hours=20), reason=MovementReason.REMOVAL)
+
+    series = get_consumption_series(db, 1, DAY, DAY + timedelta(days=2))
+
+    assert [(point["received"], point["consumed"], point["net"]) for point in series] == [(15, 5, 10), (0, 5, -5)]
+    assert [str(point["day"]) for point in series] == ["2026-03-01", "2026-03-02"]
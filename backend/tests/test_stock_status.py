@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import Float, insert, literal, select
+from app.crud.alerts import sweep_stock_alerts
+from app.crud.chemical_inventory import (
+    create_chemical_inventory, get_chemical_inventory_page_with_user_info, get_chemical_inventory_with_user_info,
+    get_stock_status_summary, update_chemical_inventory
+)
+from app.models import Alert, ChemicalInventory
+from app.models.alerts import AlertType
+from app.models.chemical_inventory import StockStatus, stock_status_expression, stock_status_for
+from app.models.user import UserRole
+from app.schema.chemical_inventory import ChemicalInventoryCreate, ChemicalInventoryUpdate
+
+CASES = [
+    (0, 5, StockStatus.OUT_OF_STOCK),
+    (-1, None, StockStatus.OUT_OF_STOCK),
+    (5, 5, StockStatus.LOW),
+    (3, 5, StockStatus.LOW),
+    (6, 5, StockStatus.IN_STOCK),
+    (1, None, StockStatus.IN_STOCK)
+]
+
+def add_chemical(db, name, quantity, alert_threshold=None):
+    return create_chemical_inventory(
+        db, ChemicalInventoryCreate(name=name, quantity=quantity, unit="L", alert_threshold=alert_threshold),
+        user_uid="admin-1", user_role=UserRole.ADMIN
+    )
+
+@pytest.mark.parametrize("quantity, alert_threshold, expected", CASES)
+def test_python_and_sql_classifications_agree(db, quantity, alert_threshold, expected):
+    assert stock_status_for(quantity, alert_threshold) == expected
+    assert db.scalar(select(stock_status_expression(literal(quantity, Float), literal(alert_threshold, Float)))) == expected.value
+
+def test_status_follows_quantity_and_threshold_edits(db):
+    chemical = add_chemical(db, "Acetone", 10, alert_threshold=5)
+    assert chemical.stock_status == "in_stock"
+
+    update_chemical_inventory(db, chemical.id, ChemicalInventoryUpdate(alert_threshold=12), user_uid="admin-1", user_role=UserRole.ADMIN)
+    assert db.get(ChemicalInventory, chemical.id).stock_status == "low"
+
+    update_chemical_inventory(db, chemical.id, ChemicalInventoryUpdate(quantity=0), user_uid="admin-1", user_role=UserRole.ADMIN)
+    assert db.get(ChemicalInventory, chemical.id).stock_status == "out_of_stock"
+
+def test_list_filter_and_summary(db):
+    add_chemical(db, "Acetone", 10, alert_threshold=5)
+    add_chemical(db, "Ethanol", 2, alert_threshold=5)
+    add_chemical(db, "Methanol", 0)
+    add_chemical(db, "Toluene", 3, alert_threshold=5)
+
+    low = get_chemical_inventory_with_user_info(db, stock_status=StockStatus.LOW)
+    page, _ = get_chemical_inventory_page_with_user_info(db, stock_status=StockStatus.OUT_OF_STOCK)
+
+    assert [chemical["name"] for chemical in low] == ["Ethanol", "Toluene"]
+    assert [chemical["name"] for chemical in page] == ["Methanol"]
+    assert get_stock_status_summary(db) == {"out_of_stock": 1, "low": 2, "in_stock": 1, "total": 4}
+
+def test_sweep_heals_drift_from_direct_writes(db):
+    # Written behind the API's back, so the stored status and alerts are stale
+    db.execute(insert(ChemicalInventory), [
+        {"name": "Acetone", "quantity": 0, "unit": "L", "stock_status": "in_stock"},
+        {"name": "Ethanol", "quantity": 2, "unit": "L", "alert_threshold": 5, "stock_status": "in_stock"},
+        {"name": "Methanol", "quantity": 50, "unit": "L", "alert_threshold": 5, "stock_status": "low"}
+    ])
+    db.commit()
+    methanol_id = db.scalar(select(ChemicalInventory.id).where(ChemicalInventory.name == "Methanol"))
+    db.add(Alert(type=AlertType.LOW_STOCK, severity="warning", message="Methanol is low", chemical_id=methanol_id))
+    db.commit()
+
+    raised, resolved = sweep_stock_alerts(db)
+
+    assert (raised, resolved) == (2, 1)
+    db.expire_all()
+    statuses = dict(db.query(ChemicalInventory.name, ChemicalInventory.stock_status))
+    assert statuses == {"Acetone": "out_of_stock", "Ethanol": "low", "Methanol": "in_stock"}
+    open_alerts = db.query(Alert.type).filter(Alert.resolved_at.is_(None)).all()
+    assert sorted(alert_type for (alert_type,) in open_alerts) == sorted([AlertType.LOW_STOCK, AlertType.OUT_OF_STOCK])
+
+    # A second pass finds nothing left to do
+    assert sweep_stock_alerts(db) == (0, 0)
@@ -0,0 +1,83 @@
+import pytest
+from types import SimpleNamespace
+from app.crud.alerts import _low_stock_alert, create_alert, delete_alert, dismiss_alert, mark_alert_read, update_alert
+from app.crud.notifications import (
+    create_notification, delete_notification, dismiss_notification, mark_notification_read, update_notification
+)
+from app.models import ChemicalInventory
+from app.routers import alerts as alerts_router, notifications as notifications_router
+from app.schema.alerts import AlertUpdate
+from app.schema.notifications import NotificationCreate, NotificationUpdate
+from app.services.unread_counters import UnreadCounters, unread_counters
+
+@pytest.fixture(autouse=True)
+def empty_counters(db):
+    unread_counters.rebuild(db)
+
+def send(db, message, recipients=None, recipient_users=None):
+    return create_notification(db, NotificationCreate(
+        type="info", severity="info", message=message, recipients=recipients, recipient_users=recipient_users
+    ))
+
+def test_notification_counts_follow_create_read_dismiss_and_delete(db):
+    first = send(db, "first", ["lab_staff", "account"])
+    second = send(db, "second", ["lab_staff"])
+    assert (unread_counters.notification_count("lab_staff"), unread_counters.notification_count("account")) == (2, 1)
+
+    mark_notification_read(db, first.id, user_role="lab_staff")
+    assert (unread_counters.notification_count("lab_staff"), unread_counters.notification_count("account")) == (1, 1)
+
+    dismiss_notification(db, first.id)
+    assert unread_counters.notification_count("account") == 0
+
+    update_notification(db, second.id, NotificationUpdate(is_read=True))
+    assert unread_counters.notification_count("lab_staff") == 0
+    update_notification(db, second.id, NotificationUpdate(is_read=False))
+    assert unread_counters.notification_count("lab_staff") == 1
+
+    delete_notification(db, second.id)
+    assert unread_counters.notification_count("lab_staff") == 0
+
+def test_count_endpoint_adds_the_role_and_the_users_own_notifications(db):
+    send(db, "for the role", ["lab_staff"])
+    send(db, "for one user", recipient_users=["lab-1"])
+    send(db, "for someone else", recipient_users=["lab-2"])
+
+    user = SimpleNamespace(uid="lab-1", role="lab_staff")
+    assert notifications_router.get_unread_notification_count(current_user=user) == {"count": 2}
+
+def test_alert_counts_follow_create_read_dismiss_and_delete(db):
+    chemicals = [ChemicalInventory(name=name, quantity=1, unit="L", alert_threshold=5) for name in ("Acetone", "Ethanol", "Methanol")]
+    db.add_all(chemicals)
+    db.commit()
+    alerts = [create_alert(db, _low_stock_alert(chemical.id, chemical.name, 1, "L", 5)) for chemical in chemicals]
+    assert alerts_router.get_unread_alert_count(current_user=None) == {"count": 3}
+
+    # Coalescing into an existing alert does not count it twice
+    create_alert(db, _low_stock_alert(chemicals[0].id, chemicals[0].name, 0.5, "L", 5))
+    assert unread_counters.alert_count() == 3
+
+    mark_alert_read(db, alerts[0].id)
+    dismiss_alert(db, alerts[1].id)
+    assert unread_counters.alert_count() == 1
+
+    update_alert(db, alerts[0].id, AlertUpdate(is_read=False))
+    assert unread_counters.alert_count() == 2
+
+    delete_alert(db, alerts[2].id)
+    delete_alert(db, alerts[1].id)
+    assert unread_counters.alert_count() == 1
+
+def test_rebuild_recounts_from_the_database(db):
+    send(db, "first", ["lab_staff", "account"])
+    send(db, "second", recipient_users=["lab-1"])
+    counters = UnreadCounters()
+    counters.add_notification(["lab_staff"], 40)
+    counters.add_alert(7)
+
+    counters.rebuild(db)
+
+    assert counters.notification_count("lab_staff") == 1
+    assert counters.notification_count("account") == 1
+    assert counters.notification_count("user:lab-1") == 1
+    assert counters.alert_count() == 0
@@ -23,6 +23,18 @@ export async function fetchChemicals() {
   return res.json();
 }
 
+export async function searchChemicals(q, { skip = 0, limit = 20 } = {}) {
+  const params = new URLSearchParams({ q, skip, limit });
+  const res = await fetch(`${API_BASE}/chemicals/search?${params}`, { 
+    headers: await authHeaders() 
+  });
+  if (!res.ok) {
+    const error = await res.json();
+    throw new Error(error.detail || 'Failed to search chemicals');
+  }
+  return res.json();
+}
+
 export async function fetchChemical(id) {
   const res = await fetch(`${API_BASE}/chemicals/${id}`, { 
     headers: await authHeaders() 
@@ -73,6 +85,24 @@ export async function addChemicalNote(id, note) {
   return res.json();
 }
 
+export async function fetchChemicalNotes(id, { limit = 50, cursor = null } = {}) {
+  const params = new URLSearchParams({ limit });
+  if (cursor) {
+    params.set('cursor', cursor);
+  }
+  const res = await fetch(`${API_BASE}/chemicals/${id}/notes?${params}`, { 
+    headers: await authHeaders() 
+  });
+  if (!res.ok) {
+    const error = await res.json();
+    throw new Error(error.detail || 'Failed to fetch notes');
+  }
+  return {
+    notes: await res.json(),
+    nextCursor: res.headers.get('X-Next-Cursor'),
+  };
+}
+
 export async function deleteChemical(id) {
   const res = await fetch(`${API_BASE}/chemicals/${id}`, {
     method: 'DELETE',
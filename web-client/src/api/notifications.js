@@ -9,6 +9,14 @@ const getAuthHeaders = () => {
   } : {};
 };
 
+// Fired on window after this client reads, dismisses, updates or deletes notifications,
+// so components showing counts can refresh without waiting for the server
+export const NOTIFICATIONS_CHANGED_EVENT = 'notifications:changed';
+
+const notifyNotificationsChanged = () => {
+  window.dispatchEvent(new Event(NOTIFICATIONS_CHANGED_EVENT));
+};
+
 // Send notification
 export const sendNotification = async (notificationData) => {
   const response = await fetch(`${API_BASE}/notifications/send`, {
@@ -62,6 +70,21 @@ export const fetchUnreadNotifications = async () => {
   return response.json();
 };
 
+// Get the unread notification count for the bell badge
+export const fetchUnreadNotificationCount = async () => {
+  const response = await fetch(`${API_BASE}/notifications/unread/count`, {
+    headers: getAuthHeaders()
+  });
+
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to fetch unread notification count');
+  }
+
+  const data = await response.json();
+  return data.count;
+};
+
 // Get active notifications
 export const fetchActiveNotifications = async () => {
   const response = await fetch(`${API_BASE}/notifications/active`, {
@@ -88,6 +111,7 @@ export const dismissNotification = async (notificationId) => {
     throw new Error(error.detail || 'Failed to dismiss notification');
   }
 
+  notifyNotificationsChanged();
   return response.json();
 };
 
@@ -103,6 +127,24 @@ export const markNotificationRead = async (notificationId) => {
     throw new Error(error.detail || 'Failed to mark notification as read');
   }
 
+  notifyNotificationsChanged();
+  return response.json();
+};
+
+// Read/unread/dismiss many notifications in one request, by ids or filter (e.g. mark all as read)
+export const bulkUpdateNotifications = async (action, { ids, filter } = {}) => {
+  const response = await fetch(`${API_BASE}/notifications/bulk`, {
+    method: 'POST',
+    headers: getAuthHeaders(),
+    body: JSON.stringify(ids ? { action, ids } : { action, filter: filter || {} })
+  });
+
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to update notifications');
+  }
+
+  notifyNotificationsChanged();
   return response.json();
 };
 
@@ -119,6 +161,7 @@ export const updateNotification = async (notificationId, updateData) => {
     throw new Error(error.detail || 'Failed to update notification');
   }
 
+  notifyNotificationsChanged();
   return response.json();
 };
 
@@ -134,6 +177,7 @@ export const deleteNotification = async (notificationId) => {
     throw new Error(error.detail || 'Failed to delete notification');
   }
 
+  notifyNotificationsChanged();
   return response.json();
 };
 
@@ -177,4 +221,77 @@ export const fetchNotificationStatuses = async () => {
   }
 
   return response.json();
-}; 
\ No newline at end of file
+}; 
+// Get a short-lived, single-use ticket for opening the notification stream
+export const fetchStreamTicket = async () => {
+  const response = await fetch(`${API_BASE}/notifications/stream/ticket`, {
+    method: 'POST',
+    headers: getAuthHeaders()
+  });
+
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to get notification stream ticket');
+  }
+
+  const data = await response.json();
+  return data.ticket;
+};
+
+// Subscribe to pushed notification and alert events (server-sent events).
+// EventSource cannot send headers, so the stream is opened with a single-use ticket
+// rather than the token itself. A used ticket cannot reconnect, so on any error the
+// stream is reopened with a fresh one. onOpen runs on every (re)connect, since events
+// may have been missed while disconnected. Returns a function that closes the stream.
+export const openNotificationStream = (onEvent, onOpen) => {
+  let source = null;
+  let retryTimer = null;
+  let closed = false;
+
+  const handle = (event) => {
+    try {
+      onEvent(JSON.parse(event.data));
+    } catch (error) {
+      console.error('Error parsing notification event:', error);
+    }
+  };
+
+  const reconnect = () => {
+    if (!closed) {
+      retryTimer = setTimeout(connect, 5000);
+    }
+  };
+
+  const connect = async () => {
+    let ticket;
+    try {
+      ticket = await fetchStreamTicket();
+    } catch (error) {
+      console.error('Error opening notification stream:', error);
+      reconnect();
+      return;
+    }
+    if (closed) {
+      return;
+    }
+
+    source = new EventSource(`${API_BASE}/notifications/stream?ticket=${encodeURIComponent(ticket)}`);
+    source.addEventListener('notification', handle);
+    source.addEventListener('alert', handle);
+    source.onopen = () => onOpen && onOpen();
+    source.onerror = () => {
+      source.close();
+      reconnect();
+    };
+  };
+
+  connect();
+
+  return () => {
+    closed = true;
+    clearTimeout(retryTimer);
+    if (source) {
+      source.close();
+    }
+  };
+};
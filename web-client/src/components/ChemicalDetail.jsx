@@ -5,6 +5,7 @@ import styles from './ChemicalDetail.module.scss';
 export default function ChemicalDetail({
   chemical,
   formulations,
+  noteEntries = [],
   user,
   onAddNote,
   onEdit,
@@ -126,13 +127,18 @@ export default function ChemicalDetail({
 
           <div className={styles.notesSection}>
             <h5>Notes:</h5>
-            {chemical.notes ? (
+            {chemical.notes || noteEntries.length > 0 ? (
               <div className={styles.notesText}>
-                {chemical.notes.split('\n').map((note, index) => (
+                {chemical.notes && chemical.notes.split('\n').map((note, index) => (
                   <div key={index} className={styles.noteLine}>
                     {note}
                   </div>
                 ))}
+                {noteEntries.map((note) => (
+                  <div key={`entry-${note.id}`} className={styles.noteLine}>
+                    [{new Date(note.created_at).toLocaleString()}] {note.author_name || note.author_uid || 'Unknown'}: {note.body}
+                  </div>
+                ))}
               </div>
             ) : (
               <p className={styles.noNotes}>No notes available</p>
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { Bell } from 'lucide-react';
-import { fetchUnreadNotifications } from '../api/notifications';
+import { fetchUnreadNotificationCount, openNotificationStream, NOTIFICATIONS_CHANGED_EVENT } from '../api/notifications';
 import styles from './NotificationBell.module.scss';
 
 const NotificationBell = ({ onOpenDashboard }) => {
@@ -8,17 +8,20 @@ const NotificationBell = ({ onOpenDashboard }) => {
   const [loading, setLoading] = useState(false);
 
   useEffect(() => {
-    loadUnreadCount();
-    // Refresh unread count every 30 seconds
-    const interval = setInterval(loadUnreadCount, 30000);
-    return () => clearInterval(interval);
+    // Refresh the count when the server pushes a notification or alert, when the stream
+    // (re)connects, and after this client reads or dismisses notifications, instead of polling
+    const closeStream = openNotificationStream(() => loadUnreadCount(), loadUnreadCount);
+    window.addEventListener(NOTIFICATIONS_CHANGED_EVENT, loadUnreadCount);
+    return () => {
+      closeStream();
+      window.removeEventListener(NOTIFICATIONS_CHANGED_EVENT, loadUnreadCount);
+    };
   }, []);
 
   const loadUnreadCount = async () => {
     setLoading(true);
     try {
-      const notifications = await fetchUnreadNotifications();
-      setUnreadCount(notifications.length);
+      setUnreadCount(await fetchUnreadNotificationCount());
     } catch (error) {
       console.error('Error loading unread notifications:', error);
     } finally {
@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
-import { fetchChemical, updateChemical, deleteChemical, addChemicalNote } from '../api/chemicals';
+import { fetchChemical, updateChemical, deleteChemical, addChemicalNote, fetchChemicalNotes } from '../api/chemicals';
 import { fetchFormulations, createFormulation, updateFormulation, deleteFormulation, addFormulationNote } from '../api/chemicals';
 import { fetchChemicalPurchaseHistory } from '../api/accountTransactions';
 import ChemicalDetail from '../components/ChemicalDetail';
@@ -13,6 +13,7 @@ export default function ChemicalDetailPage() {
   const { user, userInfo } = useAuth();
   const [chemical, setChemical] = useState(null);
   const [formulations, setFormulations] = useState([]);
+  const [noteEntries, setNoteEntries] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [showEditForm, setShowEditForm] = useState(false);
@@ -27,12 +28,14 @@ export default function ChemicalDetailPage() {
   const loadChemicalData = async () => {
     try {
       setLoading(true);
-      const [chemicalData, formulationsData] = await Promise.all([
+      const [chemicalData, formulationsData, notesData] = await Promise.all([
         fetchChemical(id),
-        fetchFormulations(id)
+        fetchFormulations(id),
+        fetchChemicalNotes(id)
       ]);
       setChemical(chemicalData);
       setFormulations(formulationsData);
+      setNoteEntries(notesData.notes);
       setError('');
     } catch (err) {
       console.error('Error loading chemical data:', err);
@@ -134,6 +137,7 @@ export default function ChemicalDetailPage() {
       <ChemicalDetail
         chemical={chemical}
         formulations={formulations}
+        noteEntries={noteEntries}
         user={user}
         onAddNote={handleAddNote}
         onEdit={handleEdit}